@@ -0,0 +1,122 @@
+"""JWT authentication with cached tokens and users.
+
+`JSONWebTokenBackend` decodes the token and loads its user from the
+database on every call, and a request may authenticate several times
+(the debug header check, then `JSONWebTokenMiddleware`).
+`CachedJSONWebTokenBackend` remembers the user of a token on the request
+and, for `GRAPHQL_JWT_CACHE['TIMEOUT']` seconds, in a process-local cache
+keyed by a hash of the whole token. Saving or deleting a user drops its
+tokens from the cache of the process doing it, other processes see the
+change when their entry expires.
+"""
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from graphql_jwt.backends import JSONWebTokenBackend
+from graphql_jwt.utils import get_credentials, get_payload, get_user_by_payload
+
+DEFAULTS = {
+    'TIMEOUT': 60,
+    'MAX_ENTRIES': 10000,
+}
+REQUEST_ATTR = '_cached_jwt_user'
+
+
+def get_setting(name):
+    return getattr(settings, 'GRAPHQL_JWT_CACHE', {}).get(
+        name, DEFAULTS[name])
+
+
+class TokenCache:
+    """Users of verified tokens, kept until a deadline, oldest evicted."""
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.user_keys = {}
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            user, deadline = entry
+            if deadline <= time.time():
+                self.discard(key)
+                return None
+            self.entries.move_to_end(key)
+        # Every request gets its own instance to modify.
+        return copy.copy(user)
+
+    def set(self, key, user, deadline):
+        with self.lock:
+            self.discard(key)
+            self.entries[key] = (copy.copy(user), deadline)
+            self.user_keys.setdefault(user.pk, set()).add(key)
+            while len(self.entries) > get_setting('MAX_ENTRIES'):
+                self.discard(next(iter(self.entries)))
+
+    def discard(self, key):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is None:
+                return
+            pk = entry[0].pk
+            keys = self.user_keys[pk]
+            keys.discard(key)
+            if not keys:
+                del self.user_keys[pk]
+
+    def invalidate_user(self, pk):
+        """Forget every token of the user `pk`."""
+        with self.lock:
+            for key in list(self.user_keys.get(pk, ())):
+                self.discard(key)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.user_keys.clear()
+
+
+tokens = TokenCache()
+
+
+def token_key(token):
+    """The cache key of a JWT, covering its header, payload and signature."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class CachedJSONWebTokenBackend(JSONWebTokenBackend):
+    """`JSONWebTokenBackend` decoding each token once per request and TTL."""
+
+    def authenticate(self, request=None, **kwargs):
+        if request is None or getattr(request, '_jwt_token_auth', False):
+            return None
+        token = get_credentials(request, **kwargs)
+        if token is None:
+            return None
+
+        memo = getattr(request, REQUEST_ATTR, None)
+        if memo is not None and memo[0] == token:
+            return memo[1]
+
+        key = token_key(token)
+        user = tokens.get(key)
+        if user is None:
+            # Invalid, expired and disabled users raise and are not cached.
+            payload = get_payload(token, request)
+            user = get_user_by_payload(payload)
+            if user is not None:
+                deadline = time.time() + get_setting('TIMEOUT')
+                if 'exp' in payload:
+                    deadline = min(deadline, payload['exp'])
+                tokens.set(key, user, deadline)
+        setattr(request, REQUEST_ATTR, (token, user))
+        return user
@@ -0,0 +1,90 @@
+import hashlib
+from collections import OrderedDict
+from functools import partial
+from threading import Lock
+from graphql import parse, validate
+from graphql.backend.core import GraphQLCoreBackend
+from graphql.backend.base import GraphQLDocument
+from graphql.execution import ExecutionResult, execute
+from graphql.language.printer import print_ast
+from graphql.pyutils.cached_property import cached_property
+
+
+class CachedDocument(GraphQLDocument):
+    """Parsed document whose validation already ran when it was cached."""
+
+    def __init__(self, *args, errors=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.errors = errors or []
+
+    @cached_property
+    def normalized_string(self):
+        return print_ast(self.document_ast)
+
+
+def invalid_document(errors, *args, **kwargs):
+    return ExecutionResult(errors=errors, invalid=True)
+
+
+class CachedDocumentBackend(GraphQLCoreBackend):
+    """Backend keeping parsed and validated documents in a bounded LRU.
+
+    Documents are keyed by a hash of the query text, so a query shape that
+    was seen before costs a dictionary lookup instead of a parse and a
+    validation pass against the schema.
+    """
+
+    def __init__(self, max_size=500, executor=None):
+        super().__init__(executor=executor)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._documents = OrderedDict()
+        self._lock = Lock()
+
+    def document_from_string(self, schema, document_string):
+        key = (id(schema),
+               hashlib.sha256(document_string.encode()).hexdigest())
+        with self._lock:
+            document = self._documents.get(key)
+            if document is not None:
+                self._documents.move_to_end(key)
+                self.hits += 1
+                return document
+            self.misses += 1
+
+        document = self.build_document(schema, document_string)
+        with self._lock:
+            self._documents[key] = document
+            while len(self._documents) > self.max_size:
+                self._documents.popitem(last=False)
+        return document
+
+    def build_document(self, schema, document_string):
+        document_ast = parse(document_string)
+        errors = validate(schema, document_ast)
+        if errors:
+            run = partial(invalid_document, errors)
+        else:
+            run = partial(execute, schema, document_ast, **self.execute_params)
+
+        return CachedDocument(
+            schema=schema,
+            document_string=document_string,
+            document_ast=document_ast,
+            execute=run,
+            errors=errors,
+        )
+
+    def cache_info(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._documents),
+            'max_size': self.max_size,
+        }
+
+    def cache_clear(self):
+        with self._lock:
+            self._documents.clear()
+            self.hits = self.misses = 0
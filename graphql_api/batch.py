@@ -0,0 +1,34 @@
+"""Batches of operations sent as a JSON array in one request.
+
+Entries share the request: its data loaders, its authenticated user and
+its middleware run once. With `GRAPHQL_BATCH['PARALLEL']`, batches of
+queries run their entries on a pool of `WORKERS` threads, each on its own
+copy of the request; batches with a mutation always run in order.
+"""
+from django.conf import settings
+from django.http import HttpResponseBadRequest
+from graphene_django.views import HttpError
+
+DEFAULTS = {
+    'MAX_SIZE': 10,
+    'PARALLEL': False,
+    'WORKERS': 8,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'GRAPHQL_BATCH', {}).get(name, DEFAULTS[name])
+
+
+def check_batch(batch):
+    """Reject empty and oversized batches and entries that are not objects."""
+    if not batch:
+        raise HttpError(HttpResponseBadRequest(
+            'Received an empty list in the batch request.'))
+    max_size = get_setting('MAX_SIZE')
+    if len(batch) > max_size:
+        raise HttpError(HttpResponseBadRequest(
+            f'Batches are limited to {max_size} operations.'))
+    if not all(isinstance(entry, dict) for entry in batch):
+        raise HttpError(HttpResponseBadRequest(
+            'Every operation of a batch must be a JSON object.'))
@@ -0,0 +1,148 @@
+"""Full-response cache for anonymous GraphQL queries.
+
+Entries are tagged with the rows (`store.product:12`) and row sets
+(`store.product`) their result was built from. Every tag has a version
+stored next to the entries; invalidating a tag replaces its version, which
+turns every entry recorded with the old one into a miss.
+
+An entry also carries the HTTP validators of its response: a strong ETag
+derived from the versions of its tags, which changes exactly when the
+entry is invalidated, and a `max-age`, the smallest
+`cache_control_max_age` of the types it resolved.
+"""
+import hashlib
+import json
+from uuid import uuid4
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+DEFAULTS = {
+    'CACHE': 'default',
+    'TIMEOUT': 60,
+}
+
+# `cache_control_max_age` of the types tagging responses, by model tag.
+max_ages = {}
+
+
+def get_setting(name):
+    return getattr(settings, 'GRAPHQL_RESPONSE_CACHE', {}).get(
+        name, DEFAULTS[name])
+
+
+def get_cache():
+    return caches[get_setting('CACHE')]
+
+
+def model_tag(model):
+    return model._meta.label_lower
+
+
+def row_tag(model, pk):
+    return f'{model._meta.label_lower}:{pk}'
+
+
+def _tag_key(tag):
+    return f'graphql:tag:{tag}'
+
+
+def make_key(query, variables, operation_name, scope):
+    """Return the cache key of a normalized query document and its inputs."""
+    payload = json.dumps(
+        [query, variables or {}, operation_name, scope],
+        sort_keys=True, default=str)
+    return 'graphql:response:' + hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_response(key):
+    """Return the cached entry of `key` if none of its tags changed.
+
+    Entries are dicts holding the response `body`, its `etag` and
+    `max_age`.
+    """
+    cache = get_cache()
+    entry = cache.get(key)
+    if entry is None:
+        return None
+
+    tags = entry['tags']
+    versions = cache.get_many([_tag_key(tag) for tag in tags])
+    for tag, version in tags.items():
+        if versions.get(_tag_key(tag)) != version:
+            return None
+    return entry
+
+
+def get_max_age(tags):
+    """Seconds a response built from `tags` may be reused without asking."""
+    return min((max_ages.get(tag.partition(':')[0], 0) for tag in tags),
+               default=0)
+
+
+def set_response(key, body, tags):
+    """Cache the response `body`, returning its entry or None."""
+    cache = get_cache()
+    keys = [_tag_key(tag) for tag in tags]
+    # Tags that were never invalidated get a version now, so that an entry
+    # is never recorded against a missing (and later evicted) version.
+    for tag_key in keys:
+        cache.add(tag_key, uuid4().hex, timeout=None)
+    versions = cache.get_many(keys)
+    if len(versions) != len(keys):
+        return None
+
+    tags = {tag: versions[_tag_key(tag)] for tag in tags}
+    digest = hashlib.sha256(
+        json.dumps([key, tags], sort_keys=True).encode()).hexdigest()
+    entry = {
+        'body': body,
+        'tags': tags,
+        'etag': f'"{digest[:32]}"',
+        'max_age': get_max_age(tags),
+    }
+    cache.set(key, entry, get_setting('TIMEOUT'))
+    return entry
+
+
+def invalidate(*tags):
+    """Expire every cached response recorded with one of `tags`.
+
+    Versions are replaced again once the surrounding transaction commits,
+    so a response cached from a concurrent read of the old rows does not
+    outlive the write.
+    """
+    def bump():
+        get_cache().set_many(
+            {_tag_key(tag): uuid4().hex for tag in tags}, timeout=None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def record_tags(info, *tags):
+    """Add `tags` to the response being cached for this request, if any."""
+    recorded = getattr(info.context, 'cache_tags', None)
+    if recorded is not None:
+        recorded.update(tags)
+
+
+class CacheTagsMixin:
+    """Tag cached responses with every row resolved as this type.
+
+    `cache_control_max_age` is how long, in seconds, clients and proxies
+    may reuse a response holding rows of this type before revalidating it.
+    """
+    cache_control_max_age = 0
+
+    @classmethod
+    def __init_subclass_with_meta__(cls, **options):
+        super().__init_subclass_with_meta__(**options)
+        max_ages[model_tag(cls._meta.model)] = cls.cache_control_max_age
+
+    @classmethod
+    def is_type_of(cls, root, info):
+        if not super().is_type_of(root, info):
+            return False
+        record_tags(info, row_tag(cls._meta.model, root.pk))
+        return True
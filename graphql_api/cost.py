@@ -0,0 +1,207 @@
+"""Static cost and depth analysis of GraphQL operations.
+
+The cost of an operation approximates the number of objects it can load:
+every object field costs one, multiplied by the page size of the
+connections and lists it is nested in. Connection `first`/`last`
+arguments are read from the document or the request variables, and a
+connection without them counts as a full page of
+`RELAY_CONNECTION_MAX_LIMIT` rows. Variables are coerced against the
+definitions of the operation first, like execution does, so values of the
+wrong type are rejected before anything is measured.
+
+The analysis depends on the variables of each request, so it runs right
+before execution instead of with the validation rules cached alongside
+the parsed document.
+"""
+from collections import namedtuple
+from django.conf import settings
+from graphene import relay
+from graphene_django.settings import graphene_settings
+from graphql import GraphQLError
+from graphql.execution.values import get_variable_values
+from graphql.language.ast import (
+    Field, FragmentDefinition, FragmentSpread, InlineFragment,
+    OperationDefinition)
+from graphql.type import GraphQLInt, GraphQLList, GraphQLNonNull
+from graphql.type.definition import get_named_type
+from graphql.utils.value_from_ast import value_from_ast
+
+DEFAULTS = {
+    'MAX_COST': 50000,
+    'MAX_DEPTH': 10,
+    'LIST_SIZE': 10,
+}
+
+QueryCost = namedtuple('QueryCost', ['cost', 'depth'])
+
+
+def get_setting(name):
+    return getattr(settings, 'GRAPHQL_QUERY_COST', {}).get(
+        name, DEFAULTS[name])
+
+
+def is_connection(graphql_type):
+    graphene_type = getattr(graphql_type, 'graphene_type', None)
+    return isinstance(graphene_type, type) \
+        and issubclass(graphene_type, relay.Connection)
+
+
+def is_list(graphql_type):
+    if isinstance(graphql_type, GraphQLNonNull):
+        graphql_type = graphql_type.of_type
+    return isinstance(graphql_type, GraphQLList)
+
+
+class QueryCostAnalyzer:
+    """Compute the `QueryCost` of the operations of a document."""
+
+    def __init__(self, schema, document_ast, variables=None):
+        self.schema = schema
+        self.inputs = variables or {}
+        self.variables = {}
+        self.fragments = {
+            definition.name.value: definition
+            for definition in document_ast.definitions
+            if isinstance(definition, FragmentDefinition)
+        }
+        self.operations = [
+            definition for definition in document_ast.definitions
+            if isinstance(definition, OperationDefinition)
+        ]
+
+    def get_operation(self, operation_name=None):
+        for operation in self.operations:
+            if operation_name is None \
+                    or (operation.name and operation.name.value == operation_name):
+                return operation
+        return None
+
+    def measure(self, operation_name=None):
+        operation = self.get_operation(operation_name)
+        if operation is None:
+            return QueryCost(0, 0)
+
+        if not isinstance(self.inputs, dict):
+            raise GraphQLError('Variables must be an object.')
+        try:
+            self.variables = get_variable_values(
+                self.schema, operation.variable_definitions or [], self.inputs)
+        except GraphQLError:
+            raise
+        except Exception as error:
+            # graphql-core lets the errors of scalar parsing, such as a
+            # string for an Int, escape.
+            raise GraphQLError(f'Invalid variable values: {error}')
+
+        root_type = {
+            'query': self.schema.get_query_type,
+            'mutation': self.schema.get_mutation_type,
+            'subscription': self.schema.get_subscription_type,
+        }[operation.operation]()
+        return self.selection_cost(root_type, operation.selection_set)
+
+    def selection_cost(self, parent_type, selection_set, depth=0, edge=False,
+                       visited=frozenset()):
+        """Return the cost and depth of a selection set of `parent_type`.
+
+        The edges and nodes of a connection are free, their cost is carried
+        by the connection field that holds the page size.
+        """
+        cost, max_depth = 0, depth
+        for field, field_type, spread in self.iter_fields(
+                parent_type, selection_set, visited):
+            max_depth = max(max_depth, depth + 1)
+            if not field.selection_set:
+                continue
+
+            child_cost, child_depth = self.selection_cost(
+                get_named_type(field_type.type), field.selection_set,
+                depth + 1, edge=is_connection(parent_type), visited=spread)
+            max_depth = max(max_depth, child_depth)
+            if edge or is_connection(parent_type):
+                cost += child_cost
+            else:
+                cost += self.multiplier(field, field_type) * (1 + child_cost)
+        return QueryCost(cost, max_depth)
+
+    def iter_fields(self, parent_type, selection_set, visited=frozenset()):
+        """Yield `(field_node, definition, visited)`, expanding fragments.
+
+        `visited` holds the names of the fragments spread on the way to the
+        field; a fragment spread within itself, which validation rejects, is
+        not expanded again.
+        """
+        fields = getattr(parent_type, 'fields', {})
+        for selection in selection_set.selections:
+            if isinstance(selection, Field):
+                name = selection.name.value
+                if name.startswith('__') or name not in fields:
+                    continue
+                yield selection, fields[name], visited
+                continue
+
+            spread = visited
+            if isinstance(selection, FragmentSpread):
+                name = selection.name.value
+                if name in visited:
+                    continue
+                spread = visited | {name}
+                selection = self.fragments.get(name)
+                if selection is None:
+                    continue
+            fragment_type = parent_type
+            if selection.type_condition is not None:
+                fragment_type = self.schema.get_type(
+                    selection.type_condition.name.value) or parent_type
+            yield from self.iter_fields(
+                fragment_type, selection.selection_set, spread)
+
+    def multiplier(self, field, field_type):
+        named_type = get_named_type(field_type.type)
+        if is_connection(named_type):
+            max_limit = graphene_settings.RELAY_CONNECTION_MAX_LIMIT
+            sizes = [
+                self.argument(field, name) for name in ('first', 'last')
+            ]
+            sizes = [size for size in sizes if size is not None]
+            if not sizes:
+                return max_limit
+            return min(max(sizes), max_limit) if max_limit else max(sizes)
+        if is_list(field_type.type):
+            return get_setting('LIST_SIZE')
+        return 1
+
+    def argument(self, field, name):
+        for argument in field.arguments or ():
+            if argument.name.value == name:
+                return value_from_ast(argument.value, GraphQLInt, self.variables)
+        return None
+
+
+def check_query_cost(schema, document_ast, variables=None, operation_name=None):
+    """Measure an operation and raise `GraphQLError` when over budget."""
+    query_cost = QueryCostAnalyzer(
+        schema, document_ast, variables).measure(operation_name)
+
+    max_depth = get_setting('MAX_DEPTH')
+    if max_depth is not None and query_cost.depth > max_depth:
+        raise GraphQLError(
+            f'Query depth {query_cost.depth} exceeds the maximum depth '
+            f'of {max_depth}.',
+            extensions={
+                'code': 'MAX_DEPTH_EXCEEDED',
+                'depth': query_cost.depth,
+                'maxDepth': max_depth,
+            })
+
+    max_cost = get_setting('MAX_COST')
+    if max_cost is not None and query_cost.cost > max_cost:
+        raise GraphQLError(
+            f'Query cost {query_cost.cost} exceeds the maximum cost '
+            f'of {max_cost}.',
+            extensions={
+                'code': 'MAX_COST_EXCEEDED',
+                'cost': query_cost.cost,
+                'maxCost': max_cost,
+            })
+    return query_cost
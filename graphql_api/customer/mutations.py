@@ -61,10 +61,9 @@ class EditUser(graphene.Mutation):
             user.email = User.objects.normalize_email(email)
         if password:
             user.set_password(password)
+        user.save()
 
-
-
-        return CreateUser(user=user)
+        return EditUser(user=user)
 
 class DeleteUser(graphene.Mutation):
     class Arguments:
@@ -26,4 +26,16 @@ mutation createUser($email: String!, $username: String!, $password: String!, $fi
     }
   }
 }
-'''
\ No newline at end of file
+'''
+
+EDIT_USER_MUTATION = \
+'''
+mutation editUser($username: String!, $firstName: String, $password: String) {
+    editUser(username: $username, firstName: $firstName, password: $password) {
+        user {
+            username
+            firstName
+        }
+    }
+}
+'''
@@ -84,3 +84,24 @@ class PrivateUserTest(GraphQLTestCase):
         self.assertEqual("Unit", user_obj.last_name)
         self.assertTrue(user_obj.is_staff)
 
+
+    def test_edit_user(self):
+        user = User.objects.create_user(
+            email='edited@example.com', username='edited')
+
+        resp = self.query(
+            EDIT_USER_MUTATION,
+            op_name='editUser',
+            variables={
+                "username": "edited", "firstName": "Edited",
+                "password": "newPass123"
+            }
+        )
+        content = json.loads(resp.content)
+        user.refresh_from_db()
+
+        self.assertResponseNoErrors(resp)
+        self.assertEqual(content['data']['editUser']['user']['firstName'],
+                         "Edited")
+        self.assertEqual(user.first_name, "Edited")
+        self.assertTrue(user.check_password("newPass123"))
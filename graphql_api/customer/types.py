@@ -1,8 +1,9 @@
 from graphene import relay
 from graphene_django import DjangoObjectType
 from django.contrib.auth import get_user_model
+from ..optimizer import QueryOptimizerMixin
 
-class UserType(DjangoObjectType):
+class UserType(QueryOptimizerMixin, DjangoObjectType):
     class Meta:
         exclude = ('password',)
         interfaces = (relay.Node, )
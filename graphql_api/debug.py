@@ -0,0 +1,80 @@
+"""Per-request debugging of GraphQL operations.
+
+`DjangoDebugMiddleware` and the debug toolbar wrap every resolver and
+database cursor, so they are only switched on for the requests that ask
+for them: operations selecting the `_debug` field, and requests of staff
+members sending the `X-GraphQL-Debug` header.
+"""
+from debug_toolbar.middleware import show_toolbar as default_show_toolbar
+from debug_toolbar.toolbar import DebugToolbar
+from django.contrib.auth import authenticate
+from graphql_jwt.exceptions import JSONWebTokenError
+from graphql.language.ast import (
+    Field, FragmentDefinition, FragmentSpread, OperationDefinition)
+
+DEBUG_HEADER = 'HTTP_X_GRAPHQL_DEBUG'
+DEBUG_FIELD = '_debug'
+
+
+def get_user(request):
+    """Return the user of a request, authenticating a JWT if needed."""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user
+    if 'HTTP_AUTHORIZATION' in request.META:
+        try:
+            return authenticate(request=request)
+        except JSONWebTokenError:
+            return None
+    return None
+
+
+def has_debug_header(request):
+    """Whether a staff member asked for debugging with the debug header."""
+    if not request.META.get(DEBUG_HEADER):
+        return False
+    user = get_user(request)
+    return user is not None and user.is_staff
+
+
+def selects_debug(document_ast, operation_name=None):
+    """Whether the operation selects the `_debug` field of `Query`."""
+    fragments = {
+        definition.name.value: definition
+        for definition in document_ast.definitions
+        if isinstance(definition, FragmentDefinition)
+    }
+
+    def selects(selection_set, seen):
+        for selection in selection_set.selections:
+            if isinstance(selection, Field):
+                if selection.name.value == DEBUG_FIELD:
+                    return True
+                continue
+            if isinstance(selection, FragmentSpread):
+                name = selection.name.value
+                if name in seen or name not in fragments:
+                    continue
+                seen.add(name)
+                selection = fragments[name]
+            if selects(selection.selection_set, seen):
+                return True
+        return False
+
+    for definition in document_ast.definitions:
+        if not isinstance(definition, OperationDefinition):
+            continue
+        if operation_name and (
+                not definition.name or definition.name.value != operation_name):
+            continue
+        if definition.operation == 'query' \
+                and selects(definition.selection_set, set()):
+            return True
+    return False
+
+
+def show_toolbar(request):
+    """`SHOW_TOOLBAR_CALLBACK` limiting the toolbar to debugging requests."""
+    if not default_show_toolbar(request):
+        return False
+    return DebugToolbar.is_toolbar_request(request) or has_debug_header(request)
@@ -0,0 +1,130 @@
+"""JSON encoding and compression of GraphQL responses.
+
+Results are encoded by the callable named by `GRAPHQL_ENCODING['ENCODER']`,
+taking the result and whether to pretty print it. The default, `encode`,
+uses orjson when it is installed and the stdlib `json` module otherwise;
+both write `Decimal`s as strings, like the `Decimal` scalar does.
+
+Responses of `COMPRESS_MIN_LENGTH` bytes or more are compressed with
+brotli, when it is installed, or gzip, whichever the client accepts first
+in that order. Smaller ones gain too little to be worth the CPU.
+"""
+import gzip
+import json
+from decimal import Decimal
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.module_loading import import_string
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULTS = {
+    'ENCODER': 'graphql_api.encoding.encode',
+    'COMPRESS_MIN_LENGTH': 1024,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'GRAPHQL_ENCODING', {}).get(name, DEFAULTS[name])
+
+
+def default(obj):
+    """Encode the values JSON has no type for."""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(
+        f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def encode_json(data, pretty=False):
+    if pretty:
+        return json.dumps(data, sort_keys=True, indent=2,
+                          separators=(',', ': '), default=default)
+    return json.dumps(data, separators=(',', ':'), default=default)
+
+
+def encode_orjson(data, pretty=False):
+    option = orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2 if pretty else 0
+    return orjson.dumps(data, default=default, option=option).decode()
+
+
+def encode(data, pretty=False):
+    if orjson is None:
+        return encode_json(data, pretty)
+    return encode_orjson(data, pretty)
+
+
+def get_encoder():
+    return import_string(get_setting('ENCODER'))
+
+
+def compress_gzip(content):
+    # No timestamp, so equal bodies compress to equal bytes.
+    return gzip.compress(
+        content, compresslevel=get_setting('GZIP_LEVEL'), mtime=0)
+
+
+def compress_brotli(content):
+    return brotli.compress(
+        content, mode=brotli.MODE_TEXT, quality=get_setting('BROTLI_QUALITY'))
+
+
+def get_compressors():
+    """The content codings available, preferred first."""
+    compressors = {}
+    if brotli is not None:
+        compressors['br'] = compress_brotli
+    compressors['gzip'] = compress_gzip
+    return compressors
+
+
+def accepted_codings(request):
+    """The content codings of the `Accept-Encoding` header of `request`."""
+    codings = set()
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, *params = (part.strip() for part in item.split(';'))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            codings.add(coding.lower())
+    return codings
+
+
+def compress_response(request, response):
+    """Compress the body of `response` with a coding `request` accepts."""
+    if response.streaming or response.has_header('Content-Encoding') \
+            or len(response.content) < get_setting('COMPRESS_MIN_LENGTH'):
+        return response
+
+    patch_vary_headers(response, ('Accept-Encoding',))
+    accepted = accepted_codings(request)
+    for coding, compress in get_compressors().items():
+        if coding in accepted or '*' in accepted:
+            break
+    else:
+        return response
+
+    response.content = compress(response.content)
+    response['Content-Length'] = str(len(response.content))
+    response['Content-Encoding'] = coding
+    # The compressed bytes differ from those the strong ETag stands for.
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = f'W/{etag}'
+    return response
@@ -0,0 +1,221 @@
+from collections import defaultdict
+from django.db import connections
+from django.db.models import F, Window
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import RowNumber
+from promise import Promise
+from promise.dataloader import DataLoader
+
+
+class ModelLoader(DataLoader):
+    """Load model instances by primary key, one query per batch."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def batch_load_fn(self, keys):
+        objects = self.model._default_manager.in_bulk(set(keys))
+        return Promise.resolve([objects.get(key) for key in keys])
+
+
+class ReverseForeignKeyLoader(DataLoader):
+    """Load the reverse side of a foreign key, keyed by the parent pk.
+
+    `ReverseForeignKeyLoader(Review, 'product')` resolves `product.reviews`
+    for every product of the batch with a single `product_id IN (...)`.
+    """
+
+    def __init__(self, model, field_name):
+        super().__init__()
+        self.model = model
+        self.field_name = field_name
+        self.attname = model._meta.get_field(field_name).attname
+
+    def batch_load_fn(self, keys):
+        grouped = defaultdict(list)
+        queryset = self.model._default_manager.filter(
+            **{f'{self.attname}__in': set(keys)})
+        for obj in queryset:
+            grouped[getattr(obj, self.attname)].append(obj)
+
+        return Promise.resolve([grouped.get(key, []) for key in keys])
+
+
+class WindowedReverseForeignKeyLoader(DataLoader):
+    """Load one page of the reverse side of a foreign key per parent.
+
+    The rows of every parent are numbered with `ROW_NUMBER() OVER
+    (PARTITION BY <fk> ORDER BY ...)` and only rows `offset + 1` to
+    `offset + limit` are read, so N parents cost one query and at most
+    N * limit rows. `ordering` is a list of `(field, descending)` pairs
+    ending with the primary key, as returned by `get_ordering`.
+    """
+
+    def __init__(self, queryset, field_name, ordering, offset, limit):
+        super().__init__()
+        deferred, defer = queryset.query.deferred_loading
+        if deferred and not defer:
+            queryset = queryset.only(*deferred, field_name)
+        self.queryset = queryset
+        self.attname = queryset.model._meta.get_field(field_name).attname
+        self.ordering = ordering
+        self.offset = offset
+        self.limit = limit
+
+    def batch_load_fn(self, keys):
+        queryset = self.queryset.filter(**{f'{self.attname}__in': set(keys)})
+        order_by = [
+            F(field.attname).desc() if descending else F(field.attname).asc()
+            for field, descending in self.ordering
+        ]
+        connection = connections[queryset.db]
+        if connection.features.supports_over_clause:
+            queryset = queryset.filter(pk__in=self.window(queryset, order_by))
+            rows = queryset.order_by(F(self.attname).asc(), *order_by)
+        else:
+            rows = [
+                row for key in set(keys)
+                for row in queryset.filter(**{self.attname: key})
+                .order_by(*order_by)[self.offset:self.offset + self.limit]
+            ]
+
+        grouped = defaultdict(list)
+        for row in rows:
+            grouped[getattr(row, self.attname)].append(row)
+        return Promise.resolve([grouped.get(key, []) for key in keys])
+
+    def window(self, queryset, order_by):
+        """Subquery of the primary keys of the page of every parent."""
+        # Django cannot filter on a window function, the numbered rows
+        # are filtered in a derived table instead.
+        numbered = queryset.order_by().annotate(page_row=Window(
+            RowNumber(), partition_by=[F(self.attname)], order_by=order_by,
+        )).values('pk', 'page_row')
+        sql, params = numbered.query.get_compiler(queryset.db).as_sql()
+        quote = connections[queryset.db].ops.quote_name
+        pk = quote(queryset.model._meta.pk.column)
+        return RawSQL(
+            f'SELECT numbered.{pk} FROM ({sql}) numbered '
+            f'WHERE numbered.page_row > %s AND numbered.page_row <= %s',
+            (*params, self.offset, self.offset + self.limit))
+
+
+class ManyToManyLoader(DataLoader):
+    """Load the targets of a many-to-many field, keyed by the source pk.
+
+    The through table is joined to the target table so every batch costs
+    one query, no matter how many source rows it covers.
+    """
+
+    def __init__(self, model, field_name):
+        super().__init__()
+        field = model._meta.get_field(field_name)
+        self.through = field.remote_field.through
+        self.source_attname = f'{field.m2m_field_name()}_id'
+        self.target_name = field.m2m_reverse_field_name()
+
+    def batch_load_fn(self, keys):
+        grouped = defaultdict(list)
+        rows = self.through._default_manager \
+            .filter(**{f'{self.source_attname}__in': set(keys)}) \
+            .select_related(self.target_name)
+        for row in rows:
+            grouped[getattr(row, self.source_attname)].append(
+                getattr(row, self.target_name))
+
+        return Promise.resolve([grouped.get(key, []) for key in keys])
+
+
+class LoaderRegistry:
+    """Per-request collection of data loaders.
+
+    Loaders are created lazily and cached by key, so every resolver of a
+    request that asks for the same relation shares one batch queue.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+
+    def get(self, key, factory):
+        loader = self._loaders.get(key)
+        if loader is None:
+            loader = self._loaders[key] = factory()
+        return loader
+
+    def for_model(self, model):
+        return self.get(
+            ('model', model), lambda: ModelLoader(model))
+
+    def for_reverse_fk(self, model, field_name):
+        return self.get(
+            ('reverse_fk', model, field_name),
+            lambda: ReverseForeignKeyLoader(model, field_name))
+
+    def for_reverse_fk_page(self, key, queryset, field_name, ordering,
+                            offset, limit):
+        return self.get(
+            ('reverse_fk_page', key, field_name, offset, limit),
+            lambda: WindowedReverseForeignKeyLoader(
+                queryset, field_name, ordering, offset, limit))
+
+    def for_m2m(self, model, field_name):
+        return self.get(
+            ('m2m', model, field_name),
+            lambda: ManyToManyLoader(model, field_name))
+
+
+def get_loaders(info):
+    """Return the loader registry attached to the request context."""
+    context = info.context
+    loaders = getattr(context, 'loaders', None)
+    if loaders is None:
+        loaders = LoaderRegistry()
+        context.loaders = loaders
+    return loaders
+
+
+def load_related(info, instance, field_name):
+    """Resolve a relation of `instance` through the request's loaders.
+
+    Relations already populated by `select_related`/`prefetch_related` are
+    returned as is, everything else is batched with the relation's siblings.
+    """
+    model = type(instance)
+    field = model._meta.get_field(field_name)
+    loaders = get_loaders(info)
+
+    if field.many_to_one or (field.one_to_one and field.concrete):
+        if field.is_cached(instance):
+            return field.get_cached_value(instance)
+        key = getattr(instance, field.attname)
+        if key is None:
+            return None
+        return loaders.for_model(field.related_model).load(key)
+
+    accessor = field.get_accessor_name() if field.auto_created else field_name
+    prefetched = getattr(instance, '_prefetched_objects_cache', {})
+    if accessor in prefetched:
+        return list(prefetched[accessor])
+
+    if field.many_to_many and field.concrete:
+        loader = loaders.for_m2m(model, field_name)
+    else:
+        loader = loaders.for_reverse_fk(
+            field.related_model, field.remote_field.name)
+    return loader.load(instance.pk)
+
+
+def load_related_page(info, instance, field_name, queryset, ordering,
+                      offset, limit):
+    """Load `limit` rows of a reverse foreign key of `instance` from `offset`.
+
+    `queryset` holds the related rows, already planned for the selection.
+    Siblings resolving the same field of the query share one windowed
+    batch, see `WindowedReverseForeignKeyLoader`.
+    """
+    field = type(instance)._meta.get_field(field_name)
+    selection = tuple(map(id, info.field_asts))
+    loader = get_loaders(info).for_reverse_fk_page(
+        selection, queryset, field.remote_field.name, ordering, offset, limit)
+    return loader.load(instance.pk)
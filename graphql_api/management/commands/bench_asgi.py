@@ -0,0 +1,171 @@
+import asyncio
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management.base import BaseCommand
+from django.db.backends.signals import connection_created
+from django.test import Client, override_settings
+from django.urls import path
+from django.views.decorators.csrf import csrf_exempt
+from graphql_jwt.shortcuts import get_token
+from graphql_api.views import AsyncStorefrontGraphQLView, StorefrontGraphQLView
+
+# The command doubles as the URLconf of the benchmark.
+urlpatterns = [
+    path('graphql/sync', csrf_exempt(StorefrontGraphQLView.as_view())),
+    path('graphql/async', csrf_exempt(AsyncStorefrontGraphQLView.as_view())),
+]
+
+STOREFRONT_QUERY = '''
+query storefront {
+  collections(first: 10) {
+    edges { node { title products(first: 5) { edges { node { title } } } } }
+  }
+  allProducts(first: 20, orderBy: "effective_price") {
+    edges { node { title unitPrice inventory } }
+  }
+}
+'''
+
+
+class Command(BaseCommand):
+    help = ('Load test /graphql through the WSGI handler and the sync view '
+            'against the ASGI handler and the async view.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=400)
+        parser.add_argument('--concurrency', type=int, default=32,
+                            help='Clients sending requests at once.')
+        parser.add_argument('--wsgi-threads', type=int, default=1,
+                            help='Threads of the WSGI worker.')
+        parser.add_argument('--latency-ms', type=float, default=2.0,
+                            help='Simulated database round-trip per query.')
+        parser.add_argument('--connect-ms', type=float, default=5.0,
+                            help='Simulated cost of opening a connection.')
+
+    def handle(self, *args, **options):
+        latency = options['latency_ms'] / 1000
+        connect_latency = options['connect_ms'] / 1000
+        self.connections = []
+
+        def delay(execute, sql, params, many, context):
+            time.sleep(latency)
+            return execute(sql, params, many, context)
+
+        def add_delay(sender, connection, **kwargs):
+            # A TCP and authentication handshake, which SQLite has not.
+            self.connections.append(connection.alias)
+            time.sleep(connect_latency)
+            # The wrapper outlives reconnections of the same thread.
+            if delay not in connection.execute_wrappers:
+                connection.execute_wrappers.append(delay)
+
+        user, _ = get_user_model().objects.get_or_create(
+            username='bench-asgi', defaults={'email': 'bench-asgi@example.com'})
+        # Authenticated requests skip the response cache.
+        self.token = get_token(user)
+        self.body = json.dumps({'query': STOREFRONT_QUERY}).encode()
+
+        connection_created.connect(add_delay)
+        try:
+            with override_settings(ROOT_URLCONF=__name__,
+                                   ALLOWED_HOSTS=['*']):
+                self.report('wsgi', *self.run_wsgi(
+                    options['requests'], options['concurrency'],
+                    options['wsgi_threads']))
+                self.report('asgi', *asyncio.run(self.run_asgi(
+                    options['requests'], options['concurrency'])))
+        finally:
+            connection_created.disconnect(add_delay)
+
+    def report(self, label, latencies, elapsed):
+        p50 = statistics.median(latencies)
+        p99 = statistics.quantiles(latencies, n=100)[98]
+        connections = len(self.connections) / len(latencies)
+        self.stdout.write(
+            f'{label}  {len(latencies) / elapsed:8.1f} requests/s  '
+            f'p50 {p50 * 1000:7.1f} ms  p99 {p99 * 1000:7.1f} ms  '
+            f'{connections:5.2f} connections/request')
+        self.connections = []
+
+    def run_wsgi(self, requests, concurrency, threads):
+        """`concurrency` clients queueing on a worker of `threads` threads."""
+        def handle():
+            response = Client().post(
+                '/graphql/sync', self.body, content_type='application/json',
+                HTTP_AUTHORIZATION=f'JWT {self.token}')
+            assert b'"errors"' not in response.content, response.content
+
+        def client(count):
+            latencies = []
+            for _ in range(count):
+                start = perf_counter()
+                worker.submit(handle).result()
+                latencies.append(perf_counter() - start)
+            return latencies
+
+        start = perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as worker, \
+                ThreadPoolExecutor(max_workers=concurrency) as clients:
+            latencies = [
+                latency
+                for part in clients.map(client, split(requests, concurrency))
+                for latency in part
+            ]
+        return latencies, perf_counter() - start
+
+    async def run_asgi(self, requests, concurrency):
+        """`concurrency` clients sending to one event loop."""
+        handler = ASGIHandler()
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'POST',
+            'scheme': 'http',
+            'path': '/graphql/async',
+            'query_string': b'',
+            'headers': [
+                (b'host', b'localhost'),
+                (b'content-type', b'application/json'),
+                (b'authorization', f'JWT {self.token}'.encode()),
+            ],
+        }
+
+        async def send_request():
+            messages = []
+
+            async def receive():
+                return {'type': 'http.request', 'body': self.body}
+
+            async def send(message):
+                messages.append(message)
+
+            await handler(dict(scope), receive, send)
+            body = b''.join(message.get('body', b'') for message in messages
+                            if message['type'] == 'http.response.body')
+            assert b'"errors"' not in body, body
+
+        async def client(count):
+            latencies = []
+            for _ in range(count):
+                start = perf_counter()
+                await send_request()
+                latencies.append(perf_counter() - start)
+            return latencies
+
+        start = perf_counter()
+        parts = await asyncio.gather(
+            *(client(count) for count in split(requests, concurrency)))
+        return [latency for part in parts for latency in part], \
+            perf_counter() - start
+
+
+def split(requests, clients):
+    """Share `requests` between `clients` as evenly as possible."""
+    return [requests // clients + (index < requests % clients)
+            for index in range(clients)]
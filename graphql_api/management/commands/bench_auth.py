@@ -0,0 +1,53 @@
+from time import perf_counter
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from graphql_jwt.middleware import JSONWebTokenMiddleware
+from graphql_jwt.shortcuts import get_token
+from graphql_api.auth import tokens
+from graphql_api.schema import schema
+
+ME_QUERY = '{ me { username } }'
+BACKENDS = (
+    ('uncached', 'graphql_jwt.backends.JSONWebTokenBackend'),
+    ('cached', 'graphql_api.auth.CachedJSONWebTokenBackend'),
+)
+
+
+class Command(BaseCommand):
+    help = ('Measure the latency of JWT authenticated requests with the '
+            'stock and the cached authentication backend.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+
+    def handle(self, *args, **options):
+        user, _ = get_user_model().objects.get_or_create(
+            username='bench-auth', defaults={'email': 'bench-auth@example.com'})
+        headers = {'HTTP_AUTHORIZATION': f'JWT {get_token(user)}'}
+        factory = RequestFactory()
+        count = options['requests']
+
+        def execute():
+            request = factory.post('/graphql', **headers)
+            request.user = AnonymousUser()
+            result = schema.execute(
+                ME_QUERY, context=request,
+                middleware=[JSONWebTokenMiddleware()])
+            assert not result.errors, result.errors
+
+        for label, backend in BACKENDS:
+            tokens.clear()
+            with override_settings(AUTHENTICATION_BACKENDS=[
+                    backend, 'django.contrib.auth.backends.ModelBackend']):
+                with CaptureQueriesContext(connection) as queries:
+                    start = perf_counter()
+                    for _ in range(count):
+                        execute()
+                    elapsed = perf_counter() - start
+            self.stdout.write(
+                f'{label:<9} {elapsed / count * 1000:8.3f} ms/request '
+                f'{len(queries) / count:6.2f} queries/request')
@@ -0,0 +1,73 @@
+from time import perf_counter
+from decimal import Decimal
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from graphene_django.debug import DjangoDebugMiddleware
+from graphql_jwt.middleware import JSONWebTokenMiddleware
+from store.models import Collection, Product
+from graphql_api.schema import schema
+
+PRODUCTS_QUERY = '''
+query products($first: Int) {
+  allProducts(first: $first) {
+    edges { node { id title slug unitPrice inventory collection { id title } } }
+  }
+}
+'''
+
+
+class Command(BaseCommand):
+    help = ('Measure resolver throughput with DjangoDebugMiddleware always on, '
+            'as before, and added only for debug requests.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=100,
+                            help='Products per query (seeded if missing).')
+        parser.add_argument('--requests', type=int, default=200)
+
+    def handle(self, *args, **options):
+        self.seed(options['products'])
+        variables = {'first': options['products']}
+        factory = RequestFactory()
+
+        def execute(middleware):
+            request = factory.post('/graphql')
+            request.user = AnonymousUser()
+            result = schema.execute(
+                PRODUCTS_QUERY, variables=variables, context=request,
+                middleware=middleware)
+            assert not result.errors, result.errors
+            return result
+
+        # `allProducts` and `edges`, then `node`, its six fields and the two
+        # collection fields of every edge.
+        rows = len(execute([]).data['allProducts']['edges'])
+        resolvers = 2 + rows * (1 + 6 + 2)
+
+        cases = (
+            ('always on', lambda: [DjangoDebugMiddleware(),
+                                   JSONWebTokenMiddleware()]),
+            ('per request', lambda: [JSONWebTokenMiddleware()]),
+        )
+        for label, middleware in cases:
+            start = perf_counter()
+            for _ in range(options['requests']):
+                execute(middleware())
+            elapsed = perf_counter() - start
+            self.stdout.write(
+                f'{label:<12} {elapsed / options["requests"] * 1000:8.2f} ms/request '
+                f'{resolvers * options["requests"] / elapsed:12.0f} resolvers/s')
+
+    def seed(self, products):
+        missing = products - Product.objects.count()
+        if missing <= 0:
+            return
+
+        collection, _ = Collection.objects.get_or_create(title='Benchmark')
+        Product.objects.bulk_create(
+            Product(title=f'Benchmark product {i}', slug=f'benchmark-{i}',
+                    unit_price=Decimal(i % 1000) + 1, inventory=10,
+                    collection=collection)
+            for i in range(missing)
+        )
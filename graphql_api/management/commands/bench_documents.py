@@ -0,0 +1,58 @@
+from time import perf_counter
+from django.core.management.base import BaseCommand
+from graphql.backend.core import GraphQLCoreBackend
+from graphql import validate
+from graphql_api.backend import CachedDocumentBackend
+from graphql_api.schema import schema
+
+STOREFRONT_QUERY = '''
+query storefront($first: Int, $after: String, $collectionId: ID) {
+  collections {
+    edges { node { id title featuredProduct { id title unitPrice } } }
+  }
+  allProducts(first: $first, after: $after, collectionId: $collectionId,
+              orderBy: "unitPrice") {
+    pageInfo { hasNextPage endCursor }
+    edges {
+      cursor
+      node {
+        id title slug description unitPrice inventory lastUpdate
+        collection { id title }
+        promotions { edges { node { id description discount } } }
+        reviews { edges { node { id name date } } }
+      }
+    }
+  }
+}
+'''
+
+
+class Command(BaseCommand):
+    help = ('Measure the per-request parse and validation overhead of a '
+            'storefront query with the document cache on and off.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        requests = options['requests']
+        uncached = GraphQLCoreBackend()
+        cached = CachedDocumentBackend()
+
+        def without_cache():
+            # The core backend parses here and validates on execution.
+            document = uncached.document_from_string(schema, STOREFRONT_QUERY)
+            validate(schema, document.document_ast)
+
+        def with_cache():
+            cached.document_from_string(schema, STOREFRONT_QUERY)
+
+        for label, run in (('cache off', without_cache), ('cache on', with_cache)):
+            start = perf_counter()
+            for _ in range(requests):
+                run()
+            elapsed = perf_counter() - start
+            self.stdout.write(
+                f'{label:<10} {elapsed / requests * 1_000_000:10.1f} us/request')
+
+        self.stdout.write(f'document cache: {cached.cache_info()}')
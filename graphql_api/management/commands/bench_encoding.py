@@ -0,0 +1,69 @@
+from itertools import cycle, islice
+from statistics import median
+from time import perf_counter
+from django.core.management.base import BaseCommand, CommandError
+from graphql_relay import to_global_id
+from store.models import Product
+from graphql_api import encoding
+
+SIZES = [100, 1000, 10000]
+
+
+class Command(BaseCommand):
+    help = ('Measure the encoding time and the compressed size of '
+            'allProducts pages. Load seed.sql first, its products are '
+            'repeated to fill the larger pages.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('sizes', nargs='*', type=int, default=SIZES)
+
+    def handle(self, *args, **options):
+        rows = list(Product.objects.order_by('pk').values(
+            'pk', 'title', 'description', 'unit_price', 'inventory',
+            'collection__title'))
+        if not rows:
+            raise CommandError('No products, load seed.sql first.')
+
+        encoders = [('json', encoding.encode_json)]
+        if encoding.orjson is not None:
+            encoders.append(('orjson', encoding.encode_orjson))
+        compressors = encoding.get_compressors()
+        repeat = options['repeat']
+
+        for size in options['sizes']:
+            page = self.page(islice(cycle(rows), size))
+            for label, encode in encoders:
+                elapsed, body = self.measure(lambda: encode(page), repeat)
+                self.stdout.write(
+                    f'{size:6} nodes  encode {label:<7} '
+                    f'{elapsed * 1000:8.2f} ms {len(body.encode()):10} bytes')
+            body = encoding.encode(page).encode()
+            for coding, compress in compressors.items():
+                elapsed, compressed = self.measure(
+                    lambda: compress(body), repeat)
+                self.stdout.write(
+                    f'{size:6} nodes  {coding:<14} '
+                    f'{elapsed * 1000:8.2f} ms {len(compressed):10} bytes '
+                    f'{len(compressed) / len(body):6.1%}')
+
+    def page(self, rows):
+        """The result of an allProducts query for `rows`."""
+        return {'data': {'allProducts': {'edges': [{'node': {
+            'id': to_global_id('ProductType', row['pk']),
+            'title': row['title'],
+            'description': row['description'],
+            # As serialized by the `Decimal` scalar.
+            'unitPrice': str(row['unit_price']),
+            'inventory': row['inventory'],
+            'collection': {'title': row['collection__title']},
+        }} for row in rows]}}}
+
+    def measure(self, run, repeat):
+        """Median seconds of `run` and its last result."""
+        times = []
+        for _ in range(repeat):
+            start = perf_counter()
+            result = run()
+            times.append(perf_counter() - start)
+        return median(times), result
@@ -0,0 +1,72 @@
+from decimal import Decimal
+from statistics import median
+from time import perf_counter
+from django.core.management.base import BaseCommand
+from store.models import Collection, Product
+from graphql_api.pagination import encode_cursor, get_ordering, keyset_page
+
+
+class Command(BaseCommand):
+    help = 'Compare offset and keyset pagination of products on a large table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000,
+                            help='Products to have in the table (seeded if missing).')
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--page', type=int, default=1000,
+                            help='Deep page compared against page 1.')
+        parser.add_argument('--order-by', default='unit_price')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        self.seed(options['rows'])
+
+        size = options['page_size']
+        offset = (options['page'] - 1) * size
+        queryset = Product.objects.order_by(options['order_by'])
+        ordering = get_ordering(queryset)
+        ordered = queryset.order_by(*[
+            f'{"-" if descending else ""}{field.attname}'
+            for field, descending in ordering
+        ])
+        cursor = encode_cursor(ordering, ordered[offset - 1]) if offset else None
+
+        def offset_page(start):
+            ordered.count()
+            return list(ordered[start:start + size])
+
+        cases = [
+            ('offset', 1, lambda: offset_page(0)),
+            ('offset', options['page'], lambda: offset_page(offset)),
+            ('keyset', 1, lambda: keyset_page(queryset, ordering, first=size)),
+            ('keyset', options['page'], lambda: keyset_page(
+                queryset, ordering, first=size, after=cursor)),
+        ]
+        for strategy, page, run in cases:
+            timings = []
+            for _ in range(options['repeat']):
+                start = perf_counter()
+                run()
+                timings.append((perf_counter() - start) * 1000)
+            self.stdout.write(
+                f'{strategy:<8} page {page:>6}: {median(timings):9.2f} ms')
+
+    def seed(self, rows):
+        missing = rows - Product.objects.count()
+        if missing <= 0:
+            return
+
+        self.stdout.write(f'Seeding {missing} products...')
+        collection, _ = Collection.objects.get_or_create(title='Benchmark')
+        start = Product.objects.count()
+        for chunk in range(start, rows, 10_000):
+            Product.objects.bulk_create([
+                Product(
+                    title=f'Benchmark product {index}',
+                    slug=f'benchmark-product-{index}',
+                    unit_price=Decimal(index % 900_000) / 100 + 1,
+                    inventory=index % 100,
+                    collection=collection,
+                )
+                for index in range(chunk, min(chunk + 10_000, rows))
+            ])
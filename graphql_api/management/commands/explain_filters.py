@@ -0,0 +1,102 @@
+import re
+from itertools import combinations
+from django.core.management.base import BaseCommand, CommandError
+from graphql_api.pagination import get_ordering, ordering_expression
+from graphql_api.store.filters import ProductFilter, ReviewFilter, PromotionFilter
+
+# Plan fragments meaning "rows are sorted after being read" and "every row
+# of the table is read", for MySQL, SQLite and PostgreSQL.
+FILESORT_PATTERNS = [
+    re.compile(r'Using filesort'),
+    re.compile(r'USE TEMP B-TREE FOR ORDER BY'),
+    re.compile(r'Sort Key'),
+]
+FULL_SCAN_PATTERNS = [
+    re.compile(r'\bALL\b'),
+    re.compile(r'\bSCAN \w+\s*$', re.MULTILINE),
+    re.compile(r'Seq Scan'),
+]
+
+# The queries the API runs always narrow reviews down to one product.
+BASE_QUERYSETS = {
+    ReviewFilter: lambda model, sample: model.objects.filter(
+        product_id=sample.product_id),
+}
+
+
+class Command(BaseCommand):
+    help = ('Run EXPLAIN on the query of every filter and ordering combination '
+            'of the GraphQL filtersets and flag filesorts and full scans.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--fail', action='store_true',
+                            help='Exit with an error when a plan is flagged.')
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        flagged = 0
+        for filterset_class in (ProductFilter, ReviewFilter, PromotionFilter):
+            flagged += self.explain_filterset(filterset_class, options)
+
+        if flagged and options['fail']:
+            raise CommandError(f'{flagged} query plans were flagged.')
+        self.stdout.write(f'{flagged} query plans were flagged.')
+
+    def explain_filterset(self, filterset_class, options):
+        model = filterset_class._meta.model
+        sample = model.objects.order_by('?').first()
+        if sample is None:
+            self.stdout.write(self.style.WARNING(
+                f'{model.__name__}: no rows to sample filter values from.'))
+            return 0
+
+        base = BASE_QUERYSETS.get(
+            filterset_class, lambda model, sample: model.objects.all())
+        filters = {
+            name: getattr(sample, f.field_name)
+            for name, f in filterset_class.base_filters.items()
+            if name != 'order_by'
+        }
+        order_fields = list(
+            filterset_class.base_filters['order_by'].param_map)
+        orderings = [None] + order_fields + [f'-{f}' for f in order_fields]
+
+        flagged = 0
+        for size in range(len(filters) + 1):
+            for names in combinations(filters, size):
+                for order_by in orderings:
+                    data = {name: filters[name] for name in names}
+                    if order_by:
+                        data['order_by'] = order_by
+                    queryset = filterset_class(
+                        data=data, queryset=base(model, sample)).qs
+                    flagged += self.explain(
+                        model, data, queryset, options['page_size'])
+        return flagged
+
+    def explain(self, model, data, queryset, page_size):
+        ordering = get_ordering(queryset)
+        queryset = queryset.order_by(*[
+            ordering_expression(field, descending)
+            for field, descending in ordering
+        ])[:page_size]
+        plan = queryset.explain()
+
+        problems = []
+        if any(pattern.search(plan) for pattern in FILESORT_PATTERNS):
+            problems.append('filesort')
+        if any(pattern.search(plan) for pattern in FULL_SCAN_PATTERNS):
+            problems.append('full scan')
+
+        label = '{} ({})'.format(model.__name__, ', '.join(
+            f'{name}={value}' for name, value in data.items()) or 'no filters')
+        if problems:
+            self.stdout.write(self.style.WARNING(
+                f'{label}: {", ".join(problems)}'))
+        else:
+            self.stdout.write(f'{label}: ok')
+        if self.verbosity > 1 or problems:
+            for line in plan.splitlines():
+                self.stdout.write(f'    {line}')
+        return 1 if problems else 0
@@ -0,0 +1,155 @@
+from collections import OrderedDict
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch, QuerySet
+from graphene.relay import Connection
+from graphene.utils.str_converters import to_snake_case
+from graphene_django.utils import maybe_queryset
+from graphql.language import ast
+from graphql.type.definition import (
+    GraphQLInterfaceType, GraphQLUnionType, get_named_type)
+
+
+def applies_to(info, type_condition, type_name):
+    """Whether a fragment on `type_condition` selects on `type_name`."""
+    if type_condition is None or type_name is None:
+        return True
+    condition = type_condition.name.value
+    if condition == type_name:
+        return True
+    abstract_type = info.schema.get_type(condition)
+    if not isinstance(abstract_type, (GraphQLInterfaceType, GraphQLUnionType)):
+        return False
+    return info.schema.is_possible_type(
+        abstract_type, info.schema.get_type(type_name))
+
+
+def iter_fields(info, selection_set, type_name=None):
+    """Yield the field nodes of a selection set, expanding fragments.
+
+    Fragments on other types than `type_name` are skipped, when given.
+    """
+    if selection_set is None:
+        return
+    for selection in selection_set.selections:
+        if isinstance(selection, ast.FragmentSpread):
+            selection = info.fragments[selection.name.value]
+        if isinstance(selection, (ast.FragmentDefinition, ast.InlineFragment)):
+            if applies_to(info, selection.type_condition, type_name):
+                yield from iter_fields(
+                    info, selection.selection_set, type_name)
+        else:
+            yield selection
+
+
+def group_fields(info, field_nodes, type_name=None):
+    """Group the sub-selections of `field_nodes` by snake_case field name."""
+    grouped = OrderedDict()
+    for node in field_nodes:
+        for field in iter_fields(info, node.selection_set, type_name):
+            name = to_snake_case(field.name.value)
+            grouped.setdefault(name, []).append(field)
+    return grouped
+
+
+def unwrap_connection(info, field_nodes):
+    """Return the `edges { node }` field nodes of a relay connection."""
+    edges = group_fields(info, field_nodes).get('edges', [])
+    return group_fields(info, edges).get('node', [])
+
+
+class QueryPlan:
+    """The `only`, `select_related` and `prefetch_related` calls of a query."""
+
+    def __init__(self):
+        self.only = set()
+        self.select_related = set()
+        self.prefetch_related = []
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        return queryset.only(*self.only)
+
+
+def build_plan(object_type, info, field_nodes, plan=None, prefix=''):
+    """Walk the selection of `object_type` and record what it needs loaded.
+
+    Scalar fields become `only()` columns, forward foreign keys are joined
+    with `select_related` and to-many relations get a `Prefetch` whose
+    queryset is planned from its own sub-selection. Fields that are not
+    model fields may declare the columns they read in `optimizer_hints`,
+    and relations listed in `optimizer_paginated` are left to resolvers
+    that load them a page at a time.
+    """
+    plan = plan or QueryPlan()
+    model = object_type._meta.model
+    registry = object_type._meta.registry
+    hints = getattr(object_type, 'optimizer_hints', {})
+    paginated = getattr(object_type, 'optimizer_paginated', ())
+    plan.only.add(prefix + model._meta.pk.name)
+
+    fields = group_fields(info, field_nodes, object_type._meta.name)
+    for name, nodes in fields.items():
+        for hint in hints.get(name, ()):
+            plan.only.add(prefix + hint)
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            continue
+
+        if not field.is_relation:
+            plan.only.add(prefix + field.name)
+            continue
+
+        related_type = registry.get_type_for_model(field.related_model)
+        if field.many_to_one or (field.one_to_one and field.concrete):
+            plan.only.add(prefix + field.name)
+            if related_type is not None:
+                plan.select_related.add(prefix + field.name)
+                build_plan(related_type, info, nodes, plan,
+                           prefix=f'{prefix}{field.name}__')
+            continue
+
+        if related_type is None or name in paginated \
+                or not (field.many_to_many or field.one_to_many):
+            continue
+        related_nodes = unwrap_connection(info, nodes) or nodes
+        related_plan = build_plan(related_type, info, related_nodes)
+        if field.one_to_many:
+            related_plan.only.add(field.remote_field.name)
+        accessor = field.get_accessor_name() \
+            if field.auto_created else field.name
+        plan.prefetch_related.append(Prefetch(
+            prefix + accessor,
+            queryset=related_plan.apply(field.related_model._default_manager.all())
+        ))
+
+    return plan
+
+
+class QueryOptimizerMixin:
+    """Load exactly what the GraphQL selection asks for.
+
+    Mix into a `DjangoObjectType` to turn the selection set of the field
+    being resolved into `select_related`, `prefetch_related` and `only`
+    calls on the queryset passed to `get_queryset`.
+    """
+
+    @classmethod
+    def get_queryset(cls, queryset, info):
+        queryset = super().get_queryset(maybe_queryset(queryset), info)
+        if not isinstance(queryset, QuerySet) \
+                or queryset._result_cache is not None:
+            return queryset
+
+        field_nodes = info.field_asts
+        return_type = get_named_type(info.return_type)
+        graphene_type = getattr(return_type, 'graphene_type', None)
+        if graphene_type is not None and issubclass(graphene_type, Connection):
+            field_nodes = unwrap_connection(info, field_nodes)
+        if not field_nodes:
+            return queryset
+
+        return build_plan(cls, info, field_nodes).apply(queryset)
@@ -0,0 +1,294 @@
+import base64
+import binascii
+import json
+import graphene
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F, Q, QuerySet
+from graphene import relay
+from graphene.relay import PageInfo
+from graphql_relay.connection.arrayconnection import (
+    cursor_to_offset, offset_to_cursor)
+from graphene_django.filter import DjangoFilterConnectionField
+from graphene_django.settings import graphene_settings
+from graphene_django.utils import maybe_queryset
+from graphql import GraphQLError
+from .cache import model_tag, record_tags
+from .loaders import load_related_page
+
+
+class CountableConnection(relay.Connection):
+    """Relay connection with an opt-in `totalCount` field.
+
+    The count query only runs when a client selects `totalCount`.
+    """
+    class Meta:
+        abstract = True
+
+    total_count = graphene.Int()
+
+    def resolve_total_count(root, info):
+        # Pages that know the size of their list up front pass it along.
+        if root.total_count is not None:
+            return root.total_count
+        iterable = root.iterable
+        if isinstance(iterable, QuerySet):
+            return iterable.count()
+        return len(iterable)
+
+
+def get_ordering(queryset):
+    """Return the `(field, descending)` pairs that totally order `queryset`.
+
+    The queryset's own ordering (or the model's default ordering) is used
+    and the primary key is appended as a tie-breaker.
+    """
+    opts = queryset.model._meta
+    ordering = []
+    for name in queryset.query.order_by or opts.ordering:
+        if not isinstance(name, str):
+            raise GraphQLError('Only field orderings can be paginated.')
+        descending = name.startswith('-')
+        name = name.lstrip('-')
+        try:
+            field = opts.pk if name == 'pk' else opts.get_field(name)
+        except FieldDoesNotExist:
+            raise GraphQLError(f'Cannot paginate on "{name}".')
+        ordering.append((field, descending))
+        if field.primary_key:
+            return ordering
+
+    descending = ordering[-1][1] if ordering else False
+    ordering.append((opts.pk, descending))
+    return ordering
+
+
+def encode_cursor(ordering, instance):
+    """Encode the ordering values of `instance` as an opaque cursor."""
+    payload = {
+        'fields': [field.name for field, _ in ordering],
+        'values': [getattr(instance, field.attname) for field, _ in ordering],
+    }
+    data = json.dumps(payload, default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(ordering, cursor):
+    """Decode a cursor made by `encode_cursor` for the same ordering."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if payload['fields'] != [field.name for field, _ in ordering]:
+            raise ValueError(cursor)
+        return [field.to_python(value)
+                for (field, _), value in zip(ordering, payload['values'])]
+    except (binascii.Error, KeyError, TypeError, ValueError, ValidationError):
+        raise GraphQLError('Invalid cursor.')
+
+
+def ordering_expression(field, descending):
+    """The ordering of `field` that `seek` expects.
+
+    NULLs come before every value in either direction, as MySQL and SQLite
+    sort them without being asked.
+    """
+    if not field.null:
+        return f'{"-" if descending else ""}{field.attname}'
+    if descending:
+        return F(field.attname).desc(nulls_last=True)
+    return F(field.attname).asc(nulls_first=True)
+
+
+def compare(field, lookup, value):
+    """Filter `field` by `lookup` against `value`, None if nothing matches.
+
+    NULL is the smallest value of a nullable field, see
+    `ordering_expression`.
+    """
+    if value is None:
+        return {
+            'exact': Q(**{f'{field.attname}__isnull': True}),
+            'gt': Q(**{f'{field.attname}__isnull': False}),
+            'gte': Q(),
+            'lt': None,
+            'lte': Q(**{f'{field.attname}__isnull': True}),
+        }[lookup]
+    condition = Q(**{f'{field.attname}__{lookup}': value})
+    if field.null and lookup in ('lt', 'lte'):
+        condition |= Q(**{f'{field.attname}__isnull': True})
+    return condition
+
+
+def seek(ordering, values, reverse=False):
+    """Build the filter selecting the rows that come after `values`.
+
+    `(a, id) > (x, y)` is expanded to `a >= x AND (a > x OR (a = x AND
+    id > y))`, the leading bound lets the database range-scan the index
+    on the first ordering column.
+    """
+    condition = Q()
+    equal = Q()
+    for (field, descending), value in zip(ordering, values):
+        lookup = 'lt' if descending != reverse else 'gt'
+        after = compare(field, lookup, value)
+        if after is not None:
+            condition |= equal & after
+        equal &= compare(field, 'exact', value)
+
+    field, descending = ordering[0]
+    bound = 'lte' if descending != reverse else 'gte'
+    return compare(field, bound, values[0]) & condition
+
+
+def keyset_page(queryset, ordering, first=None, last=None,
+                after=None, before=None):
+    """Return `(rows, has_previous_page, has_next_page)` for one page.
+
+    Only `first + 1` (or `last + 1`) rows are read, whatever the page.
+    """
+    queryset = queryset.order_by(*[
+        ordering_expression(field, descending)
+        for field, descending in ordering
+    ])
+    deferred, defer = queryset.query.deferred_loading
+    if deferred and not defer:
+        queryset = queryset.only(
+            *deferred, *[field.name for field, _ in ordering])
+
+    if after:
+        queryset = queryset.filter(seek(ordering, decode_cursor(ordering, after)))
+    if before:
+        queryset = queryset.filter(
+            seek(ordering, decode_cursor(ordering, before), reverse=True))
+
+    if last is not None and first is None:
+        rows = list(queryset.reverse()[:last + 1])
+        return rows[:last][::-1], len(rows) > last, bool(before)
+    if first is None:
+        return list(queryset), bool(after), False
+
+    rows = list(queryset[:first + 1])
+    return rows[:first], bool(after), len(rows) > first
+
+
+class KeysetConnectionField(DjangoFilterConnectionField):
+    """Filter connection paginated by seeking instead of offsetting.
+
+    Cursors carry the ordering tuple of the row they point at, e.g.
+    `(unit_price, id)` when ordered by `unitPrice`, so every page is read
+    with an indexed range scan and no `COUNT(*)`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._base_args.pop('offset', None)
+
+    @classmethod
+    def resolve_queryset(cls, connection, iterable, info, args, **kwargs):
+        queryset = super().resolve_queryset(
+            connection, iterable, info, args, **kwargs)
+        # The rows of a list change whenever any row of the model does.
+        record_tags(info, model_tag(queryset.model))
+        return queryset
+
+    @classmethod
+    def resolve_connection(cls, connection, args, iterable, max_limit=None):
+        iterable = maybe_queryset(iterable)
+        if not isinstance(iterable, QuerySet):
+            return super().resolve_connection(
+                connection, args, iterable, max_limit=max_limit)
+
+        ordering = get_ordering(iterable)
+        first, last = args.get('first'), args.get('last')
+        for name, value in (('first', first), ('last', last)):
+            if value is not None and value < 0:
+                raise GraphQLError(
+                    f'Argument "{name}" must be a non-negative integer.')
+        if first is None and last is None:
+            first = max_limit
+        rows, has_previous_page, has_next_page = keyset_page(
+            iterable, ordering, first=first, last=last,
+            after=args.get('after'), before=args.get('before'))
+
+        edges = [
+            connection.Edge(node=row, cursor=encode_cursor(ordering, row))
+            for row in rows
+        ]
+        page = connection(
+            edges=edges,
+            page_info=PageInfo(
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=edges[-1].cursor if edges else None,
+                has_previous_page=has_previous_page,
+                has_next_page=has_next_page,
+            )
+        )
+        page.iterable = iterable
+        return page
+
+
+def offset_page(queryset, first, after=None):
+    """Return `(rows, cursors, has_next_page)` for one forward page.
+
+    For orderings that cannot be seeked, such as search relevance. Only
+    `first + 1` rows are read and no `COUNT(*)` is run.
+    """
+    offset = 0
+    if after:
+        offset = cursor_to_offset(after)
+        if offset is None or offset < 0:
+            raise GraphQLError('Invalid cursor.')
+        offset += 1
+
+    rows = list(queryset[offset:offset + first + 1])
+    cursors = [offset_to_cursor(offset + index)
+               for index in range(min(len(rows), first))]
+    return rows[:first], cursors, len(rows) > first
+
+
+def related_page(node_type, info, instance, field_name, first=None,
+                 after=None, last=None, before=None, total_count=None):
+    """Resolve a connection over the reverse foreign key `field_name`.
+
+    Instead of prefetching every related row of every parent, each parent
+    reads the `first + 1` rows after its `after` offset cursor, and the
+    parents of a batch share one query. Paging is forward only.
+    """
+    if last is not None or before is not None:
+        raise GraphQLError(f'{field_name} can only be paginated forward.')
+    max_limit = graphene_settings.RELAY_CONNECTION_MAX_LIMIT
+    if first is None or (max_limit and first > max_limit):
+        first = max_limit
+    if first < 0:
+        raise GraphQLError('Argument "first" must be a non-negative integer.')
+
+    offset = 0
+    if after:
+        offset = cursor_to_offset(after)
+        if offset is None or offset < 0:
+            raise GraphQLError('Invalid cursor.')
+        offset += 1
+
+    related = instance._meta.get_field(field_name).related_model
+    queryset = node_type.get_queryset(related._default_manager.all(), info)
+    # The rows of a page change whenever any row of the model does.
+    record_tags(info, model_tag(related))
+
+    def build(rows):
+        edges = [
+            node_type._meta.connection.Edge(
+                node=row, cursor=offset_to_cursor(offset + index))
+            for index, row in enumerate(rows[:first])
+        ]
+        return node_type._meta.connection(
+            edges=edges,
+            page_info=PageInfo(
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=edges[-1].cursor if edges else None,
+                has_previous_page=offset > 0,
+                has_next_page=len(rows) > first,
+            ),
+            total_count=total_count,
+        )
+
+    return load_related_page(
+        info, instance, field_name, queryset, get_ordering(queryset),
+        offset, first + 1).then(build)
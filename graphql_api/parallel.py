@@ -0,0 +1,163 @@
+"""Concurrent execution of GraphQL requests under ASGI.
+
+Under ASGI, Django runs synchronous views one at a time on a single
+thread. `AsyncStorefrontGraphQLView` runs each request on a bounded pool of
+`GRAPHQL_ASYNC['REQUEST_WORKERS']` threads. It also executes the root fields
+of a query operation, such as `collections` and `allProducts`, side by side
+on a second pool of `FIELD_WORKERS` threads, so their database round-trips
+overlap. Each pool thread keeps its own database connection, so the pools
+bound the connections a worker process opens. Those connections are reused
+across jobs for `CONN_MAX_AGE` seconds, None for unlimited, whatever the
+`CONN_MAX_AGE` of the database, which defaults to closing them after every
+request and would have each root field connect anew.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from graphql.execution import ExecutionResult, execute
+from graphql.language import ast
+
+DEFAULTS = {
+    'ENABLED': False,
+    'REQUEST_WORKERS': 16,
+    'FIELD_WORKERS': 16,
+    'CONN_MAX_AGE': 60,
+}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_setting(name):
+    return getattr(settings, 'GRAPHQL_ASYNC', {}).get(name, DEFAULTS[name])
+
+
+def get_pool(name, max_workers=None):
+    """Return the thread pool `name`, sized by the setting of that name."""
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = _pools[name] = ThreadPoolExecutor(
+                max_workers=max_workers or get_setting(name),
+                thread_name_prefix=f'graphql-{name.lower()}')
+        return pool
+
+
+def release_connections():
+    """Close the database connections that are broken or too old."""
+    for conn in connections.all(initialized_only=True):
+        conn.close_if_unusable_or_obsolete()
+
+
+def with_connections(func):
+    """Release database connections around `func`, like Django does when a
+    request starts and finishes, but only on the thread handling it.
+
+    Connections `func` opens expire after the `CONN_MAX_AGE` of the pools
+    rather than that of the database.
+    """
+    def run(*args, **kwargs):
+        release_connections()
+        opened = {
+            conn.alias: conn.connection
+            for conn in connections.all(initialized_only=True)
+        }
+        try:
+            return func(*args, **kwargs)
+        finally:
+            max_age = get_setting('CONN_MAX_AGE')
+            for conn in connections.all(initialized_only=True):
+                if conn.connection is not None \
+                        and conn.connection is not opened.get(conn.alias):
+                    conn.close_at = \
+                        None if max_age is None else time.monotonic() + max_age
+            release_connections()
+    return run
+
+
+def map_in_pool(pool, func, items):
+    """Return `[func(item) for item in items]`, computed on `pool`."""
+    futures = [pool.submit(with_connections(func), item) for item in items]
+    return [future.result() for future in futures]
+
+
+def in_request_pool(func):
+    """`sync_to_async` running `func` on the request pool."""
+    return sync_to_async(
+        with_connections(func), thread_sensitive=False,
+        executor=get_pool('REQUEST_WORKERS'))
+
+
+def get_operation(document_ast, operation_name=None):
+    operations = [
+        definition for definition in document_ast.definitions
+        if isinstance(definition, ast.OperationDefinition)
+    ]
+    if operation_name:
+        return next((
+            operation for operation in operations
+            if operation.name and operation.name.value == operation_name
+        ), None)
+    return operations[0] if len(operations) == 1 else None
+
+
+def split_root_fields(document_ast, operation_name=None):
+    """Split a query operation into one document per root field.
+
+    Selections of the same response key stay together so they are merged
+    as usual. Returns None when there is nothing to split, for other
+    operation types and for fragments spread at the root.
+    """
+    operation = get_operation(document_ast, operation_name)
+    if operation is None or operation.operation != 'query':
+        return None
+    selections = operation.selection_set.selections
+    if not all(isinstance(selection, ast.Field) for selection in selections):
+        return None
+
+    grouped = OrderedDict()
+    for selection in selections:
+        key = (selection.alias or selection.name).value
+        grouped.setdefault(key, []).append(selection)
+    if len(grouped) < 2:
+        return None
+
+    fragments = [
+        definition for definition in document_ast.definitions
+        if isinstance(definition, ast.FragmentDefinition)
+    ]
+    documents = []
+    for group in grouped.values():
+        part = copy.copy(operation)
+        part.selection_set = ast.SelectionSet(selections=group)
+        documents.append(ast.Document(definitions=[part, *fragments]))
+    return documents
+
+
+def execute_root_fields(schema, documents, request, **options):
+    """Execute the documents of `split_root_fields` on the field pool.
+
+    Each document gets its own copy of the request as context, so data
+    loaders are not shared across threads; the response cache tags are.
+    """
+    def run(document_ast):
+        context = copy.copy(request)
+        context.__dict__.pop('loaders', None)
+        return execute(schema, document_ast, context_value=context, **options)
+
+    results = map_in_pool(get_pool('FIELD_WORKERS'), run, documents)
+
+    data, errors = {}, []
+    for result in results:
+        if result.invalid:
+            return result
+        errors.extend(result.errors or ())
+        # A null non-null root field nulls the whole response.
+        if data is not None:
+            data = None if result.data is None else {**data, **result.data}
+    return ExecutionResult(data=data, errors=errors or None)
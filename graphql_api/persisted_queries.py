@@ -0,0 +1,102 @@
+"""Automatic persisted queries (APQ) as implemented by Apollo clients.
+
+A client first sends only `extensions.persistedQuery.sha256Hash`; when the
+hash is unknown it is answered with `PersistedQueryNotFound` and retries
+with the query text, which registers it. In allowlist-only mode nothing is
+registered and only the queries of the allowlist file can be executed.
+"""
+import hashlib
+import json
+from functools import lru_cache
+from django.conf import settings
+from django.core.cache import caches
+
+DEFAULTS = {
+    'CACHE': 'default',
+    'TIMEOUT': None,
+    'ALLOWLIST': None,
+    'ALLOWLIST_ONLY': False,
+}
+
+
+class PersistedQueryError(Exception):
+    def __init__(self, message, code, status=200):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+        self.status = status
+
+    def as_dict(self):
+        return {'message': self.message, 'extensions': {'code': self.code}}
+
+
+def get_setting(name):
+    return getattr(settings, 'GRAPHQL_PERSISTED_QUERIES', {}).get(
+        name, DEFAULTS[name])
+
+
+def query_hash(query):
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def load_allowlist(path):
+    """Load a `{sha256: query}` JSON manifest, verifying every hash."""
+    with open(path) as manifest:
+        queries = json.load(manifest)
+    for sha, query in queries.items():
+        if query_hash(query) != sha:
+            raise ValueError(f'Allowlisted query {sha} does not match its hash.')
+    return queries
+
+
+def get_allowlist():
+    path = get_setting('ALLOWLIST')
+    return load_allowlist(str(path)) if path else {}
+
+
+def _store_key(sha):
+    return f'graphql:apq:{sha}'
+
+
+def resolve_query(query, extensions):
+    """Return the query text a request should execute.
+
+    `extensions` is the decoded `extensions` member of the request, if any.
+    Raises `PersistedQueryError` with the Apollo error code otherwise.
+    """
+    allowlist_only = get_setting('ALLOWLIST_ONLY')
+    persisted = (extensions or {}).get('persistedQuery')
+    if not persisted:
+        if allowlist_only and query and query_hash(query) not in get_allowlist():
+            raise PersistedQueryError(
+                'Query is not allowlisted.', 'PERSISTED_QUERY_NOT_ALLOWED')
+        return query
+
+    if persisted.get('version') != 1:
+        raise PersistedQueryError(
+            'Unsupported persisted query version.',
+            'PERSISTED_QUERY_VERSION_NOT_SUPPORTED', status=400)
+    sha = persisted.get('sha256Hash')
+    if query and query_hash(query) != sha:
+        raise PersistedQueryError(
+            'provided sha does not match query',
+            'PERSISTED_QUERY_HASH_MISMATCH', status=400)
+
+    stored = get_allowlist().get(sha)
+    if stored is not None:
+        return stored
+    if allowlist_only:
+        raise PersistedQueryError(
+            'Query is not allowlisted.', 'PERSISTED_QUERY_NOT_ALLOWED')
+
+    store = caches[get_setting('CACHE')]
+    if query:
+        store.set(_store_key(sha), query, get_setting('TIMEOUT'))
+        return query
+
+    stored = store.get(_store_key(sha))
+    if stored is None:
+        raise PersistedQueryError(
+            'PersistedQueryNotFound', 'PERSISTED_QUERY_NOT_FOUND')
+    return stored
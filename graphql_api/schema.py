@@ -3,18 +3,19 @@ import graphql_jwt
 from graphene_django.debug import DjangoDebug
 from .store.schema import (CollectionQuery, ProductQuery, ReviewQuery,
                           CartQuery, CollectionMutation, ProductMutation,
-                          PromotionQuery, PromotionMutation)
+                          PromotionQuery, PromotionMutation, CartMutation,
+                          AutocompleteQuery)
 from .customer.schema import UserQuery, UserMutation
 
 
 class Query(CollectionQuery, ProductQuery, ReviewQuery,
-        PromotionQuery, CartQuery, UserQuery):
+        PromotionQuery, CartQuery, AutocompleteQuery, UserQuery):
     debug = graphene.Field(DjangoDebug, name='_debug')
 
 
 class Mutation(
     CollectionMutation, ProductMutation,
-    PromotionMutation, UserMutation
+    PromotionMutation, CartMutation, UserMutation
     ):
     token_auth = graphql_jwt.relay.ObtainJSONWebToken.Field()
     verify_token = graphql_jwt.relay.Verify.Field()
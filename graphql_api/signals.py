@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from store.models import Cart, Collection, Product, Promotion, Review
+from store.signals import bulk_changed
+from .auth import tokens
+from .cache import invalidate, model_tag, row_tag
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_product(sender, instance, **kwargs):
+    invalidate(
+        row_tag(Product, instance.pk),
+        model_tag(Product),
+        row_tag(Collection, instance.collection_id),
+    )
+
+
+@receiver([post_save, post_delete], sender=Collection)
+def invalidate_collection(sender, instance, **kwargs):
+    invalidate(row_tag(Collection, instance.pk), model_tag(Collection))
+
+
+@receiver([post_save, post_delete], sender=Promotion)
+def invalidate_promotion(sender, instance, **kwargs):
+    invalidate(row_tag(Promotion, instance.pk), model_tag(Promotion))
+
+
+@receiver([post_save, post_delete], sender=Review)
+def invalidate_review(sender, instance, **kwargs):
+    invalidate(
+        row_tag(Review, instance.pk),
+        model_tag(Review),
+        row_tag(Product, instance.product_id),
+    )
+
+
+@receiver([post_save, post_delete], sender=Cart)
+def invalidate_cart(sender, instance, **kwargs):
+    invalidate(row_tag(Cart, instance.pk))
+
+
+@receiver(m2m_changed, sender=Product.promotions.through)
+def invalidate_product_promotions(sender, instance, action, model, pk_set,
+                                  **kwargs):
+    if not action.startswith('post_'):
+        return
+
+    tags = [row_tag(type(instance), instance.pk)]
+    if pk_set is None:
+        tags.append(model_tag(model))
+    else:
+        tags += [row_tag(model, pk) for pk in pk_set]
+    invalidate(*tags)
+
+
+@receiver(bulk_changed)
+def invalidate_bulk_change(sender, pks, **kwargs):
+    tags = [model_tag(sender)]
+    if pks is not None:
+        tags += [row_tag(sender, pk) for pk in pks]
+    invalidate(*tags)
+
+
+@receiver([post_save, post_delete], sender=get_user_model())
+def invalidate_user_tokens(sender, instance, **kwargs):
+    # Edits, password changes and deletes take effect on the next request.
+    tokens.invalidate_user(instance.pk)
@@ -2,38 +2,43 @@ from django_filters.rest_framework import FilterSet, OrderingFilter
 from store.models import Product, Review, Promotion
 
 class ProductFilter(FilterSet):
+    order_by = OrderingFilter(
+        fields=(
+            ('unit_price', 'effective_price', 'last_update', 'title',
+             ('review_count', 'popularity'), 'last_review_date')
+        )
+    )
+
     class Meta:
         model = Product
         fields = {
             'collection_id': ['exact'],
-            'unit_price': ['gt', 'lt']
+            'unit_price': ['gt', 'lt'],
+            'effective_price': ['gt', 'lt'],
         }
-        order_by = OrderingFilter(
-            fields=(
-                ('unit_price', 'last_update', 'title')
-            )
-        )
 
 class ReviewFilter(FilterSet):
+    order_by = OrderingFilter(
+        fields=(
+            ('date',)
+        )
+    )
+
     class Meta:
         model = Review
         fields = {
             'date': ['gt', 'lt']
         }
-        order_by = OrderingFilter(
+
+class PromotionFilter(FilterSet):
+    order_by = OrderingFilter(
         fields=(
-            ('date'),
+            ('discount',)
         )
     )
 
-class PromotionFilter(FilterSet):
     class Meta:
         model = Promotion
         fields = {
             'description': ['icontains'],
         }
-        order_by = OrderingFilter(
-            fields=(
-                ('discount'),
-            )
-        )
\ No newline at end of file
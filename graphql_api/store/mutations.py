@@ -1,9 +1,19 @@
 import graphene
+from graphene_django.filter.utils import get_filtering_args_from_filterset
 from graphql import GraphQLError
-from graphql_jwt.decorators import staff_member_required
+from graphql_jwt.decorators import login_required, staff_member_required
+from django.core.exceptions import ValidationError
 from django.db import transaction
-from store.models import Product, Collection, Promotion
-from .types import CollectionType, ProductType, PromotionType
+from customer.models import Customer
+from store.models import Cart, Product, Collection, Promotion
+from store.services import (MAX_CART_QUANTITY, CheckoutError, RowError,
+                            add_to_cart, bulk_assign_promotions,
+                            bulk_create_products, bulk_update_products,
+                            checkout, clear_cart, product_pk,
+                            remove_cart_item, update_cart_item)
+from .filters import ProductFilter
+from .types import (CartType, CollectionType, OrderType, ProductType,
+                    PromotionType, RowErrorType)
 
 
 class CreateCollection(graphene.Mutation):
@@ -158,6 +168,8 @@ class EditProduct(graphene.Mutation):
                 except Collection.DoesNotExist:
                     raise GraphQLError("collection does not exist.")
 
+            product.save()
+
             if promotions:
                 for promotion_id in promotions:
                     try:
@@ -169,6 +181,137 @@ class EditProduct(graphene.Mutation):
         return CreateProduct(product=product)
 
 
+class ProductInput(graphene.InputObjectType):
+    """Input row of a product for bulk creation."""
+    title = graphene.String(required=True)
+    slug = graphene.String(required=True)
+    description = graphene.String()
+    unit_price = graphene.Decimal(required=True)
+    inventory = graphene.Int(required=True)
+    collection_id = graphene.ID(required=True)
+    promotions = graphene.List(graphene.NonNull(graphene.ID))
+
+
+class BulkCreateProducts(graphene.Mutation):
+    """Mutation for creating many products with batched inserts.
+
+    Invalid rows are reported in `errors` and the others are created.
+    """
+    class Arguments:
+        products = graphene.List(graphene.NonNull(ProductInput), required=True)
+
+    created_count = graphene.Int()
+    errors = graphene.List(graphene.NonNull(RowErrorType))
+
+    @classmethod
+    @staff_member_required
+    def mutate(cls, root, info, products):
+        result = bulk_create_products(products)
+
+        return BulkCreateProducts(
+            created_count=len(result.created), errors=result.errors)
+
+
+def filter_input_type(name, filterset_class, node_type):
+    """Build an input type with the filtering fields of a filterset."""
+    arguments = get_filtering_args_from_filterset(filterset_class, node_type)
+    fields = {
+        field: graphene.InputField(
+            argument.type, description=argument.description)
+        for field, argument in arguments.items() if field != 'order_by'
+    }
+    return type(name, (graphene.InputObjectType,), fields)
+
+
+ProductFilterInput = filter_input_type(
+    'ProductFilterInput', ProductFilter, ProductType)
+
+
+def select_products(filter=None, ids=None):
+    """Return the products matching a `ProductFilter` and/or an id list.
+
+    Ids that are not valid product ids are left out and returned as
+    `RowError`s, their row being their index in `ids`.
+    """
+    if filter is None and ids is None:
+        raise GraphQLError('Provide a filter or product ids.')
+
+    queryset = Product.objects.all()
+    if filter is not None:
+        filterset = ProductFilter(data=dict(filter), queryset=queryset)
+        if not filterset.is_valid():
+            raise GraphQLError(filterset.errors.as_json())
+        queryset = filterset.qs
+    errors = []
+    if ids is not None:
+        pks = []
+        for index, value in enumerate(ids):
+            try:
+                pks.append(Product._meta.pk.to_python(value))
+            except ValidationError as error:
+                errors += [RowError(index, 'ids', message)
+                           for message in error.messages]
+        queryset = queryset.filter(pk__in=pks)
+    return queryset, errors
+
+
+class BulkEditProducts(graphene.Mutation):
+    """Mutation for updating the products of a filter with one UPDATE."""
+    class Arguments:
+        filter = ProductFilterInput()
+        ids = graphene.List(graphene.NonNull(graphene.ID))
+        unit_price = graphene.Decimal()
+        unit_price_percent = graphene.Decimal(
+            description='Change prices by this percentage, e.g. -15.')
+        inventory = graphene.Int()
+        inventory_delta = graphene.Int()
+
+    count = graphene.Int()
+    errors = graphene.List(graphene.NonNull(RowErrorType))
+
+    @classmethod
+    @staff_member_required
+    def mutate(cls, root, info, filter=None, ids=None, **changes):
+        if 'unit_price' in changes and 'unit_price_percent' in changes:
+            raise GraphQLError('Set either unitPrice or unitPricePercent.')
+        if 'inventory' in changes and 'inventory_delta' in changes:
+            raise GraphQLError('Set either inventory or inventoryDelta.')
+        if changes.get('unit_price_percent', 0) <= -100:
+            raise GraphQLError('unitPricePercent must be greater than -100.')
+        if not changes:
+            raise GraphQLError('Nothing to change.')
+
+        queryset, errors = select_products(filter, ids)
+        try:
+            count = bulk_update_products(queryset, **changes)
+        except ValidationError as error:
+            raise GraphQLError(' '.join(
+                f'{field}: {message}'
+                for field, messages in error.message_dict.items()
+                for message in messages))
+
+        return BulkEditProducts(count=count, errors=errors)
+
+
+class BulkAssignPromotions(graphene.Mutation):
+    """Mutation for adding promotions to the products of a filter."""
+    class Arguments:
+        filter = ProductFilterInput()
+        ids = graphene.List(graphene.NonNull(graphene.ID))
+        promotions = graphene.List(graphene.NonNull(graphene.ID), required=True)
+
+    count = graphene.Int()
+    errors = graphene.List(graphene.NonNull(RowErrorType))
+
+    @classmethod
+    @staff_member_required
+    def mutate(cls, root, info, promotions, filter=None, ids=None):
+        queryset, errors = select_products(filter, ids)
+        count = bulk_assign_promotions(queryset, promotions)
+
+        return BulkAssignPromotions(count=count, errors=errors)
+
+
 class DeleteProductPromotions(graphene.Mutation):
     """Mutation for deleting promotions of a product."""
     class Arguments:
@@ -266,3 +409,112 @@ class DeletePromotion(graphene.Mutation):
 
         promotion.delete()
         return DeletePromotion(ok=True)
+
+
+class CartPayload:
+    """Cart mutation result, the cart is only read if it is selected."""
+    cart_id = graphene.ID()
+    cart = graphene.Field(CartType)
+
+    def resolve_cart(self, info):
+        return CartType.get_queryset(Cart.objects.all(), info) \
+            .filter(pk=self.cart_id).first()
+
+
+def validate_cart_item(product_id, quantity=None, min_quantity=0):
+    """Raise `GraphQLError` for an invalid product id or quantity."""
+    if product_pk(product_id) is None:
+        raise GraphQLError('Invalid product id.')
+    if quantity is None:
+        return
+    if quantity < min_quantity:
+        raise GraphQLError(
+            'Quantity must be at least 1.' if min_quantity
+            else 'Quantity cannot be negative.')
+    if quantity > MAX_CART_QUANTITY:
+        raise GraphQLError(
+            f'Quantity cannot be more than {MAX_CART_QUANTITY}.')
+
+
+class AddToCart(CartPayload, graphene.Mutation):
+    """Mutation for adding a product to a cart, creating the cart if needed."""
+    class Arguments:
+        cart_id = graphene.ID()
+        product_id = graphene.ID(required=True)
+        quantity = graphene.Int(default_value=1)
+
+    @classmethod
+    def mutate(cls, root, info, product_id, quantity, cart_id=None):
+        validate_cart_item(product_id, quantity, min_quantity=1)
+        if cart_id is None:
+            # The new cart is rolled back when the product does not exist.
+            with transaction.atomic():
+                cart_id = Cart.objects.create().pk
+                if not add_to_cart(cart_id, product_id, quantity):
+                    raise GraphQLError('Cart or product does not exist.')
+        elif not add_to_cart(cart_id, product_id, quantity):
+            raise GraphQLError('Cart or product does not exist.')
+
+        return AddToCart(cart_id=cart_id)
+
+
+class UpdateCartItem(CartPayload, graphene.Mutation):
+    """Mutation for setting the quantity of a cart item, 0 removes it."""
+    class Arguments:
+        cart_id = graphene.ID(required=True)
+        product_id = graphene.ID(required=True)
+        quantity = graphene.Int(required=True)
+
+    @classmethod
+    def mutate(cls, root, info, cart_id, product_id, quantity):
+        validate_cart_item(product_id, quantity)
+        if not update_cart_item(cart_id, product_id, quantity):
+            raise GraphQLError('Cart item does not exist.')
+
+        return UpdateCartItem(cart_id=cart_id)
+
+
+class RemoveCartItem(CartPayload, graphene.Mutation):
+    """Mutation for removing a product from a cart."""
+    class Arguments:
+        cart_id = graphene.ID(required=True)
+        product_id = graphene.ID(required=True)
+
+    @classmethod
+    def mutate(cls, root, info, cart_id, product_id):
+        validate_cart_item(product_id)
+        if not remove_cart_item(cart_id, product_id):
+            raise GraphQLError('Cart item does not exist.')
+
+        return RemoveCartItem(cart_id=cart_id)
+
+
+class ClearCart(CartPayload, graphene.Mutation):
+    """Mutation for removing every item of a cart."""
+    class Arguments:
+        cart_id = graphene.ID(required=True)
+
+    @classmethod
+    def mutate(cls, root, info, cart_id):
+        clear_cart(cart_id)
+
+        return ClearCart(cart_id=cart_id)
+
+
+class Checkout(graphene.Mutation):
+    """Mutation for placing an order from a cart."""
+    class Arguments:
+        cart_id = graphene.ID(required=True)
+
+    order = graphene.Field(OrderType)
+
+    @classmethod
+    @login_required
+    def mutate(cls, root, info, cart_id):
+        customer, _ = Customer.objects.get_or_create(user=info.context.user)
+        try:
+            order = checkout(cart_id, customer)
+        except CheckoutError as error:
+            raise GraphQLError(str(error))
+
+        return Checkout(order=order)
@@ -1,23 +1,32 @@
 import graphene
 from graphql import GraphQLError
-from graphene_django.filter import DjangoFilterConnectionField
+from graphene.relay import PageInfo
+from graphene_django.settings import graphene_settings
 from graphql_jwt.decorators import staff_member_required, login_required
 from django.db import transaction
+from store.autocomplete import autocomplete
 from store.models import Product, Collection, Review, Cart, Promotion
+from store.search import product_snippet, search_products, search_terms
+from ..cache import model_tag, record_tags
+from ..pagination import KeysetConnectionField, offset_page
 from .filters import ProductFilter, ReviewFilter, PromotionFilter
-from .types import (CollectionType, ProductType, ReviewType,
-                    CartType, PromotionType)
+from .types import (CollectionType, ProductType, ProductSearchConnection,
+                    ReviewType, CartType, PromotionType, SuggestionType)
 from .mutations import (
     CreateCollection, EditCollection, DeleteCollection,
-    CreateProduct, EditProduct, DeleteProduct,
+    CreateProduct, EditProduct, BulkCreateProducts, BulkEditProducts,
+    BulkAssignPromotions, DeleteProduct,
     DeleteProductPromotions, CreatePromotion, EditPromotion,
-    DeletePromotion,
+    DeletePromotion, AddToCart, UpdateCartItem, RemoveCartItem, ClearCart,
+    Checkout,
 )
 
+AUTOCOMPLETE_MAX_LIMIT = 50
+
 
 class CollectionQuery(graphene.ObjectType):
     """Query to retrieve collections."""
-    collections = DjangoFilterConnectionField(CollectionType)
+    collections = KeysetConnectionField(CollectionType)
 
 
 class CollectionMutation(graphene.ObjectType):
@@ -29,22 +38,93 @@ class CollectionMutation(graphene.ObjectType):
 
 class ProductQuery(graphene.ObjectType):
     """Query for get all products or retrieve a product."""
-    all_products = DjangoFilterConnectionField(
+    all_products = KeysetConnectionField(
         ProductType, filterset_class=ProductFilter)
     product = graphene.Field(
         ProductType, product_id=graphene.ID(required=True))
+    search_products = graphene.ConnectionField(
+        ProductSearchConnection,
+        query=graphene.String(required=True),
+        collection_id=graphene.ID(),
+        min_price=graphene.Decimal(description='Minimum effective price.'),
+        max_price=graphene.Decimal(description='Maximum effective price.'),
+    )
 
     def resolve_product(root, info, product_id):
         try:
-            return Product.objects.get(pk=product_id)
+            return ProductType.get_queryset(
+                Product.objects.all(), info).get(pk=product_id)
         except Product.DoesNotExist:
             raise GraphQLError(message="Product does not exist.")
 
+    def resolve_search_products(root, info, query, collection_id=None,
+                                min_price=None, max_price=None, **kwargs):
+        if kwargs.get('last') or kwargs.get('before'):
+            raise GraphQLError('Search results can only be paginated forward.')
+
+        queryset = Product.objects.all()
+        if collection_id is not None:
+            queryset = queryset.filter(collection_id=collection_id)
+        if min_price is not None:
+            queryset = queryset.filter(effective_price__gte=min_price)
+        if max_price is not None:
+            queryset = queryset.filter(effective_price__lte=max_price)
+        queryset = ProductType.get_queryset(
+            search_products(query, queryset), info)
+        # Snippets are cut from the title and description.
+        deferred, defer = queryset.query.deferred_loading
+        if deferred and not defer:
+            queryset = queryset.only(*deferred, 'title', 'description')
+        record_tags(info, model_tag(Product))
+
+        max_limit = graphene_settings.RELAY_CONNECTION_MAX_LIMIT
+        first = kwargs.get('first')
+        if first is None or first > max_limit:
+            first = max_limit
+        if first < 0:
+            raise GraphQLError(
+                'Argument "first" must be a non-negative integer.')
+        rows, cursors, has_next_page = offset_page(
+            queryset, first, kwargs.get('after'))
+
+        terms = search_terms(query)
+        edges = [
+            ProductSearchConnection.Edge(
+                node=row, cursor=cursor, relevance=row.relevance,
+                snippet=product_snippet(row, terms))
+            for row, cursor in zip(rows, cursors)
+        ]
+        return ProductSearchConnection(
+            edges=edges,
+            page_info=PageInfo(
+                start_cursor=cursors[0] if cursors else None,
+                end_cursor=cursors[-1] if cursors else None,
+                has_previous_page=bool(kwargs.get('after')),
+                has_next_page=has_next_page,
+            )
+        )
+
+
+class AutocompleteQuery(graphene.ObjectType):
+    """Query for typeahead suggestions of product and collection titles."""
+    autocomplete = graphene.List(
+        graphene.NonNull(SuggestionType),
+        prefix=graphene.String(required=True),
+        limit=graphene.Int(default_value=10),
+    )
+
+    def resolve_autocomplete(root, info, prefix, limit):
+        record_tags(info, model_tag(Product), model_tag(Collection))
+        return autocomplete(prefix, min(limit, AUTOCOMPLETE_MAX_LIMIT))
+
 
 class ProductMutation(graphene.ObjectType):
     """Mutating class for create, update, delete and promotions of product."""
     create_product = CreateProduct.Field()
     edit_product = EditProduct.Field()
+    bulk_create_products = BulkCreateProducts.Field()
+    bulk_edit_products = BulkEditProducts.Field()
+    bulk_assign_promotions = BulkAssignPromotions.Field()
     delete_product_promotions = DeleteProductPromotions.Field()
     delete_product = DeleteProduct.Field()
 
@@ -53,13 +133,14 @@ class PromotionQuery(graphene.ObjectType):
     """Query for retrieve promotions."""
     promotion = graphene.Field(
         PromotionType, promotion_id=graphene.ID(required=True))
-    all_promotions = DjangoFilterConnectionField(
+    all_promotions = KeysetConnectionField(
         PromotionType, filterset_class=PromotionFilter
     )
 
     def resolve_promotion(root, info, promotion_id):
         try:
-            return Promotion.objects.get(pk=promotion_id)
+            return PromotionType.get_queryset(
+                Promotion.objects.all(), info).get(pk=promotion_id)
         except Promotion.DoesNotExist:
             raise GraphQLError(message='Promotion dose not exist.')
 
@@ -74,7 +155,7 @@ class PromotionMutation(graphene.ObjectType):
 
 class ReviewQuery(graphene.ObjectType):
     """Query for retrieve review or reviews of product"""
-    reviews_of_product = DjangoFilterConnectionField(
+    reviews_of_product = KeysetConnectionField(
         ReviewType, filterset_class=ReviewFilter, product_id=graphene.ID(required=True))
     review = graphene.Field(ReviewType, review_id=graphene.ID(required=True))
 
@@ -83,15 +164,29 @@ class ReviewQuery(graphene.ObjectType):
 
     def resolve_review(root, info, review_id):
         try:
-            return Review.objects.get(pk=review_id)
+            return ReviewType.get_queryset(
+                Review.objects.all(), info).get(pk=review_id)
         except Review.DoesNotExist:
             raise GraphQLError(message='Review dose not exist.')
 
 
 class CartQuery(graphene.ObjectType):
-    """Query for retrieve a cart."""
+    """Query for retrieve a cart.
+
+    Repeated reads are served from the response cache of the user.
+    """
     cart = graphene.Field(CartType, cart_id=graphene.ID(required=True))
 
     @login_required
     def resolve_cart(root, info, cart_id):
-        return Cart.objects.get(pk=cart_id)
+        return CartType.get_queryset(
+            Cart.objects.all(), info).get(pk=cart_id)
+
+
+class CartMutation(graphene.ObjectType):
+    """Mutating class for carts and checkout."""
+    add_to_cart = AddToCart.Field()
+    update_cart_item = UpdateCartItem.Field()
+    remove_cart_item = RemoveCartItem.Field()
+    clear_cart = ClearCart.Field()
+    checkout = Checkout.Field()
@@ -200,3 +200,365 @@ mutation deletePromotion($promotionId: ID!){
   }
 }
 '''
+
+NESTED_PRODUCTS_QUERY = \
+'''
+query nestedProducts($first: Int) {
+  allProducts(first: $first) {
+    edges {
+      node {
+        id
+        title
+        collection {
+          title
+          featuredProduct {
+            title
+          }
+        }
+        promotions {
+          edges {
+            node {
+              id
+              discount
+            }
+          }
+        }
+        reviews {
+          edges {
+            node {
+              name
+              product {
+                title
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+'''
+
+PRODUCT_TITLES_QUERY = \
+'''
+query productTitles {
+  allProducts {
+    edges {
+      node {
+        title
+      }
+    }
+  }
+}
+'''
+
+PRODUCTS_WITH_COLLECTION_QUERY = \
+'''
+query productsWithCollection {
+  allProducts {
+    edges {
+      node {
+        ...productFields
+      }
+    }
+  }
+}
+
+fragment productFields on ProductType {
+  title
+  collection {
+    title
+  }
+}
+'''
+
+COLLECTIONS_WITH_PRODUCTS_QUERY = \
+'''
+query collectionsWithProducts {
+  collections {
+    edges {
+      node {
+        title
+        products {
+          edges {
+            node {
+              title
+            }
+          }
+        }
+      }
+    }
+  }
+}
+'''
+
+PAGINATED_PRODUCTS_QUERY = \
+'''
+query paginatedProducts($first: Int, $after: String, $last: Int, $before: String, $orderBy: String) {
+  allProducts(first: $first, after: $after, last: $last, before: $before, orderBy: $orderBy) {
+    pageInfo {
+      hasNextPage
+      hasPreviousPage
+      startCursor
+      endCursor
+    }
+    edges {
+      cursor
+      node {
+        title
+        unitPrice
+      }
+    }
+  }
+}
+'''
+
+COUNTED_PRODUCTS_QUERY = \
+'''
+query countedProducts($first: Int) {
+  allProducts(first: $first) {
+    totalCount
+    edges {
+      node {
+        title
+      }
+    }
+  }
+}
+'''
+
+BULK_CREATE_PRODUCTS_MUTATION = \
+'''
+mutation bulkCreateProducts($products: [ProductInput!]!) {
+  bulkCreateProducts(products: $products) {
+    createdCount
+    errors {
+      row
+      field
+      message
+    }
+  }
+}
+'''
+
+BULK_EDIT_PRODUCTS_MUTATION = \
+'''
+mutation bulkEditProducts($filter: ProductFilterInput, $ids: [ID!], $unitPricePercent: Decimal, $inventoryDelta: Int) {
+  bulkEditProducts(filter: $filter, ids: $ids, unitPricePercent: $unitPricePercent, inventoryDelta: $inventoryDelta) {
+    count
+    errors { row field message }
+  }
+}
+'''
+
+BULK_SET_PRODUCTS_MUTATION = \
+'''
+mutation bulkEditProducts($ids: [ID!], $unitPrice: Decimal, $inventory: Int) {
+  bulkEditProducts(ids: $ids, unitPrice: $unitPrice, inventory: $inventory) {
+    count
+  }
+}
+'''
+
+BULK_ASSIGN_PROMOTIONS_MUTATION = \
+'''
+mutation bulkAssignPromotions($filter: ProductFilterInput, $ids: [ID!], $promotions: [ID!]!) {
+  bulkAssignPromotions(filter: $filter, ids: $ids, promotions: $promotions) {
+    count
+  }
+}
+'''
+
+CHECKOUT_MUTATION = \
+'''
+mutation checkout($cartId: ID!) {
+  checkout(cartId: $cartId) {
+    order {
+      paymentStatus
+      items {
+        quantity
+        unitPrice
+        product {
+          title
+        }
+      }
+    }
+  }
+}
+'''
+
+CART_QUERY = \
+'''
+query cart($cartId: ID!) {
+  cart(cartId: $cartId) {
+    totalPrice
+    items {
+      quantity
+      product {
+        title
+      }
+    }
+  }
+}
+'''
+
+ADD_TO_CART_MUTATION = \
+'''
+mutation addToCart($cartId: ID, $productId: ID!, $quantity: Int) {
+  addToCart(cartId: $cartId, productId: $productId, quantity: $quantity) {
+    cartId
+  }
+}
+'''
+
+UPDATE_CART_ITEM_MUTATION = \
+'''
+mutation updateCartItem($cartId: ID!, $productId: ID!, $quantity: Int!) {
+  updateCartItem(cartId: $cartId, productId: $productId, quantity: $quantity) {
+    cart {
+      totalPrice
+    }
+  }
+}
+'''
+
+REMOVE_CART_ITEM_MUTATION = \
+'''
+mutation removeCartItem($cartId: ID!, $productId: ID!) {
+  removeCartItem(cartId: $cartId, productId: $productId) {
+    cartId
+  }
+}
+'''
+
+CLEAR_CART_MUTATION = \
+'''
+mutation clearCart($cartId: ID!) {
+  clearCart(cartId: $cartId) {
+    cartId
+  }
+}
+'''
+
+EFFECTIVE_PRICE_PRODUCTS_QUERY = \
+'''
+query allProducts($effectivePrice_Lt: Float, $orderBy: String) {
+  allProducts(effectivePrice_Lt: $effectivePrice_Lt, orderBy: $orderBy) {
+    edges {
+      node {
+        id
+        unitPrice
+        effectivePrice
+      }
+    }
+  }
+}
+'''
+
+SEARCH_PRODUCTS_QUERY = \
+'''
+query searchProducts($query: String!, $first: Int, $after: String, $collectionId: ID, $maxPrice: Decimal) {
+  searchProducts(query: $query, first: $first, after: $after, collectionId: $collectionId, maxPrice: $maxPrice) {
+    edges {
+      relevance
+      snippet
+      node {
+        title
+      }
+    }
+    pageInfo {
+      hasNextPage
+      endCursor
+    }
+  }
+}
+'''
+
+AUTOCOMPLETE_QUERY = \
+'''
+query autocomplete($prefix: String!, $limit: Int) {
+  autocomplete(prefix: $prefix, limit: $limit) {
+    kind
+    id
+    title
+  }
+}
+'''
+
+POPULAR_PRODUCTS_QUERY = \
+'''
+query allProducts($first: Int, $after: String) {
+  allProducts(orderBy: "-popularity", first: $first, after: $after) {
+    edges {
+      node {
+        id
+        reviewCount
+        lastReviewDate
+      }
+    }
+    pageInfo {
+      endCursor
+    }
+  }
+}
+'''
+
+COLLECTION_COUNTS_QUERY = \
+'''
+query collections {
+    collections {
+        edges {
+            node {
+                title
+                productsCount
+            }
+        }
+    }
+}
+'''
+
+COLLECTION_PRODUCTS_PAGE_QUERY = \
+'''
+query collectionProducts($first: Int, $after: String) {
+    collections {
+        edges {
+            node {
+                title
+                products(first: $first, after: $after) {
+                    totalCount
+                    edges {
+                        cursor
+                        node {
+                            title
+                        }
+                    }
+                    pageInfo {
+                        hasNextPage
+                        hasPreviousPage
+                        endCursor
+                    }
+                }
+            }
+        }
+    }
+}
+'''
+
+COLLECTION_PRODUCTS_LAST_QUERY = \
+'''
+query collectionProducts {
+    collections {
+        edges {
+            node {
+                products(last: 2) {
+                    edges {
+                        node {
+                            title
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+'''
@@ -0,0 +1,124 @@
+from decimal import Decimal
+from django.core.cache import caches
+from django.test import TestCase
+from graphene_django.utils.testing import GraphQLTestCase
+from store.autocomplete import PrefixIndex, index
+from store.models import Collection, Product
+from store.services import bulk_update_products
+from .consts import *
+
+
+def make_product(collection, title):
+    return Product.objects.create(
+        title=title, slug='-', unit_price=Decimal(10), inventory=1,
+        collection=collection)
+
+
+class PrefixIndexTest(TestCase):
+    """Test the in-process prefix index."""
+
+    def setUp(self) -> None:
+        self.index = PrefixIndex()
+        self.index.add('product', 1, 'Bread Ww Cluster')
+        self.index.add('product', 2, 'Breadcrumbs - Panko')
+        self.index.add('product', 3, 'Crème Brûlée')
+        self.index.add('collection', 1, 'Bakery')
+
+    def titles(self, prefix, **kwargs):
+        return [suggestion.title
+                for suggestion in self.index.search(prefix, **kwargs)]
+
+    def test_prefixes(self):
+        self.assertEqual(self.titles('brea'),
+                         ['Bread Ww Cluster', 'Breadcrumbs - Panko'])
+        self.assertEqual(self.titles('pank'), ['Breadcrumbs - Panko'])
+        self.assertEqual(self.titles('BRULEE'), ['Crème Brûlée'])
+        self.assertEqual(self.titles('ba'), ['Bakery'])
+        self.assertEqual(self.titles('ba', kinds=['product']), [])
+        self.assertEqual(self.titles('x'), [])
+        self.assertEqual(self.titles(''), [])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self.titles('bread clu'), ['Bread Ww Cluster'])
+        self.assertEqual(self.titles('bread pan'), ['Breadcrumbs - Panko'])
+
+    def test_limit(self):
+        self.assertEqual(len(self.titles('b', limit=2)), 2)
+
+    def test_leading_titles_are_kept_within_limit(self):
+        index = PrefixIndex()
+        index.add('product', 1, 'Whole Bread')
+        index.add('product', 2, 'Rye Bread')
+        index.add('product', 3, 'Breadsticks')
+
+        self.assertEqual(
+            [suggestion.title for suggestion in index.search('brea', limit=2)],
+            ['Breadsticks', 'Whole Bread'])
+
+    def test_updates(self):
+        self.index.add('product', 1, 'Rye Loaf')
+        self.assertEqual(self.titles('bread'), ['Breadcrumbs - Panko'])
+        self.assertEqual(self.titles('rye'), ['Rye Loaf'])
+
+        self.index.remove('product', 2)
+        self.assertEqual(self.titles('bread'), [])
+        self.assertNotIn('breadcrumbs', self.index.tokens)
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(len(self.index.sorted_titles), 3)
+
+
+class AutocompleteQueryTest(GraphQLTestCase):
+    """Test the autocomplete query and keeping its index current."""
+    GRAPHQL_URL = '/graphql'
+
+    def setUp(self) -> None:
+        super().setUp()
+        caches['graphql'].clear()
+        self.collection = Collection.objects.create(title='Bakery')
+        make_product(self.collection, 'Bread Ww Cluster')
+        index.build()
+
+    def tearDown(self) -> None:
+        index.built = False
+        super().tearDown()
+
+    def autocomplete(self, prefix, limit=None):
+        resp = self.query(
+            AUTOCOMPLETE_QUERY,
+            op_name='autocomplete',
+            variables={'prefix': prefix, 'limit': limit}
+        )
+        self.assertResponseNoErrors(resp)
+        return resp.json()['data']['autocomplete']
+
+    def test_suggestions(self):
+        self.assertEqual(self.autocomplete('bre'), [{
+            'kind': 'product',
+            'id': str(Product.objects.get().id),
+            'title': 'Bread Ww Cluster',
+        }])
+        self.assertEqual(self.autocomplete('bak')[0]['kind'], 'collection')
+
+    def test_follows_saves_and_deletes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            product = make_product(self.collection, 'Rye Loaf')
+        self.assertEqual(len(self.autocomplete('rye')), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            product.delete()
+        self.assertEqual(self.autocomplete('rye'), [])
+
+    def test_follows_bulk_changes(self):
+        product = Product.objects.get()
+        Product.objects.filter(pk=product.pk).update(title='Rye Loaf')
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_update_products(Product.objects.filter(pk=product.pk),
+                                 inventory=1)
+
+        self.assertEqual(self.autocomplete('bre'), [])
+        self.assertEqual(len(self.autocomplete('rye')), 1)
+
+    def test_no_queries(self):
+        self.autocomplete('bre')
+        with self.assertNumQueries(0):
+            self.assertEqual(len(self.autocomplete('bread w')), 1)
@@ -0,0 +1,263 @@
+import json
+import math
+import os
+from decimal import Decimal
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, skipIfDBFeature, skipUnlessDBFeature
+from graphene_django.utils.testing import GraphQLTestCase
+from store.models import Product
+from .consts import *
+from graphql_api.utils import (create_collection, create_product,
+                               create_promotion, create_user)
+
+
+def product_row(collection, **kwargs):
+    row = {
+        'title': 'Bulk product',
+        'slug': 'bulk-product',
+        'unitPrice': '12.50',
+        'inventory': 5,
+        'collectionId': collection.id,
+    }
+    row.update(kwargs)
+    return row
+
+
+class BulkCreateProductsTest(GraphQLTestCase):
+    """Test creating products in bulk."""
+    GRAPHQL_URL = '/graphql'
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.client.force_login(create_user())
+        self.collection = create_collection()
+        self.promotion = create_promotion()
+
+    def bulk_create(self, rows):
+        resp = self.query(
+            BULK_CREATE_PRODUCTS_MUTATION,
+            op_name='bulkCreateProducts',
+            variables={'products': rows}
+        )
+        self.assertResponseNoErrors(resp)
+        return json.loads(resp.content)['data']['bulkCreateProducts']
+
+    def test_rows_are_created_with_promotions(self):
+        rows = [product_row(self.collection, title=f'Product {i}',
+                            promotions=[self.promotion.id])
+                for i in range(50)]
+
+        result = self.bulk_create(rows)
+
+        self.assertEqual(result, {'createdCount': 50, 'errors': []})
+        self.assertEqual(
+            Product.promotions.through.objects
+            .filter(promotion=self.promotion).count(), 50)
+
+    @skipUnlessDBFeature('can_return_rows_from_bulk_insert')
+    def test_query_count_does_not_grow_with_rows(self):
+        # Session, user, collections, promotions, savepoint, collection
+        # counts, through rows, effective prices and savepoint release,
+        # plus the INSERTs of the products. Backends capping the parameters
+        # of a statement, like SQLite, split those in batches.
+        fields = [field for field in Product._meta.concrete_fields
+                  if not field.primary_key]
+        for size in (10, 100):
+            rows = [product_row(self.collection, promotions=[self.promotion.id])
+                    for _ in range(size)]
+            batch_size = connection.ops.bulk_batch_size(fields, rows)
+            with self.assertNumQueries(9 + math.ceil(size / batch_size)):
+                self.bulk_create(rows)
+
+    @skipIfDBFeature('can_return_rows_from_bulk_insert')
+    def test_query_count_does_not_grow_with_rows_without_returning(self):
+        # As above, plus reading the first id and checking the ids.
+        for size in (10, 100):
+            rows = [product_row(self.collection, title=f'Product {i}',
+                                promotions=[self.promotion.id])
+                    for i in range(size)]
+            with self.assertNumQueries(12):
+                self.bulk_create(rows)
+            self.assertEqual(
+                Product.objects.filter(promotions=self.promotion).count(),
+                Product.objects.count())
+
+    def test_invalid_rows_are_reported(self):
+        rows = [
+            product_row(self.collection),
+            product_row(self.collection, collectionId=0),
+            product_row(self.collection, unitPrice='0.50', promotions=[0]),
+        ]
+
+        result = self.bulk_create(rows)
+
+        self.assertEqual(result['createdCount'], 1)
+        self.assertEqual(result['errors'], [
+            {'row': 1, 'field': 'collection_id',
+             'message': 'Collection does not exist.'},
+            {'row': 2, 'field': 'unit_price',
+             'message': 'Ensure this value is greater than or equal to 1.'},
+            {'row': 2, 'field': 'promotions',
+             'message': 'Promotion 0 does not exist.'},
+        ])
+        self.assertEqual(Product.objects.count(), 1)
+
+
+class ImportProductsCommandTest(TestCase):
+    """Test the import_products management command."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.collection = create_collection()
+        self.promotion = create_promotion()
+
+    def import_file(self, suffix, content):
+        with tempfile.NamedTemporaryFile('w', suffix=suffix, delete=False) as file:
+            file.write(content)
+        self.addCleanup(os.remove, file.name)
+        out, err = StringIO(), StringIO()
+        call_command('import_products', file.name, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_import_csv(self):
+        out, err = self.import_file('.csv', (
+            'title,slug,unit_price,inventory,collection_id,promotions\n'
+            f'Lamp,lamp,20.00,3,{self.collection.id},{self.promotion.id}\n'
+            f'Desk,desk,abc,3,{self.collection.id},\n'
+        ))
+
+        self.assertIn('Created 1 products, skipped 1 invalid rows', out)
+        self.assertIn('row 2: unit_price:', err)
+        self.assertEqual(
+            list(Product.objects.get(title='Lamp').promotions.all()),
+            [self.promotion])
+
+    def test_import_ndjson(self):
+        rows = [
+            {'title': f'Chair {i}', 'slug': 'chair', 'unit_price': '15',
+             'inventory': 1, 'collection_id': self.collection.id}
+            for i in range(3)
+        ]
+        out, err = self.import_file(
+            '.ndjson', '\n'.join(json.dumps(row) for row in rows))
+
+        self.assertIn('Created 3 products', out)
+        self.assertEqual(err, '')
+
+
+class BulkEditProductsTest(GraphQLTestCase):
+    """Test set-based edits of products."""
+    GRAPHQL_URL = '/graphql'
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.client.force_login(create_user())
+        self.cheap = create_product()
+        self.expensive = create_product()
+        Product.objects.filter(pk=self.expensive.pk).update(unit_price=200)
+
+    def mutate(self, mutation, op_name, **variables):
+        resp = self.query(mutation, op_name=op_name, variables=variables)
+        self.assertResponseNoErrors(resp)
+        return json.loads(resp.content)['data'][op_name]['count']
+
+    def test_percentage_price_change_of_filter(self):
+        with self.assertNumQueries(6):
+            count = self.mutate(
+                BULK_EDIT_PRODUCTS_MUTATION, 'bulkEditProducts',
+                filter={'unitPrice_Gt': 100}, unitPricePercent='-15')
+
+        self.expensive.refresh_from_db()
+        self.cheap.refresh_from_db()
+        self.assertEqual(count, 1)
+        self.assertEqual(self.expensive.unit_price, Decimal('170.00'))
+        self.assertEqual(self.cheap.unit_price, Decimal('65.00'))
+
+    def test_inventory_delta_of_ids_stops_at_zero(self):
+        count = self.mutate(
+            BULK_EDIT_PRODUCTS_MUTATION, 'bulkEditProducts',
+            ids=[self.cheap.id, self.expensive.id], inventoryDelta=-100)
+
+        self.assertEqual(count, 2)
+        self.assertEqual(
+            set(Product.objects.values_list('inventory', flat=True)), {0})
+
+    def test_price_increase_stops_at_column_maximum(self):
+        self.mutate(
+            BULK_EDIT_PRODUCTS_MUTATION, 'bulkEditProducts',
+            ids=[self.cheap.id, self.expensive.id], unitPricePercent='10000')
+
+        self.assertEqual(
+            set(Product.objects.values_list('unit_price', flat=True)),
+            {Decimal('6565.00'), Decimal('9999.99')})
+
+    def test_inventory_increase_stops_at_column_maximum(self):
+        ops = type(connection.ops)
+        with mock.patch.object(ops, 'integer_field_range',
+                               return_value=(-2147483648, 2147483647)):
+            self.mutate(
+                BULK_EDIT_PRODUCTS_MUTATION, 'bulkEditProducts',
+                ids=[self.cheap.id], inventoryDelta=2147483647)
+
+        self.cheap.refresh_from_db()
+        self.assertEqual(self.cheap.inventory, 2147483647)
+
+    def test_invalid_ids_are_reported(self):
+        resp = self.query(
+            BULK_EDIT_PRODUCTS_MUTATION, op_name='bulkEditProducts',
+            variables={'ids': ['abc', self.cheap.id], 'inventoryDelta': 1})
+        self.assertResponseNoErrors(resp)
+        result = json.loads(resp.content)['data']['bulkEditProducts']
+
+        self.assertEqual(result['count'], 1)
+        self.assertEqual(len(result['errors']), 1)
+        self.assertEqual(result['errors'][0]['row'], 0)
+        self.assertEqual(result['errors'][0]['field'], 'ids')
+
+    def test_set_values(self):
+        count = self.mutate(
+            BULK_SET_PRODUCTS_MUTATION, 'bulkEditProducts',
+            ids=[self.cheap.id, self.expensive.id], unitPrice='15.50',
+            inventory=3)
+
+        self.assertEqual(count, 2)
+        self.assertEqual(
+            set(Product.objects.values_list('unit_price', 'inventory')),
+            {(Decimal('15.50'), 3)})
+
+    def test_invalid_set_values_are_rejected(self):
+        for variables in ({'unitPrice': '-5'}, {'unitPrice': '123456789'},
+                          {'unitPrice': '1.005'}, {'inventory': -4}):
+            resp = self.query(
+                BULK_SET_PRODUCTS_MUTATION, op_name='bulkEditProducts',
+                variables={'ids': [self.cheap.id], **variables})
+
+            self.assertResponseHasErrors(resp)
+        self.cheap.refresh_from_db()
+        self.assertEqual(self.cheap.unit_price, Decimal('65.00'))
+        self.assertGreaterEqual(self.cheap.inventory, 0)
+
+    def test_filter_or_ids_is_required(self):
+        resp = self.query(
+            BULK_EDIT_PRODUCTS_MUTATION, op_name='bulkEditProducts',
+            variables={'inventoryDelta': 1})
+
+        self.assertResponseHasErrors(resp)
+
+    def test_assign_promotions(self):
+        promotion = create_promotion()
+        self.cheap.promotions.add(promotion)
+
+        count = self.mutate(
+            BULK_ASSIGN_PROMOTIONS_MUTATION, 'bulkAssignPromotions',
+            filter={'collectionId': self.expensive.collection_id},
+            promotions=[promotion.id])
+
+        self.assertEqual(count, 1)
+        self.assertEqual(
+            list(self.expensive.promotions.all()), [promotion])
+        self.assertEqual(self.cheap.promotions.count(), 1)
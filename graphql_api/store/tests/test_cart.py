@@ -0,0 +1,153 @@
+import json
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from graphene_django.utils.testing import GraphQLTestCase
+from graphql_jwt.shortcuts import get_token
+from store.models import Cart, CartItem
+from store.services import MAX_CART_QUANTITY
+from graphql_api.auth import tokens
+from .consts import *
+from graphql_api.utils import create_cart, create_product, create_user
+
+
+class CartTest(GraphQLTestCase):
+    """Test cart mutations and reads."""
+    GRAPHQL_URL = '/graphql'
+
+    def setUp(self) -> None:
+        super().setUp()
+        caches['graphql'].clear()
+        self.product = create_product()
+        self.cart = create_cart()
+        tokens.clear()
+        self.login(create_user())
+
+    def mutate(self, mutation, op_name, **variables):
+        resp = self.query(mutation, op_name=op_name, variables=variables)
+        self.assertResponseNoErrors(resp)
+        return json.loads(resp.content)['data'][op_name]
+
+    def login(self, user):
+        self.headers = {'HTTP_AUTHORIZATION': f'JWT {get_token(user)}'}
+
+    def query_cart(self):
+        return self.query(
+            CART_QUERY, op_name='cart', variables={'cartId': str(self.cart.id)},
+            headers=self.headers)
+
+    def read_cart(self):
+        resp = self.query_cart()
+        self.assertResponseNoErrors(resp)
+        return json.loads(resp.content)['data']['cart']
+
+    def add(self, quantity, cart_id=None):
+        return self.mutate(
+            ADD_TO_CART_MUTATION, 'addToCart',
+            cartId=str(cart_id or self.cart.id), productId=self.product.id,
+            quantity=quantity)
+
+    def test_add_increments_existing_item(self):
+        # A single upsert per call.
+        with self.assertNumQueries(1):
+            self.add(2)
+        self.add(3)
+
+        item = CartItem.objects.get()
+        self.assertEqual(item.quantity, 5)
+
+    def test_add_without_cart_creates_one(self):
+        result = self.mutate(
+            ADD_TO_CART_MUTATION, 'addToCart', productId=self.product.id)
+
+        cart = Cart.objects.get(pk=result['cartId'])
+        self.assertEqual(cart.items.get().quantity, 1)
+
+    def test_add_unknown_product_or_cart(self):
+        for variables in ({'cartId': str(self.cart.id), 'productId': 0},
+                          {'cartId': 'unknown', 'productId': self.product.id}):
+            resp = self.query(
+                ADD_TO_CART_MUTATION, op_name='addToCart', variables=variables)
+            self.assertResponseHasErrors(resp)
+        self.assertFalse(CartItem.objects.exists())
+
+    def test_add_unknown_product_without_cart_creates_none(self):
+        resp = self.query(ADD_TO_CART_MUTATION, op_name='addToCart',
+                          variables={'productId': 0})
+
+        self.assertResponseHasErrors(resp)
+        self.assertEqual(list(Cart.objects.all()), [self.cart])
+
+    def test_invalid_product_id_or_quantity(self):
+        cart_id = str(self.cart.id)
+        for mutation, op_name, variables in (
+                (ADD_TO_CART_MUTATION, 'addToCart',
+                 {'productId': 'abc'}),
+                (ADD_TO_CART_MUTATION, 'addToCart',
+                 {'productId': self.product.id, 'quantity': 40000}),
+                (UPDATE_CART_ITEM_MUTATION, 'updateCartItem',
+                 {'productId': 'abc', 'quantity': 1}),
+                (UPDATE_CART_ITEM_MUTATION, 'updateCartItem',
+                 {'productId': self.product.id, 'quantity': 40000}),
+                (REMOVE_CART_ITEM_MUTATION, 'removeCartItem',
+                 {'productId': 'abc'})):
+            resp = self.query(mutation, op_name=op_name,
+                              variables={'cartId': cart_id, **variables})
+            self.assertResponseHasErrors(resp)
+        self.assertFalse(CartItem.objects.exists())
+
+    def test_add_stops_at_max_quantity(self):
+        self.add(30000)
+        self.add(30000)
+
+        self.assertEqual(CartItem.objects.get().quantity, MAX_CART_QUANTITY)
+
+    def test_update_item_returns_total(self):
+        self.add(1)
+
+        result = self.mutate(
+            UPDATE_CART_ITEM_MUTATION, 'updateCartItem',
+            cartId=str(self.cart.id), productId=self.product.id, quantity=4)
+
+        self.assertEqual(result['cart']['totalPrice'], '260.00')
+
+    def test_remove_and_clear(self):
+        self.add(1)
+        self.mutate(REMOVE_CART_ITEM_MUTATION, 'removeCartItem',
+                    cartId=str(self.cart.id), productId=self.product.id)
+        self.assertFalse(CartItem.objects.exists())
+
+        self.add(1)
+        self.mutate(CLEAR_CART_MUTATION, 'clearCart', cartId=str(self.cart.id))
+        self.assertFalse(CartItem.objects.exists())
+
+    def test_cart_reads_are_cached_until_changed(self):
+        self.add(2)
+        self.assertEqual(self.read_cart()['totalPrice'], '130.00')
+
+        with self.assertNumQueries(0):
+            self.read_cart()
+
+        self.add(1)
+        cart = self.read_cart()
+        self.assertEqual(cart['totalPrice'], '195.00')
+        self.assertEqual(cart['items'][0]['quantity'], 3)
+
+    def test_cart_read_requires_login(self):
+        self.headers = {}
+
+        self.assertResponseHasErrors(self.query_cart())
+
+    def test_cart_reads_are_cached_per_user(self):
+        self.add(1)
+        self.assertIn('private', self.query_cart()['Cache-Control'])
+
+        self.login(get_user_model().objects.create_user(
+            username='other_user', email='other@example.com'))
+        with self.assertNumQueries(4):
+            # User, cart, items and products.
+            self.read_cart()
+        self.headers = {}
+        resp = self.query_cart()
+
+        self.assertResponseHasErrors(resp)
+        self.assertFalse(resp.has_header('ETag'))
@@ -0,0 +1,117 @@
+import json
+from decimal import Decimal
+import threading
+from django.db import connection
+from django.test import TransactionTestCase, skipUnlessDBFeature
+from graphene_django.utils.testing import GraphQLTestCase
+from customer.models import Customer
+from store.models import Cart, Order, OrderItem, Product
+from store.services import OutOfStock, checkout
+from .consts import *
+from graphql_api.utils import (create_cart, create_product, create_promotion,
+                               create_user)
+
+
+class CheckoutTest(GraphQLTestCase):
+    """Test turning a cart into an order."""
+    GRAPHQL_URL = '/graphql'
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = create_user()
+        self.client.force_login(self.user)
+        self.lamp = create_product()
+        self.desk = create_product()
+
+    def checkout(self, cart_id):
+        return self.query(
+            CHECKOUT_MUTATION,
+            op_name='checkout',
+            variables={'cartId': str(cart_id)}
+        )
+
+    def test_checkout_places_order(self):
+        cart = create_cart((self.lamp, 2), (self.desk, 30))
+
+        resp = self.checkout(cart.id)
+        self.assertResponseNoErrors(resp)
+        order = json.loads(resp.content)['data']['checkout']['order']
+
+        self.assertEqual(order['paymentStatus'], 'P')
+        self.assertEqual(
+            sorted(item['quantity'] for item in order['items']), [2, 30])
+        self.assertEqual(order['items'][0]['unitPrice'], '65.00')
+        self.lamp.refresh_from_db()
+        self.desk.refresh_from_db()
+        self.assertEqual((self.lamp.inventory, self.desk.inventory), (28, 0))
+        self.assertFalse(Cart.objects.filter(pk=cart.pk).exists())
+        self.assertEqual(Order.objects.get().customer.user, self.user)
+
+    def test_promoted_items_are_charged_effective_price(self):
+        self.lamp.promotions.add(create_promotion(discount=20))
+        cart = create_cart((self.lamp, 1))
+
+        self.assertResponseNoErrors(self.checkout(cart.id))
+
+        self.assertEqual(OrderItem.objects.get().unit_price, Decimal('52.00'))
+
+    def test_out_of_stock_rolls_back(self):
+        cart = create_cart((self.lamp, 2), (self.desk, 31))
+
+        resp = self.checkout(cart.id)
+
+        self.assertResponseHasErrors(resp)
+        self.lamp.refresh_from_db()
+        self.assertEqual(self.lamp.inventory, 30)
+        self.assertTrue(Cart.objects.filter(pk=cart.pk).exists())
+        self.assertFalse(OrderItem.objects.exists())
+
+    def test_empty_or_unknown_cart(self):
+        for cart_id in (create_cart().id, 'not-a-cart'):
+            resp = self.checkout(cart_id)
+            self.assertResponseHasErrors(resp)
+
+    def test_requires_login(self):
+        self.client.logout()
+        cart = create_cart((self.lamp, 1))
+
+        resp = self.checkout(cart.id)
+
+        self.assertResponseHasErrors(resp)
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentCheckoutTest(TransactionTestCase):
+    """Stress checkouts of one product from many threads at once."""
+
+    def test_no_oversell(self):
+        product = create_product()
+        customer = Customer.objects.create(user=create_user())
+        threads, attempts = 8, 10
+        carts = [[create_cart((product, 1)).pk for _ in range(attempts)]
+                 for _ in range(threads)]
+        sold, failed = [], []
+
+        def buy(cart_ids):
+            try:
+                for cart_id in cart_ids:
+                    try:
+                        checkout(cart_id, customer)
+                        sold.append(cart_id)
+                    except OutOfStock:
+                        failed.append(cart_id)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=buy, args=(cart_ids,))
+                   for cart_ids in carts]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        product.refresh_from_db()
+        self.assertEqual(len(sold), 30)
+        self.assertEqual(len(failed), threads * attempts - 30)
+        self.assertEqual(product.inventory, 0)
+        self.assertEqual(OrderItem.objects.count(), 30)
@@ -0,0 +1,123 @@
+from decimal import Decimal
+from io import StringIO
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from graphene_django.utils.testing import GraphQLTestCase
+from store.models import Collection, Product
+from store.services import bulk_create_products
+from .consts import *
+from graphql_api.utils import create_collection, create_superuser
+
+
+def make_product(collection):
+    return Product.objects.create(
+        title='product', slug='-', unit_price=Decimal(10), inventory=1,
+        collection=collection)
+
+
+def count(collection):
+    collection.refresh_from_db(fields=['products_count'])
+    return collection.products_count
+
+
+class ProductsCountTest(TestCase):
+    """Test keeping `Collection.products_count` current."""
+
+    def setUp(self) -> None:
+        self.first = create_collection()
+        self.second = create_collection()
+
+    def test_create_move_and_delete(self):
+        product = make_product(self.first)
+        make_product(self.first)
+        self.assertEqual(count(self.first), 2)
+
+        product.collection = self.second
+        product.save()
+        product.save()
+        self.assertEqual((count(self.first), count(self.second)), (1, 1))
+
+        product.delete()
+        self.assertEqual(count(self.second), 0)
+
+    def test_move_of_loaded_and_deferred_products(self):
+        pk = make_product(self.first).pk
+
+        product = Product.objects.get(pk=pk)
+        product.collection_id = self.second.id
+        product.save()
+        self.assertEqual((count(self.first), count(self.second)), (0, 1))
+
+        product = Product.objects.only('title').get(pk=pk)
+        product.collection_id = self.first.id
+        product.save()
+        self.assertEqual((count(self.first), count(self.second)), (1, 0))
+
+    def test_bulk_create(self):
+        rows = [
+            {'title': 'a', 'slug': 'a', 'unit_price': '10', 'inventory': 1,
+             'collection_id': collection.id}
+            for collection in (self.first, self.first, self.second)
+        ]
+        bulk_create_products(rows)
+        self.assertEqual((count(self.first), count(self.second)), (2, 1))
+
+    def test_drifted_count_stays_at_zero(self):
+        product = make_product(self.first)
+        Collection.objects.filter(pk=self.first.pk).update(products_count=0)
+
+        product.collection = self.second
+        product.save()
+        self.assertEqual(count(self.first), 0)
+        self.assertEqual(count(self.second), 1)
+
+        product.delete()
+        self.assertEqual(count(self.second), 0)
+
+    def test_reconcile_command(self):
+        make_product(self.first)
+        Collection.objects.update(products_count=7)
+
+        out = StringIO()
+        call_command('reconcile_products_counts', stdout=out)
+
+        self.assertIn(': 7 -> 1', out.getvalue())
+        self.assertIn('Reconciled 2 collections.', out.getvalue())
+        self.assertEqual((count(self.first), count(self.second)), (1, 0))
+
+    def test_admin_reads_the_column(self):
+        make_product(self.first)
+        self.client.force_login(create_superuser())
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get('/admin/store/collection/')
+        self.assertContains(resp, '1 Products')
+        self.assertFalse([query for query in queries.captured_queries
+                          if 'store_product' in query['sql']])
+
+
+class ProductsCountQueryTest(GraphQLTestCase):
+    """Test the `productsCount` of collections."""
+    GRAPHQL_URL = '/graphql'
+
+    def setUp(self) -> None:
+        super().setUp()
+        caches['graphql'].clear()
+
+    def test_products_count(self):
+        collection = create_collection()
+        make_product(collection)
+        make_product(collection)
+
+        with self.assertNumQueries(1):
+            resp = self.query(COLLECTION_COUNTS_QUERY, op_name='collections')
+        self.assertResponseNoErrors(resp)
+        node = resp.json()['data']['collections']['edges'][0]['node']
+        self.assertEqual(node['productsCount'], 2)
+
+        make_product(collection)
+        resp = self.query(COLLECTION_COUNTS_QUERY, op_name='collections')
+        node = resp.json()['data']['collections']['edges'][0]['node']
+        self.assertEqual(node['productsCount'], 3)
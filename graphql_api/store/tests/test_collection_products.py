@@ -0,0 +1,90 @@
+import json
+from decimal import Decimal
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from graphene_django.utils.testing import GraphQLTestCase
+from store.models import Collection, Product
+from .consts import *
+
+
+class CollectionProductsPageTest(GraphQLTestCase):
+    """Test paging the products of many collections in one query."""
+    GRAPHQL_URL = '/graphql'
+
+    def setUp(self) -> None:
+        caches['graphql'].clear()
+
+    def create_collections(self, collections, products):
+        for index in range(collections):
+            collection = Collection.objects.create(title=f'collection {index}')
+            # Created out of title order to check the page ordering.
+            for number in reversed(range(products)):
+                Product.objects.create(
+                    title=f'{index} product {number:02}', slug='-',
+                    unit_price=Decimal(10), inventory=1,
+                    collection=collection)
+
+    def query_pages(self, query=COLLECTION_PRODUCTS_PAGE_QUERY, **variables):
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.query(query, op_name='collectionProducts',
+                              variables=variables)
+        return resp, queries
+
+    def pages(self, resp):
+        self.assertResponseNoErrors(resp)
+        content = json.loads(resp.content)
+        return [edge['node']['products']
+                for edge in content['data']['collections']['edges']]
+
+    def test_first_products_of_every_collection(self):
+        self.create_collections(3, 5)
+
+        resp, _ = self.query_pages(first=2)
+
+        for index, page in enumerate(self.pages(resp)):
+            titles = [edge['node']['title'] for edge in page['edges']]
+            self.assertEqual(
+                titles, [f'{index} product 00', f'{index} product 01'])
+            self.assertEqual(page['totalCount'], 5)
+            self.assertTrue(page['pageInfo']['hasNextPage'])
+            self.assertFalse(page['pageInfo']['hasPreviousPage'])
+
+    def test_pages_cost_one_query_for_all_collections(self):
+        self.create_collections(2, 3)
+        _, queries_for_2 = self.query_pages(first=2)
+
+        self.create_collections(8, 3)
+        resp, queries_for_10 = self.query_pages(first=2)
+
+        self.assertEqual(len(self.pages(resp)), 10)
+        self.assertEqual(len(queries_for_2), 2)
+        self.assertEqual(len(queries_for_10), 2)
+        if connection.features.supports_over_clause:
+            self.assertIn('ROW_NUMBER', queries_for_10[-1]['sql'])
+
+    def test_after_cursor_reads_next_page(self):
+        self.create_collections(2, 5)
+        resp, _ = self.query_pages(first=2)
+        cursor = self.pages(resp)[0]['pageInfo']['endCursor']
+
+        resp, _ = self.query_pages(first=2, after=cursor)
+
+        for index, page in enumerate(self.pages(resp)):
+            titles = [edge['node']['title'] for edge in page['edges']]
+            self.assertEqual(
+                titles, [f'{index} product 02', f'{index} product 03'])
+            self.assertTrue(page['pageInfo']['hasPreviousPage'])
+
+        cursor = self.pages(resp)[0]['pageInfo']['endCursor']
+        resp, _ = self.query_pages(first=2, after=cursor)
+        page = self.pages(resp)[0]
+        self.assertEqual(len(page['edges']), 1)
+        self.assertFalse(page['pageInfo']['hasNextPage'])
+
+    def test_backward_paging_is_rejected(self):
+        self.create_collections(1, 1)
+
+        resp, _ = self.query_pages(COLLECTION_PRODUCTS_LAST_QUERY)
+
+        self.assertResponseHasErrors(resp)
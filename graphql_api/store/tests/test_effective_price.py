@@ -0,0 +1,163 @@
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from graphene_django.utils.testing import GraphQLTestCase
+from store.models import Product
+from store.pricing import apply_discount, recompute_effective_prices
+from store.services import (bulk_assign_promotions, bulk_create_products,
+                            bulk_update_products, cart_total)
+from .consts import *
+from graphql_api.utils import (create_cart, create_collection,
+                               create_product, create_promotion)
+
+
+def effective_price(product):
+    product.refresh_from_db(fields=['effective_price'])
+    return product.effective_price
+
+
+class EffectivePriceSyncTest(TestCase):
+    """Test keeping `Product.effective_price` in sync with promotions."""
+
+    def setUp(self) -> None:
+        self.product = create_product()
+        self.promotion = create_promotion(discount=20)
+
+    def test_defaults_to_unit_price(self):
+        self.assertEqual(effective_price(self.product), Decimal('65.00'))
+
+    def test_best_promotion_applies(self):
+        self.product.promotions.add(
+            self.promotion, create_promotion(discount=12.5))
+        self.assertEqual(effective_price(self.product), Decimal('52.00'))
+
+        self.product.promotions.remove(self.promotion)
+        self.assertEqual(effective_price(self.product), Decimal('56.88'))
+
+        self.product.promotions.clear()
+        self.assertEqual(effective_price(self.product), Decimal('65.00'))
+
+    def test_reverse_relation(self):
+        self.promotion.product_set.add(self.product)
+        self.assertEqual(effective_price(self.product), Decimal('52.00'))
+
+        self.promotion.product_set.clear()
+        self.assertEqual(effective_price(self.product), Decimal('65.00'))
+
+    def test_promotion_changes(self):
+        self.product.promotions.add(self.promotion)
+        self.promotion.discount = 50
+        self.promotion.save()
+        self.assertEqual(effective_price(self.product), Decimal('32.50'))
+
+        self.promotion.delete()
+        self.assertEqual(effective_price(self.product), Decimal('65.00'))
+
+    def test_price_change(self):
+        self.product.promotions.add(self.promotion)
+        self.product.unit_price = Decimal('10.05')
+        self.product.save()
+        self.assertEqual(self.product.effective_price, Decimal('8.04'))
+        self.assertEqual(effective_price(self.product), Decimal('8.04'))
+
+    def test_price_change_of_update_fields(self):
+        self.product.promotions.add(self.promotion)
+        self.product.unit_price = Decimal('10.05')
+        self.product.save(update_fields=['unit_price'])
+        self.assertEqual(effective_price(self.product), Decimal('8.04'))
+
+    def test_bulk_services(self):
+        collection = create_collection()
+        result = bulk_create_products([
+            {'title': 'a', 'slug': 'a', 'unit_price': '10.00', 'inventory': 1,
+             'collection_id': collection.id, 'promotions': [self.promotion.id]},
+            {'title': 'b', 'slug': 'b', 'unit_price': '10.00', 'inventory': 1,
+             'collection_id': collection.id},
+        ])
+        promoted, plain = result.created
+        self.assertEqual(effective_price(promoted), Decimal('8.00'))
+        self.assertEqual(effective_price(plain), Decimal('10.00'))
+
+        bulk_assign_promotions(Product.objects.filter(pk=plain.pk),
+                               [self.promotion.id])
+        self.assertEqual(effective_price(plain), Decimal('8.00'))
+
+        bulk_update_products(Product.objects.filter(pk=plain.pk),
+                             unit_price=Decimal('20.00'))
+        self.assertEqual(effective_price(plain), Decimal('16.00'))
+
+    def test_cart_total_is_promoted(self):
+        self.product.promotions.add(self.promotion)
+        cart = create_cart((self.product, 2))
+
+        self.assertEqual(cart_total(cart.pk), Decimal('104.00'))
+
+    def test_apply_discount(self):
+        self.assertEqual(apply_discount(Decimal('0.05'), 50), Decimal('0.03'))
+        self.assertEqual(apply_discount(Decimal('10.00'), 150), Decimal('0.00'))
+        self.assertEqual(apply_discount(Decimal('10.00'), None), Decimal('10.00'))
+
+    def test_sql_and_python_round_discount_alike(self):
+        # The discounts round to 12.35 and 0.01 before being applied.
+        for discount, price in ((12.345, '56.97'), (0.005, '64.99')):
+            promotion = create_promotion(discount=discount)
+            self.product.promotions.set([promotion])
+            self.product.save()
+            self.assertEqual(effective_price(self.product), Decimal(price))
+
+            Product.objects.update(effective_price=0)
+            recompute_effective_prices(Product.objects.all())
+            self.assertEqual(effective_price(self.product), Decimal(price))
+
+    def test_recompute_in_chunks(self):
+        products = [self.product, create_product(), create_product()]
+        self.promotion.product_set.add(*products)
+        Product.objects.update(effective_price=0)
+
+        with self.assertNumQueries(5):
+            self.assertEqual(recompute_effective_prices(
+                Product.objects.all(), chunk_size=2), 3)
+
+        self.assertEqual([effective_price(product) for product in products],
+                         [Decimal('52.00')] * 3)
+
+    def test_recompute_command(self):
+        self.product.promotions.add(self.promotion)
+        Product.objects.update(effective_price=0)
+
+        out = StringIO()
+        call_command('recompute_effective_prices', chunk_size=1, stdout=out)
+
+        self.assertIn('Recomputed 1 effective prices', out.getvalue())
+        self.assertEqual(effective_price(self.product), Decimal('52.00'))
+
+
+class EffectivePriceQueryTest(GraphQLTestCase):
+    """Test filtering and ordering products on their effective price."""
+    GRAPHQL_URL = '/graphql'
+
+    def test_filter_and_order(self):
+        cheap, regular = create_product(), create_product()
+        cheap.promotions.add(create_promotion(discount=50))
+
+        resp = self.query(
+            EFFECTIVE_PRICE_PRODUCTS_QUERY,
+            op_name='allProducts',
+            variables={'effectivePrice_Lt': 60, 'orderBy': 'effective_price'}
+        )
+        self.assertResponseNoErrors(resp)
+        nodes = [edge['node'] for edge in resp.json()['data']['allProducts']['edges']]
+        self.assertEqual(len(nodes), 1)
+        self.assertEqual(nodes[0]['effectivePrice'], '32.50')
+        self.assertEqual(nodes[0]['unitPrice'], '65.00')
+
+        resp = self.query(
+            EFFECTIVE_PRICE_PRODUCTS_QUERY,
+            op_name='allProducts',
+            variables={'orderBy': '-effective_price'}
+        )
+        self.assertResponseNoErrors(resp)
+        prices = [edge['node']['effectivePrice']
+                  for edge in resp.json()['data']['allProducts']['edges']]
+        self.assertEqual(prices, ['65.00', '32.50'])
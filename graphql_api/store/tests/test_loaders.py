@@ -0,0 +1,64 @@
+import json
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from graphene_django.utils.testing import GraphQLTestCase
+from store.models import Product, Review
+from .consts import *
+from graphql_api.utils import create_collection, create_promotion
+
+
+class ProductLoadersTest(GraphQLTestCase):
+    """Test that nested product relations are resolved in batches."""
+    GRAPHQL_URL = '/graphql'
+
+    def create_products(self, count):
+        promotion_1 = create_promotion()
+        promotion_2 = create_promotion(description='Tiregan', discount=10)
+        for index in range(count):
+            collection = create_collection()
+            product = Product.objects.create(
+                title=f'product {index}', slug=f'product-{index}',
+                unit_price='10.00', inventory=10, collection=collection)
+            collection.featured_product = product
+            collection.save()
+            product.promotions.add(promotion_1, promotion_2)
+            Review.objects.create(
+                product=product, name='reviewer', description='Good')
+
+    def query_nested_products(self, first):
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.query(
+                NESTED_PRODUCTS_QUERY,
+                op_name='nestedProducts',
+                variables={'first': first}
+            )
+        self.assertResponseNoErrors(resp)
+        return json.loads(resp.content), len(queries)
+
+    def test_nested_relations_are_resolved(self):
+        self.create_products(3)
+
+        content, _ = self.query_nested_products(3)
+        products = [item['node']
+                    for item in content['data']['allProducts']['edges']]
+
+        self.assertEqual(len(products), 3)
+        for product in products:
+            self.assertEqual(
+                product['collection']['featuredProduct']['title'],
+                product['title'])
+            self.assertEqual(len(product['promotions']['edges']), 2)
+            reviews = product['reviews']['edges']
+            self.assertEqual(len(reviews), 1)
+            self.assertEqual(
+                reviews[0]['node']['product']['title'], product['title'])
+
+    def test_nested_query_count_is_constant(self):
+        self.create_products(10)
+        _, queries_for_10 = self.query_nested_products(10)
+
+        self.create_products(90)
+        content, queries_for_100 = self.query_nested_products(100)
+
+        self.assertEqual(len(content['data']['allProducts']['edges']), 100)
+        self.assertEqual(queries_for_10, queries_for_100)
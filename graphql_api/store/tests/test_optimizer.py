@@ -0,0 +1,103 @@
+import json
+from types import SimpleNamespace
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from graphene_django.utils.testing import GraphQLTestCase
+from graphql import parse
+from graphql.language import ast
+from .consts import *
+from graphql_api.optimizer import build_plan
+from graphql_api.schema import schema
+from graphql_api.store.types import ProductType
+from graphql_api.utils import create_product
+
+
+def column(table, name):
+    quote = connection.ops.quote_name
+    return f'{quote(table)}.{quote(name)}'
+
+
+class QueryOptimizerTest(GraphQLTestCase):
+    """Test that querysets load only what the selection set asks for."""
+    GRAPHQL_URL = '/graphql'
+
+    def execute(self, query, op_name, variables=None):
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.query(query, op_name=op_name, variables=variables)
+        self.assertResponseNoErrors(resp)
+        return json.loads(resp.content), [q['sql'] for q in queries]
+
+    def test_only_selected_columns_are_loaded(self):
+        create_product()
+
+        _, queries = self.execute(PRODUCT_TITLES_QUERY, 'productTitles')
+        select = queries[-1]
+
+        self.assertIn(column('store_product', 'title'), select)
+        self.assertNotIn(column('store_product', 'description'), select)
+        self.assertNotIn('JOIN', select)
+
+    def test_forward_relation_is_joined(self):
+        product = create_product()
+
+        content, queries = self.execute(
+            PRODUCTS_WITH_COLLECTION_QUERY, 'productsWithCollection')
+        node = content['data']['allProducts']['edges'][0]['node']
+
+        self.assertEqual(node['collection']['title'], product.collection.title)
+        self.assertEqual(len(queries), 1)
+        self.assertIn('JOIN', queries[-1])
+        self.assertIn(column('store_collection', 'title'), queries[-1])
+        self.assertNotIn(
+            column('store_collection', 'featured_product_id'), queries[-1])
+
+    def test_reverse_relation_is_prefetched(self):
+        product = create_product()
+
+        content, queries = self.execute(
+            COLLECTIONS_WITH_PRODUCTS_QUERY, 'collectionsWithProducts')
+        collection = content['data']['collections']['edges'][0]['node']
+        products = collection['products']['edges']
+
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(products[0]['node']['title'], product.title)
+        self.assertNotIn(column('store_product', 'description'), queries[-1])
+
+    def test_single_product_loads_selected_columns(self):
+        product = create_product()
+
+        content, queries = self.execute(
+            PRODUCT_QUERY, 'product', variables={'productId': product.id})
+
+        self.assertEqual(content['data']['product']['title'], product.title)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn(column('store_product', 'description'), queries[0])
+
+
+class BuildPlanTest(SimpleTestCase):
+    """Test planning the selection of an abstract field."""
+
+    def plan(self, query):
+        document = parse(query)
+        operation, *definitions = document.definitions
+        info = SimpleNamespace(schema=schema, fragments={
+            definition.name.value: definition for definition in definitions
+            if isinstance(definition, ast.FragmentDefinition)
+        })
+        return build_plan(
+            ProductType, info, operation.selection_set.selections)
+
+    def test_fragments_on_other_types_are_skipped(self):
+        plan = self.plan('''
+            { node {
+                ... on Node { id }
+                ... on ProductType { title }
+                ... on ReviewType { description product { title } }
+                ...collection
+            } }
+            fragment collection on CollectionType { featuredProduct { id } }
+        ''')
+
+        self.assertEqual(plan.only, {'id', 'title'})
+        self.assertEqual(plan.select_related, set())
@@ -0,0 +1,128 @@
+import json
+from datetime import date
+from decimal import Decimal
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from graphene_django.utils.testing import GraphQLTestCase
+from store.models import Product
+from .consts import *
+from graphql_api.utils import create_collection
+
+
+class KeysetPaginationTest(GraphQLTestCase):
+    """Test keyset cursors of the products connection."""
+    GRAPHQL_URL = '/graphql'
+
+    def setUp(self) -> None:
+        super().setUp()
+        collection = create_collection()
+        prices = ['30.00', '10.00', '20.00', '10.00', '50.00', '40.00']
+        for index, price in enumerate(prices):
+            Product.objects.create(
+                title=f'product {index}', slug=f'product-{index}',
+                unit_price=Decimal(price), inventory=10,
+                collection=collection)
+        # The others have no reviews.
+        for index, day in ((0, 3), (2, 1), (4, 3)):
+            Product.objects.filter(title=f'product {index}').update(
+                last_review_date=date(2024, 1, day))
+
+    def paginate(self, **variables):
+        resp = self.query(
+            PAGINATED_PRODUCTS_QUERY,
+            op_name='paginatedProducts',
+            variables=variables
+        )
+        self.assertResponseNoErrors(resp)
+        return json.loads(resp.content)['data']['allProducts']
+
+    def walk(self, order_by):
+        titles = []
+        page = self.paginate(first=4, orderBy=order_by)
+        titles += [edge['node']['title'] for edge in page['edges']]
+        while page['pageInfo']['hasNextPage']:
+            page = self.paginate(
+                first=4, orderBy=order_by, after=page['pageInfo']['endCursor'])
+            self.assertTrue(page['pageInfo']['hasPreviousPage'])
+            titles += [edge['node']['title'] for edge in page['edges']]
+        return titles
+
+    def test_pages_follow_ordering(self):
+        expected = [product.title for product
+                    in Product.objects.order_by('unit_price', 'id')]
+
+        self.assertEqual(self.walk('unitPrice'), expected)
+
+    def test_pages_follow_descending_ordering(self):
+        expected = [product.title for product
+                    in Product.objects.order_by('-unit_price', '-id')]
+
+        self.assertEqual(self.walk('-unitPrice'), expected)
+
+    def test_pages_cross_null_values(self):
+        ordered = Product.objects.order_by(
+            F('last_review_date').asc(nulls_first=True), 'id')
+        expected = [product.title for product in ordered]
+
+        self.assertEqual(self.walk('lastReviewDate'), expected)
+        self.assertEqual(self.walk('-lastReviewDate'), expected[::-1])
+
+    def test_backward_pagination_crosses_null_values(self):
+        page = self.paginate(first=2, orderBy='lastReviewDate')
+        rest = self.paginate(
+            first=4, orderBy='lastReviewDate',
+            after=page['pageInfo']['endCursor'])
+
+        previous = self.paginate(
+            last=2, orderBy='lastReviewDate',
+            before=rest['pageInfo']['startCursor'])
+
+        self.assertEqual(previous['edges'], page['edges'])
+
+    def test_backward_pagination(self):
+        page = self.paginate(first=3, orderBy='unitPrice')
+        last_page = self.paginate(
+            first=3, orderBy='unitPrice', after=page['pageInfo']['endCursor'])
+
+        previous = self.paginate(
+            last=3, orderBy='unitPrice',
+            before=last_page['pageInfo']['startCursor'])
+
+        self.assertEqual(previous['edges'], page['edges'])
+        self.assertTrue(previous['pageInfo']['hasNextPage'])
+        self.assertFalse(previous['pageInfo']['hasPreviousPage'])
+
+    def test_zero_rows(self):
+        for variables in ({'first': 0}, {'last': 0}):
+            page = self.paginate(orderBy='unitPrice', **variables)
+
+            self.assertEqual(page['edges'], [])
+
+    def test_cursor_of_other_ordering_is_rejected(self):
+        page = self.paginate(first=2, orderBy='unitPrice')
+
+        resp = self.query(
+            PAGINATED_PRODUCTS_QUERY,
+            op_name='paginatedProducts',
+            variables={'first': 2, 'orderBy': 'lastUpdate',
+                       'after': page['pageInfo']['endCursor']}
+        )
+        content = json.loads(resp.content)
+
+        self.assertEqual(content['errors'][0]['message'], 'Invalid cursor.')
+
+    def test_total_count_is_opt_in(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.paginate(first=2)
+        self.assertEqual(len(queries), 1)
+
+        resp = self.query(
+            COUNTED_PRODUCTS_QUERY,
+            op_name='countedProducts',
+            variables={'first': 2}
+        )
+        content = json.loads(resp.content)
+
+        self.assertResponseNoErrors(resp)
+        self.assertEqual(content['data']['allProducts']['totalCount'], 6)
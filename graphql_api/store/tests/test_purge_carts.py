@@ -0,0 +1,43 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from store.models import Cart, CartItem
+from store.services import purge_expired_carts
+from graphql_api.utils import create_cart, create_product
+
+
+class PurgeCartsTest(TestCase):
+    """Test deleting expired carts in chunks."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.product = create_product()
+        self.fresh = create_cart((self.product, 1))
+        self.expired = [create_cart((self.product, 2)) for _ in range(5)]
+        Cart.objects.filter(pk__in=[cart.pk for cart in self.expired]) \
+            .update(created_at=timezone.now() - timedelta(days=40))
+
+    def test_expired_carts_are_deleted_in_chunks(self):
+        chunks = []
+
+        result = purge_expired_carts(
+            timezone.now() - timedelta(days=30), chunk_size=2,
+            on_chunk=chunks.append)
+
+        self.assertEqual((result.carts, result.items), (5, 5))
+        self.assertEqual([chunk.carts for chunk in chunks], [2, 2, 1])
+        self.assertEqual(list(Cart.objects.all()), [self.fresh])
+        self.assertEqual(CartItem.objects.get().cart, self.fresh)
+
+    def test_command_reports_throughput(self):
+        out = StringIO()
+
+        call_command('purge_carts', '--older-than', '30d', '--orphans',
+                     stdout=out)
+
+        self.assertIn('Deleted 5 carts and 5 items', out.getvalue())
+        self.assertIn('carts/s', out.getvalue())
+        self.assertIn('Deleted 0 orphaned items', out.getvalue())
+        self.assertEqual(Cart.objects.count(), 1)
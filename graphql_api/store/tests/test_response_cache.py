@@ -0,0 +1,105 @@
+import json
+from django.core.cache import caches
+from graphene_django.utils.testing import GraphQLTestCase
+from store.models import Product
+from store.services import bulk_create_products
+from .consts import *
+from graphql_api.utils import create_product, create_user
+
+
+class ResponseCacheTest(GraphQLTestCase):
+    """Test the response cache of anonymous catalog queries."""
+    GRAPHQL_URL = '/graphql'
+
+    def setUp(self) -> None:
+        super().setUp()
+        caches['graphql'].clear()
+        self.product = create_product()
+
+    def query_product(self, product):
+        resp = self.query(
+            PRODUCT_QUERY,
+            op_name='product',
+            variables={'productId': product.id}
+        )
+        self.assertResponseNoErrors(resp)
+        return json.loads(resp.content)['data']['product']
+
+    def test_repeated_query_is_served_from_cache(self):
+        self.query_product(self.product)
+
+        with self.assertNumQueries(0):
+            product = self.query_product(self.product)
+
+        self.assertEqual(product['title'], self.product.title)
+
+    def test_changed_row_expires_entry(self):
+        self.query_product(self.product)
+        self.product.title = 'Renamed product'
+        self.product.save()
+
+        product = self.query_product(self.product)
+
+        self.assertEqual(product['title'], 'Renamed product')
+
+    def test_unrelated_row_keeps_entry(self):
+        self.query_product(self.product)
+        other = create_product()
+        other.title = 'Other product'
+        other.save()
+
+        with self.assertNumQueries(0):
+            self.query_product(self.product)
+
+    def test_new_row_expires_lists(self):
+        self.query(ALL_PRODUCTS_QUERY, op_name='allProducts')
+        create_product()
+
+        resp = self.query(ALL_PRODUCTS_QUERY, op_name='allProducts')
+        content = json.loads(resp.content)
+
+        self.assertEqual(len(content['data']['allProducts']['edges']), 2)
+
+    def test_bulk_created_rows_expire_lists(self):
+        self.query(ALL_PRODUCTS_QUERY, op_name='allProducts')
+        bulk_create_products([{
+            'title': 'Bulk product', 'slug': 'bulk-product',
+            'unit_price': '10', 'inventory': 1,
+            'collection_id': self.product.collection_id,
+        }])
+
+        resp = self.query(ALL_PRODUCTS_QUERY, op_name='allProducts')
+        content = json.loads(resp.content)
+
+        self.assertEqual(len(content['data']['allProducts']['edges']), 2)
+
+    def test_authenticated_queries_are_not_cached(self):
+        self.client.force_login(create_user())
+        self.query_product(self.product)
+
+        with self.assertNumQueries(3):
+            self.query_product(self.product)
+
+    def test_mutation_result_is_not_stale(self):
+        self.query_product(self.product)
+        self.client.force_login(create_user())
+
+        resp = self.query(
+            EDIT_PRODUCT_MUTATION,
+            op_name='editProduct',
+            variables={
+                'productId': self.product.id,
+                'title': 'Edited product',
+                'slug': 'edited-product',
+                'unitPrice': '60.50',
+                'inventory': 20,
+                'collectionId': self.product.collection.id,
+                'promotions': []
+            }
+        )
+        self.assertResponseNoErrors(resp)
+        self.client.logout()
+
+        product = self.query_product(self.product)
+
+        self.assertEqual(product['title'], 'Edited product')
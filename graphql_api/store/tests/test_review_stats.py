@@ -0,0 +1,117 @@
+from datetime import date
+from io import StringIO
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase
+from graphene_django.utils.testing import GraphQLTestCase
+from graphql_relay import from_global_id
+from store.models import Product, Review
+from .consts import *
+from graphql_api.utils import create_product
+
+
+def stats(product):
+    product.refresh_from_db(fields=['review_count', 'last_review_date'])
+    return product.review_count, product.last_review_date
+
+
+def add_review(product):
+    return Review.objects.create(
+        product=product, name='name', description='description')
+
+
+class ReviewStatsTest(TestCase):
+    """Test keeping the review statistics of products current."""
+
+    def setUp(self) -> None:
+        self.product = create_product()
+
+    def test_insert_and_delete(self):
+        self.assertEqual(stats(self.product), (0, None))
+
+        first = add_review(self.product)
+        second = add_review(self.product)
+        self.assertEqual(stats(self.product), (2, date.today()))
+
+        Review.objects.filter(pk=first.pk).update(date=date(2020, 1, 1))
+        second.delete()
+        self.assertEqual(stats(self.product), (1, date(2020, 1, 1)))
+
+        Review.objects.all().delete()
+        self.assertEqual(stats(self.product), (0, None))
+
+    def test_drifted_count_stays_at_zero(self):
+        review = add_review(self.product)
+        Product.objects.filter(pk=self.product.pk).update(review_count=0)
+
+        review.delete()
+        self.assertEqual(stats(self.product), (0, None))
+
+    def test_one_update_per_review(self):
+        # Savepoint, insert, update, release.
+        with self.assertNumQueries(4):
+            add_review(self.product)
+
+    def test_product_delete_skips_updates(self):
+        add_review(self.product)
+        add_review(self.product)
+        # Collecting, deleting the reviews and the product, and counting the
+        # product out of its collection.
+        with self.assertNumQueries(8):
+            self.product.delete()
+
+    def test_rebuild_command(self):
+        add_review(self.product)
+        Product.objects.update(review_count=5, last_review_date=None)
+
+        out = StringIO()
+        call_command('rebuild_review_stats', chunk_size=1, stdout=out)
+
+        self.assertIn('of 1 products', out.getvalue())
+        self.assertEqual(stats(self.product), (1, date.today()))
+
+
+class PopularProductsTest(GraphQLTestCase):
+    """Test ordering products by their number of reviews."""
+    GRAPHQL_URL = '/graphql'
+
+    def setUp(self) -> None:
+        super().setUp()
+        caches['graphql'].clear()
+
+    def popular(self, **variables):
+        resp = self.query(
+            POPULAR_PRODUCTS_QUERY,
+            op_name='allProducts',
+            variables=variables
+        )
+        self.assertResponseNoErrors(resp)
+        return resp.json()['data']['allProducts']
+
+    def test_order_by_popularity(self):
+        quiet, popular, known = create_product(), create_product(), create_product()
+        for product, count in ((popular, 3), (known, 1)):
+            for _ in range(count):
+                add_review(product)
+
+        nodes = [edge['node'] for edge in self.popular()['edges']]
+        self.assertEqual(
+            [int(from_global_id(node['id'])[1]) for node in nodes],
+            [popular.id, known.id, quiet.id])
+        self.assertEqual(nodes[0]['reviewCount'], 3)
+        self.assertEqual(nodes[0]['lastReviewDate'], date.today().isoformat())
+        self.assertIsNone(nodes[2]['lastReviewDate'])
+
+        page = self.popular(first=1)
+        page = self.popular(first=1, after=page['pageInfo']['endCursor'])
+        self.assertEqual(page['edges'][0]['node']['reviewCount'], 1)
+
+    def test_new_review_expires_cached_list(self):
+        product = create_product()
+        self.assertEqual(
+            self.popular()['edges'][0]['node']['reviewCount'], 0)
+
+        add_review(product)
+
+        self.assertEqual(
+            self.popular()['edges'][0]['node']['reviewCount'], 1)
@@ -0,0 +1,116 @@
+from decimal import Decimal
+from django.db import connection
+from django.test import TestCase
+from graphene_django.utils.testing import GraphQLTestCase
+from store.models import Product
+from store.search import search_products, snippet
+from .consts import *
+from graphql_api.utils import create_collection
+
+
+def make_product(collection, title, description='', unit_price=Decimal(10)):
+    return Product.objects.create(
+        title=title, slug='-', description=description,
+        unit_price=unit_price, inventory=1, collection=collection)
+
+
+class SearchProductsTest(GraphQLTestCase):
+    """Test the full-text search of products."""
+    GRAPHQL_URL = '/graphql'
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.collection = create_collection()
+        self.bread = make_product(
+            self.collection, 'Bread Ww Cluster', 'fresh bread baked daily')
+        self.rye = make_product(
+            self.collection, 'Rye Loaf', 'dark bread with seeds',
+            unit_price=Decimal(4))
+        make_product(self.collection, 'Island Oasis', 'raspberry juice')
+
+    def search(self, **variables):
+        resp = self.query(
+            SEARCH_PRODUCTS_QUERY,
+            op_name='searchProducts',
+            variables=variables
+        )
+        self.assertResponseNoErrors(resp)
+        return resp.json()['data']['searchProducts']
+
+    def test_best_match_first(self):
+        edges = self.search(query='bread')['edges']
+
+        titles = [edge['node']['title'] for edge in edges]
+        self.assertEqual(titles, ['Bread Ww Cluster', 'Rye Loaf'])
+        self.assertGreaterEqual(edges[0]['relevance'], edges[1]['relevance'])
+        self.assertEqual(edges[1]['snippet'],
+                         'dark <mark>bread</mark> with seeds')
+
+    def test_filters(self):
+        edges = self.search(query='bread', maxPrice='5')['edges']
+        self.assertEqual([edge['node']['title'] for edge in edges],
+                         ['Rye Loaf'])
+
+        other = create_collection()
+        edges = self.search(query='bread', collectionId=other.id)['edges']
+        self.assertEqual(edges, [])
+
+    def test_pagination(self):
+        page = self.search(query='bread', first=1)
+        self.assertTrue(page['pageInfo']['hasNextPage'])
+
+        page = self.search(query='bread', first=1,
+                           after=page['pageInfo']['endCursor'])
+        self.assertEqual([edge['node']['title'] for edge in page['edges']],
+                         ['Rye Loaf'])
+        self.assertFalse(page['pageInfo']['hasNextPage'])
+
+    def test_first_zero_is_empty(self):
+        page = self.search(query='bread', first=0)
+
+        self.assertEqual(page['edges'], [])
+        self.assertTrue(page['pageInfo']['hasNextPage'])
+
+    def test_operators_are_ignored(self):
+        edges = self.search(query='"bread" OR -juice*')['edges']
+        self.assertEqual(len(edges), 3)
+        self.assertEqual(self.search(query='***')['edges'], [])
+
+    def test_index_follows_changes(self):
+        self.rye.title = 'Pumpernickel'
+        self.rye.description = 'dark rye'
+        self.rye.save()
+        self.bread.delete()
+
+        self.assertEqual(self.search(query='bread')['edges'], [])
+        edges = self.search(query='pumpernickel')['edges']
+        self.assertEqual(len(edges), 1)
+
+
+class SnippetTest(TestCase):
+    """Test highlighting search terms."""
+
+    def test_marks_and_escapes(self):
+        self.assertEqual(snippet('Salt & <b>Pepper</b> mix', ['pepper']),
+                         'Salt &amp; &lt;b&gt;<mark>Pepper</mark>&lt;/b&gt; mix')
+
+    def test_window(self):
+        text = ' '.join(f'w{index}' for index in range(40))
+        self.assertEqual(snippet(text, ['w20'], words=4),
+                         '… w18 w19 <mark>w20</mark> w21 …')
+        self.assertIsNone(snippet(text, ['bread']))
+
+
+class SearchIndexTest(TestCase):
+    """Test that the index survives a rebuild of the SQLite table."""
+
+    def test_triggers_are_restored(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite triggers only.')
+        from store.search import restore_search_triggers
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER store_product_fts_insert')
+        restore_search_triggers(connection)
+
+        make_product(create_collection(), 'Sourdough')
+        self.assertEqual(search_products('sourdough').count(), 1)
@@ -1,48 +1,148 @@
+import graphene
 from graphene import relay
 from graphene_django import DjangoObjectType
-from store.models import Product, Collection, Review, Cart, Promotion
+from store.models import (Product, Collection, Review, Cart, CartItem,
+                          Promotion, Order, OrderItem)
+from store.services import cart_total
+from ..cache import CacheTagsMixin, model_tag, record_tags
+from ..loaders import load_related
+from ..optimizer import QueryOptimizerMixin
+from ..pagination import CountableConnection, related_page
 
-class CollectionType(DjangoObjectType):
+class CollectionType(CacheTagsMixin, QueryOptimizerMixin, DjangoObjectType):
     class Meta:
-        fields = ('id', 'title', 'products', 'featured_product')
+        fields = ('id', 'title', 'products', 'products_count',
+                  'featured_product')
         filter_fields = {
             'title': ['exact', 'icontains', 'istartswith'],
             'id': ['exact']
         }
         interfaces = (relay.Node, )
+        connection_class = CountableConnection
         model = Collection
 
-    @classmethod
-    def get_queryset(cls, queryset, info):
-        return queryset.prefetch_related('products')
+    cache_control_max_age = 300
 
-class ProductType(DjangoObjectType):
+    products = relay.ConnectionField(
+        graphene.NonNull(lambda: ProductType._meta.connection))
+
+    # `products` is read a page per collection by `related_page`, its
+    # `totalCount` comes from the denormalized count.
+    optimizer_paginated = ('products',)
+    optimizer_hints = {'products': ('products_count',)}
+
+    def resolve_products(self, info, **kwargs):
+        return related_page(ProductType, info, self, 'products',
+                            total_count=self.products_count, **kwargs)
+
+    def resolve_featured_product(self, info):
+        return load_related(info, self, 'featured_product')
+
+class ProductType(CacheTagsMixin, QueryOptimizerMixin, DjangoObjectType):
     class Meta:
         model = Product
         interfaces = (relay.Node, )
+        connection_class = CountableConnection
+
+    # Prices and inventory change more often than collections.
+    cache_control_max_age = 60
+
+    def resolve_collection(self, info):
+        return load_related(info, self, 'collection')
+
+    def resolve_promotions(self, info, **kwargs):
+        return load_related(info, self, 'promotions')
+
+    def resolve_reviews(self, info, **kwargs):
+        return load_related(info, self, 'reviews')
 
-    @classmethod
-    def get_queryset(cls, queryset, info):
-        return queryset.select_related('collection')
+class ProductSearchConnection(relay.Connection):
+    """Products matching a search, best match first."""
+    class Meta:
+        node = ProductType
+
+    class Edge:
+        relevance = graphene.Float()
+        snippet = graphene.String(
+            description='Matching words of the product wrapped in <mark>.')
 
-class PromotionType(DjangoObjectType):
+class SuggestionType(graphene.ObjectType):
+    """A product or collection title matching an autocomplete prefix."""
+    kind = graphene.String(description='"product" or "collection".')
+    id = graphene.ID()
+    title = graphene.String()
+
+class PromotionType(CacheTagsMixin, QueryOptimizerMixin, DjangoObjectType):
     class Meta:
         model = Promotion
         fields = '__all__'
         interfaces = (relay.Node, )
+        connection_class = CountableConnection
+
+    cache_control_max_age = 60
 
-class ReviewType(DjangoObjectType):
+class ReviewType(CacheTagsMixin, QueryOptimizerMixin, DjangoObjectType):
     class Meta:
         model = Review
         fields = '__all__'
         interfaces = (relay.Node, )
+        connection_class = CountableConnection
 
-    @classmethod
-    def get_queryset(cls, queryset, info):
-        return queryset.select_related('product')
+    def resolve_product(self, info):
+        return load_related(info, self, 'product')
 
-class CartType(DjangoObjectType):
+class CartType(CacheTagsMixin, QueryOptimizerMixin, DjangoObjectType):
     class Meta:
         model = Cart
         fields = '__all__'
-        interfaces = (relay.Node, )
\ No newline at end of file
+        interfaces = (relay.Node, )
+        connection_class = CountableConnection
+
+    items = graphene.List(graphene.NonNull(lambda: CartItemType))
+    total_price = graphene.Decimal()
+
+    def resolve_items(self, info):
+        return load_related(info, self, 'items')
+
+    def resolve_total_price(self, info):
+        # The total changes with the prices of the products.
+        record_tags(info, model_tag(Product))
+        return cart_total(self.pk)
+
+
+class CartItemType(QueryOptimizerMixin, DjangoObjectType):
+    class Meta:
+        model = CartItem
+        fields = ('id', 'product', 'quantity')
+
+    def resolve_product(self, info):
+        return load_related(info, self, 'product')
+
+
+class OrderType(QueryOptimizerMixin, DjangoObjectType):
+    class Meta:
+        model = Order
+        fields = ('id', 'placed_at', 'payment_status', 'items')
+        interfaces = (relay.Node, )
+        connection_class = CountableConnection
+
+    items = graphene.List(graphene.NonNull(lambda: OrderItemType))
+
+    def resolve_items(self, info):
+        return load_related(info, self, 'items')
+
+
+class OrderItemType(QueryOptimizerMixin, DjangoObjectType):
+    class Meta:
+        model = OrderItem
+        fields = ('id', 'product', 'quantity', 'unit_price')
+
+    def resolve_product(self, info):
+        return load_related(info, self, 'product')
+
+
+class RowErrorType(graphene.ObjectType):
+    """Error of one input row of a bulk mutation."""
+    row = graphene.Int(required=True)
+    field = graphene.String()
+    message = graphene.String(required=True)
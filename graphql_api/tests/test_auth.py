@@ -0,0 +1,93 @@
+import json
+from unittest import mock
+from django.contrib.auth import authenticate
+from django.core.cache import caches
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from graphene_django.utils.testing import GraphQLTestCase
+from graphql_jwt.exceptions import JSONWebTokenError
+from graphql_jwt.shortcuts import get_token
+from graphql_jwt.utils import get_payload
+from graphql_api.auth import tokens
+from graphql_api.utils import create_user
+
+ME_QUERY = '{ me { username } }'
+
+
+class CachedJSONWebTokenBackendTest(GraphQLTestCase):
+    """Test caching the users of JSON web tokens."""
+    GRAPHQL_URL = '/graphql'
+
+    def setUp(self) -> None:
+        super().setUp()
+        caches['graphql'].clear()
+        tokens.clear()
+        self.user = create_user()
+        self.headers = {'HTTP_AUTHORIZATION': f'JWT {get_token(self.user)}'}
+
+    def me(self):
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.query(ME_QUERY, headers=self.headers)
+        return resp, queries
+
+    def test_user_is_loaded_once_per_token(self):
+        resp, first = self.me()
+        self.assertResponseNoErrors(resp)
+        self.assertEqual(
+            json.loads(resp.content)['data']['me']['username'],
+            self.user.username)
+
+        resp, second = self.me()
+        self.assertResponseNoErrors(resp)
+        self.assertEqual(len(first), 1)
+        self.assertEqual(len(second), 0)
+
+    def test_token_is_decoded_once_per_request(self):
+        request = RequestFactory().post('/graphql', **self.headers)
+
+        with mock.patch('graphql_api.auth.get_payload',
+                        wraps=get_payload) as decode:
+            self.assertEqual(authenticate(request=request), self.user)
+            self.assertEqual(authenticate(request=request), self.user)
+
+        self.assertEqual(decode.call_count, 1)
+
+    def test_saving_user_invalidates_tokens(self):
+        self.me()
+        self.user.is_active = False
+        self.user.save()
+
+        resp, _ = self.me()
+
+        self.assertResponseHasErrors(resp)
+        self.assertEqual(len(tokens), 0)
+
+    def test_deleting_user_invalidates_tokens(self):
+        self.me()
+        self.user.delete()
+
+        resp, _ = self.me()
+
+        self.assertResponseHasErrors(resp)
+
+    def test_cached_user_is_a_copy(self):
+        self.me()
+        request = RequestFactory().post('/graphql', **self.headers)
+        user = authenticate(request=request)
+        user.first_name = 'changed'
+
+        request = RequestFactory().post('/graphql', **self.headers)
+        self.assertEqual(authenticate(request=request).first_name, '')
+
+    def test_token_with_other_payload_is_not_cached(self):
+        self.me()
+        token = self.headers['HTTP_AUTHORIZATION'][len('JWT '):]
+        header, payload, signature = token.split('.')
+        forged = '.'.join((header, payload + 'A', signature))
+
+        request = RequestFactory().post(
+            '/graphql', HTTP_AUTHORIZATION=f'JWT {forged}')
+
+        with self.assertRaises(JSONWebTokenError):
+            authenticate(request=request)
@@ -0,0 +1,48 @@
+from django.test import SimpleTestCase
+from graphql_api.backend import CachedDocumentBackend
+from graphql_api.schema import schema
+
+PRODUCT_TITLES_QUERY = '{ allProducts { edges { node { title } } } }'
+UNKNOWN_FIELD_QUERY = '{ allProducts { edges { node { unknownField } } } }'
+
+
+def aliased_query(alias):
+    return f'{{ {alias}: allProducts {{ pageInfo {{ hasNextPage }} }} }}'
+
+
+class CachedDocumentBackendTest(SimpleTestCase):
+    """Test the parsed and validated document cache."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.backend = CachedDocumentBackend(max_size=2)
+
+    def test_repeated_query_is_a_hit(self):
+        first = self.backend.document_from_string(schema, PRODUCT_TITLES_QUERY)
+        second = self.backend.document_from_string(schema, PRODUCT_TITLES_QUERY)
+
+        self.assertIs(first, second)
+        self.assertEqual(self.backend.hits, 1)
+        self.assertEqual(self.backend.misses, 1)
+
+    def test_validation_errors_are_cached(self):
+        self.backend.document_from_string(schema, UNKNOWN_FIELD_QUERY)
+        document = self.backend.document_from_string(schema, UNKNOWN_FIELD_QUERY)
+        result = document.execute()
+
+        self.assertTrue(result.invalid)
+        self.assertIn('unknownField', result.errors[0].message)
+        self.assertEqual(self.backend.hits, 1)
+
+    def test_least_recently_used_document_is_evicted(self):
+        self.backend.document_from_string(schema, aliased_query('a'))
+        self.backend.document_from_string(schema, aliased_query('b'))
+        self.backend.document_from_string(schema, aliased_query('a'))
+        self.backend.document_from_string(schema, aliased_query('c'))
+
+        self.backend.document_from_string(schema, aliased_query('a'))
+        self.backend.document_from_string(schema, aliased_query('b'))
+
+        self.assertEqual(self.backend.cache_info()['size'], 2)
+        self.assertEqual(self.backend.hits, 2)
+        self.assertEqual(self.backend.misses, 4)
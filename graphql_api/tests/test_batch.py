@@ -0,0 +1,120 @@
+import json
+from unittest import mock
+from django.core.cache import caches
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from graphene_django.utils.testing import GraphQLTestCase
+from graphql_jwt.shortcuts import get_token
+from graphql_jwt.utils import get_payload
+from graphql_api.auth import tokens
+from graphql_api.parallel import map_in_pool
+from graphql_api.utils import create_product, create_user
+
+PRODUCTS_QUERY = '{ allProducts { edges { node { title } } } }'
+COUNT_QUERY = 'query count { allProducts { totalCount } }'
+ME_QUERY = '{ me { username } }'
+
+
+class BatchTestMixin:
+    def post_batch(self, batch, **headers):
+        return self.client.post(
+            '/graphql', json.dumps(batch), content_type='application/json',
+            **headers)
+
+
+class BatchTest(BatchTestMixin, GraphQLTestCase):
+    """Test executing a JSON array of operations in one request."""
+    GRAPHQL_URL = '/graphql'
+
+    def setUp(self) -> None:
+        super().setUp()
+        caches['graphql'].clear()
+        tokens.clear()
+        self.product = create_product()
+
+    def test_results_are_returned_in_order(self):
+        resp = self.post_batch([
+            {'query': PRODUCTS_QUERY},
+            {'query': COUNT_QUERY, 'operationName': 'count'},
+        ])
+        content = json.loads(resp.content)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(content), 2)
+        self.assertEqual(
+            content[0]['data']['allProducts']['edges'][0]['node']['title'],
+            self.product.title)
+        self.assertEqual(content[1]['data']['allProducts']['totalCount'], 1)
+
+    def test_token_is_authenticated_once(self):
+        user = create_user()
+        headers = {'HTTP_AUTHORIZATION': f'JWT {get_token(user)}'}
+
+        with mock.patch('graphql_api.auth.get_payload',
+                        wraps=get_payload) as decode, \
+                CaptureQueriesContext(connection) as queries:
+            resp = self.post_batch(
+                [{'query': ME_QUERY}, {'query': ME_QUERY}], **headers)
+        content = json.loads(resp.content)
+
+        self.assertEqual([entry['data']['me']['username'] for entry in content],
+                         [user.username, user.username])
+        self.assertEqual(decode.call_count, 1)
+        self.assertEqual(len(queries), 1)
+
+    def test_entry_errors_do_not_fail_batch(self):
+        resp = self.post_batch([{'query': '{ missing }'},
+                                {'query': PRODUCTS_QUERY},
+                                {}])
+        content = json.loads(resp.content)
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn('errors', content[0])
+        self.assertIn('data', content[1])
+        self.assertEqual(content[2]['errors'][0]['message'],
+                         'Must provide query string.')
+
+    @override_settings(GRAPHQL_BATCH={'MAX_SIZE': 2})
+    def test_batch_size_is_limited(self):
+        resp = self.post_batch([{'query': PRODUCTS_QUERY}] * 3)
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn('limited to 2', resp.content.decode())
+
+    def test_empty_batch_is_rejected(self):
+        resp = self.post_batch([])
+
+        self.assertEqual(resp.status_code, 400)
+
+    def test_single_operation_is_not_wrapped(self):
+        resp = self.query(PRODUCTS_QUERY)
+
+        self.assertResponseNoErrors(resp)
+        self.assertIsInstance(json.loads(resp.content), dict)
+
+
+@override_settings(GRAPHQL_BATCH={'PARALLEL': True, 'WORKERS': 2})
+class ParallelBatchTest(BatchTestMixin, TransactionTestCase):
+    """Test running the queries of a batch on the batch pool."""
+
+    def setUp(self) -> None:
+        caches['graphql'].clear()
+        self.product = create_product()
+
+    def test_results_are_returned_in_order(self):
+        batch = [{'query': PRODUCTS_QUERY},
+                 {'query': COUNT_QUERY, 'operationName': 'count'}] * 3
+        with mock.patch('graphql_api.views.map_in_pool',
+                        wraps=map_in_pool) as pooled:
+            resp = self.post_batch(batch)
+        content = json.loads(resp.content)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(pooled.call_count, 1)
+        self.assertEqual(len(content), 6)
+        for index in range(0, 6, 2):
+            self.assertEqual(
+                len(content[index]['data']['allProducts']['edges']), 1)
+            self.assertEqual(
+                content[index + 1]['data']['allProducts']['totalCount'], 1)
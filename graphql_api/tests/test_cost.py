@@ -0,0 +1,125 @@
+import json
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+from graphene_django.utils.testing import GraphQLTestCase
+from graphql import parse
+from graphql_api.cost import QueryCostAnalyzer
+from graphql_api.schema import schema
+
+PAGED_PRODUCTS_QUERY = '''
+query products($first: Int) {
+    allProducts(first: $first) {
+        totalCount
+        edges { cursor node { title collection { title } } }
+    }
+}
+'''
+
+NESTED_COLLECTIONS_QUERY = '''
+{
+    collections(first: 10) {
+        edges { node { products(first: 10) {
+            edges { node { collection { products(first: 10) {
+                edges { node { title } }
+            } } } }
+        } } }
+    }
+}
+'''
+
+FRAGMENT_QUERY = '''
+query { allProducts(first: 5) { edges { node { ...reviews } } } }
+fragment reviews on ProductType { reviews(first: 4) { edges { node { text } } } }
+'''
+
+CYCLIC_FRAGMENT_QUERY = '''
+query { allProducts { edges { node { ...A } } } }
+fragment A on ProductType { collection { featuredProduct { ...A } } }
+'''
+
+
+def measure(query, variables=None):
+    return QueryCostAnalyzer(schema, parse(query), variables).measure()
+
+
+class QueryCostAnalyzerTest(SimpleTestCase):
+    """Test the static cost of operations."""
+
+    def test_page_size_multiplies_nested_objects(self):
+        query_cost = measure(PAGED_PRODUCTS_QUERY, {'first': 20})
+
+        # A product and its collection per row.
+        self.assertEqual(query_cost.cost, 20 * 2)
+        self.assertEqual(query_cost.depth, 5)
+
+    def test_connection_without_page_size_counts_max_limit(self):
+        self.assertEqual(measure(PAGED_PRODUCTS_QUERY).cost, 100 * 2)
+
+    def test_variables_are_coerced(self):
+        self.assertEqual(measure(PAGED_PRODUCTS_QUERY, {'first': '5'}).cost,
+                         5 * 2)
+
+    def test_fragments_are_expanded(self):
+        self.assertEqual(measure(FRAGMENT_QUERY).cost, 5 * (1 + 4))
+
+    def test_nested_connections_multiply(self):
+        query_cost = measure(NESTED_COLLECTIONS_QUERY)
+
+        self.assertEqual(query_cost.cost, 10 * (1 + 10 * (1 + 1 + 10)))
+        self.assertEqual(query_cost.depth, 11)
+
+    def test_fragment_cycle_is_expanded_once(self):
+        query_cost = measure(CYCLIC_FRAGMENT_QUERY)
+
+        self.assertEqual(query_cost.cost, 100 * (1 + 1 + 1))
+        self.assertEqual(query_cost.depth, 5)
+
+
+class QueryCostViewTest(GraphQLTestCase):
+    """Test the cost budget of the GraphQL endpoint."""
+    GRAPHQL_URL = '/graphql'
+
+    def setUp(self) -> None:
+        super().setUp()
+        caches['graphql'].clear()
+
+    def test_cost_is_reported_in_extensions(self):
+        resp = self.query(PAGED_PRODUCTS_QUERY, variables={'first': 20})
+        self.assertResponseNoErrors(resp)
+        content = json.loads(resp.content)
+
+        self.assertEqual(content['extensions']['cost']['cost'], 40)
+        self.assertEqual(content['extensions']['cost']['depth'], 5)
+
+    @override_settings(GRAPHQL_QUERY_COST={'MAX_COST': 100})
+    def test_over_budget_query_is_rejected(self):
+        with self.assertNumQueries(0):
+            resp = self.query(PAGED_PRODUCTS_QUERY, variables={'first': 60})
+        error = json.loads(resp.content)['errors'][0]
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(error['extensions'], {
+            'code': 'MAX_COST_EXCEEDED', 'cost': 120, 'maxCost': 100})
+
+    def test_invalid_variable_is_rejected(self):
+        with self.assertNumQueries(0):
+            resp = self.query(PAGED_PRODUCTS_QUERY,
+                              variables={'first': 'five'})
+        content = json.loads(resp.content)
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn('Invalid variable', content['errors'][0]['message'])
+
+    def test_too_deep_query_is_rejected(self):
+        resp = self.query(NESTED_COLLECTIONS_QUERY)
+        error = json.loads(resp.content)['errors'][0]
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(error['extensions']['code'], 'MAX_DEPTH_EXCEEDED')
+
+    def test_fragment_cycle_is_invalid(self):
+        resp = self.query(CYCLIC_FRAGMENT_QUERY)
+        content = json.loads(resp.content)
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn('"A"', content['errors'][0]['message'])
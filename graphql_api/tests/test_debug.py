@@ -0,0 +1,59 @@
+import json
+from django.core.cache import caches
+from graphene_django.utils.testing import GraphQLTestCase
+from graphql import parse
+from graphql_api.debug import selects_debug
+from graphql_api.utils import create_product, create_user
+
+PRODUCT_TITLES_QUERY = '{ allProducts { edges { node { title } } } }'
+
+DEBUG_QUERY = '''
+query {
+    allProducts { edges { node { title } } }
+    ...debug
+}
+fragment debug on Query { _debug { sql { rawSql } } }
+'''
+
+
+class DebugModeTest(GraphQLTestCase):
+    """Test that resolvers are only instrumented for debug requests."""
+    GRAPHQL_URL = '/graphql'
+
+    def setUp(self) -> None:
+        super().setUp()
+        caches['graphql'].clear()
+        create_product()
+
+    def test_selects_debug(self):
+        self.assertTrue(selects_debug(parse(DEBUG_QUERY)))
+        self.assertFalse(selects_debug(parse(PRODUCT_TITLES_QUERY)))
+
+    def test_plain_query_is_not_instrumented(self):
+        resp = self.query(PRODUCT_TITLES_QUERY)
+
+        self.assertResponseNoErrors(resp)
+        self.assertFalse(resp.wsgi_request.graphql_debug)
+
+    def test_debug_field_records_sql(self):
+        resp = self.query(DEBUG_QUERY)
+        self.assertResponseNoErrors(resp)
+        sql = json.loads(resp.content)['data']['_debug']['sql']
+
+        self.assertTrue(resp.wsgi_request.graphql_debug)
+        self.assertTrue(any('store_product' in row['rawSql'] for row in sql))
+
+    def test_debug_header_requires_staff(self):
+        self.client.force_login(create_user(is_staff=False))
+        resp = self.query(
+            PRODUCT_TITLES_QUERY, headers={'HTTP_X_GRAPHQL_DEBUG': '1'})
+
+        self.assertFalse(resp.wsgi_request.graphql_debug)
+
+    def test_debug_header_of_staff_member(self):
+        self.client.force_login(create_user())
+        resp = self.query(
+            PRODUCT_TITLES_QUERY, headers={'HTTP_X_GRAPHQL_DEBUG': '1'})
+
+        self.assertResponseNoErrors(resp)
+        self.assertTrue(resp.wsgi_request.graphql_debug)
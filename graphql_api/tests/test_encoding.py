@@ -0,0 +1,113 @@
+import gzip
+import json
+import unittest
+from collections import OrderedDict
+from decimal import Decimal
+from unittest import mock
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+from graphene_django.utils.testing import GraphQLTestCase
+from graphql_api import encoding
+from graphql_api.utils import create_product
+
+PRODUCTS_QUERY = '{ allProducts { edges { node { title unitPrice } } } }'
+RESULT = OrderedDict([
+    ('data', {'product': {'title': 'Café', 'unitPrice': Decimal('10.50')}}),
+])
+
+
+class EncodeTest(SimpleTestCase):
+    """Test the JSON encoders of GraphQL results."""
+
+    def test_encoders_agree(self):
+        encoded = encoding.encode_json(RESULT)
+
+        self.assertEqual(json.loads(encoding.encode(RESULT)),
+                         json.loads(encoded))
+        self.assertEqual(json.loads(encoded)['data']['product']['unitPrice'],
+                         '10.50')
+
+    def test_pretty_output_is_sorted_and_indented(self):
+        data = {'b': 1, 'a': [2]}
+
+        self.assertEqual(encoding.encode_json(data, pretty=True),
+                         '{\n  "a": [\n    2\n  ],\n  "b": 1\n}')
+        self.assertEqual(encoding.encode(data, pretty=True),
+                         encoding.encode_json(data, pretty=True))
+
+    def test_falls_back_to_json(self):
+        with mock.patch('graphql_api.encoding.orjson', None):
+            self.assertEqual(encoding.encode(RESULT),
+                             encoding.encode_json(RESULT))
+
+    def test_unknown_types_are_rejected(self):
+        with self.assertRaises(TypeError):
+            encoding.encode({'value': object()})
+
+    def test_accepted_codings(self):
+        request = mock.Mock(META={
+            'HTTP_ACCEPT_ENCODING': 'gzip;q=0.5, BR, identity;q=0'})
+
+        self.assertEqual(encoding.accepted_codings(request), {'gzip', 'br'})
+
+
+@override_settings(GRAPHQL_ENCODING={'COMPRESS_MIN_LENGTH': 200})
+class CompressionTest(GraphQLTestCase):
+    """Test the compression of GraphQL responses."""
+    GRAPHQL_URL = '/graphql'
+
+    def setUp(self) -> None:
+        super().setUp()
+        caches['graphql'].clear()
+        for _ in range(5):
+            create_product()
+
+    def get(self, query=PRODUCTS_QUERY, **headers):
+        return self.client.get(self.GRAPHQL_URL, {'query': query}, **headers)
+
+    def test_gzip(self):
+        resp = self.get(HTTP_ACCEPT_ENCODING='gzip')
+        content = json.loads(gzip.decompress(resp.content))
+
+        self.assertEqual(resp['Content-Encoding'], 'gzip')
+        self.assertEqual(resp['Content-Length'], str(len(resp.content)))
+        self.assertEqual(len(content['data']['allProducts']['edges']), 5)
+
+    @unittest.skipIf(encoding.brotli is None, 'brotli is not installed')
+    def test_brotli_is_preferred(self):
+        resp = self.get(HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        content = json.loads(encoding.brotli.decompress(resp.content))
+
+        self.assertEqual(resp['Content-Encoding'], 'br')
+        self.assertEqual(len(content['data']['allProducts']['edges']), 5)
+
+    def test_uncompressed_without_accepted_coding(self):
+        resp = self.get(HTTP_ACCEPT_ENCODING='deflate')
+
+        self.assertFalse(resp.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', resp['Vary'])
+        json.loads(resp.content)
+
+    def test_small_responses_are_not_compressed(self):
+        resp = self.get('{ allProducts { totalCount } }',
+                        HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertFalse(resp.has_header('Content-Encoding'))
+
+    def test_compressed_response_has_weak_etag(self):
+        etag = self.get(HTTP_ACCEPT_ENCODING='gzip')['ETag']
+
+        resp = self.get(HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertEqual(resp.status_code, 304)
+
+    @override_settings(GRAPHQL_ENCODING={
+        'ENCODER': 'graphql_api.encoding.encode_json'})
+    def test_encoder_setting(self):
+        with mock.patch('graphql_api.encoding.encode_json',
+                        wraps=encoding.encode_json) as encode:
+            resp = self.get()
+
+        self.assertEqual(resp.status_code, 200)
+        encode.assert_called_once()
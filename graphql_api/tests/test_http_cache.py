@@ -0,0 +1,117 @@
+import json
+from unittest import mock
+from django.core.cache import caches
+from graphene_django.utils.testing import GraphQLTestCase
+from store.models import Review
+from graphql_api.utils import create_product, create_user
+
+PRODUCTS_QUERY = '{ allProducts { edges { node { title } } } }'
+COLLECTIONS_QUERY = '{ collections { edges { node { title } } } }'
+REVIEWS_QUERY = \
+'''
+{
+    allProducts {
+        edges { node { title reviews { edges { node { description } } } } }
+    }
+}
+'''
+CREATE_COLLECTION_MUTATION = \
+'mutation { createCollection(title: "Fresh") { collection { title } } }'
+
+
+class HTTPCacheTest(GraphQLTestCase):
+    """Test the ETag and Cache-Control headers of cached responses."""
+    GRAPHQL_URL = '/graphql'
+
+    def setUp(self) -> None:
+        super().setUp()
+        caches['graphql'].clear()
+        self.product = create_product()
+
+    def get(self, query, **headers):
+        return self.client.get(self.GRAPHQL_URL, {'query': query}, **headers)
+
+    def test_get_query_has_validators(self):
+        resp = self.get(PRODUCTS_QUERY)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp['ETag'].startswith('"'))
+        self.assertIn('public', resp['Cache-Control'])
+        self.assertIn('Authorization', resp['Vary'])
+
+    def test_cached_response_keeps_etag(self):
+        etag = self.get(PRODUCTS_QUERY)['ETag']
+
+        with self.assertNumQueries(0):
+            resp = self.get(PRODUCTS_QUERY)
+
+        self.assertEqual(resp['ETag'], etag)
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.get(PRODUCTS_QUERY)['ETag']
+
+        with self.assertNumQueries(0):
+            resp = self.get(PRODUCTS_QUERY, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.content, b'')
+        self.assertEqual(resp['ETag'], etag)
+
+    def test_changed_row_changes_etag(self):
+        etag = self.get(PRODUCTS_QUERY)['ETag']
+        self.product.title = 'Renamed product'
+        self.product.save()
+
+        resp = self.get(PRODUCTS_QUERY, HTTP_IF_NONE_MATCH=etag)
+        content = json.loads(resp.content)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp['ETag'], etag)
+        self.assertEqual(
+            content['data']['allProducts']['edges'][0]['node']['title'],
+            'Renamed product')
+
+    def test_post_is_never_not_modified(self):
+        etag = self.get(PRODUCTS_QUERY)['ETag']
+
+        resp = self.client.post(
+            self.GRAPHQL_URL, json.dumps({'query': PRODUCTS_QUERY}),
+            content_type='application/json', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['ETag'], etag)
+
+    def test_max_age_is_smallest_of_resolved_types(self):
+        Review.objects.create(
+            product=self.product, name='Reviewer', description='Fresh')
+        products = self.get(PRODUCTS_QUERY)
+        collections = self.get(COLLECTIONS_QUERY)
+        reviews = self.get(REVIEWS_QUERY)
+
+        self.assertIn('max-age=60', products['Cache-Control'])
+        self.assertIn('max-age=300', collections['Cache-Control'])
+        self.assertIn('max-age=0', reviews['Cache-Control'])
+
+    def test_authenticated_responses_have_no_validators(self):
+        self.client.force_login(create_user())
+
+        resp = self.get(PRODUCTS_QUERY)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(resp.has_header('ETag'))
+        self.assertFalse(resp.has_header('Cache-Control'))
+
+    def test_mutation_over_get_is_rejected(self):
+        resp = self.get(CREATE_COLLECTION_MUTATION)
+
+        self.assertEqual(resp.status_code, 405)
+        self.assertFalse(resp.has_header('ETag'))
+
+    def test_expired_entry_keeps_etag(self):
+        etag = self.get(PRODUCTS_QUERY)['ETag']
+
+        with mock.patch('graphql_api.cache.get_response', return_value=None):
+            resp = self.get(PRODUCTS_QUERY, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp['ETag'], etag)
@@ -0,0 +1,138 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from django.core.cache import caches
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.urls import path
+from django.views.decorators.csrf import csrf_exempt
+from graphql import parse
+from graphql.language.printer import print_ast
+from graphql_api import parallel
+from graphql_api.parallel import map_in_pool, split_root_fields
+from graphql_api.utils import create_product
+from graphql_api.views import AsyncStorefrontGraphQLView
+from store.models import Product
+
+urlpatterns = [
+    path('graphql', csrf_exempt(AsyncStorefrontGraphQLView.as_view())),
+]
+
+ROOT_FIELDS_QUERY = '''
+query storefront {
+    collections { edges { node { title } } }
+    allProducts { edges { node { ...title } } }
+    products: allProducts { totalCount }
+}
+fragment title on ProductType { title }
+'''
+
+
+class SplitRootFieldsTest(TransactionTestCase):
+    """Test splitting query operations by root field."""
+
+    def split(self, query, operation_name=None):
+        documents = split_root_fields(parse(query), operation_name)
+        return documents and [print_ast(document) for document in documents]
+
+    def test_one_document_per_response_key(self):
+        documents = self.split(ROOT_FIELDS_QUERY)
+
+        self.assertEqual(len(documents), 3)
+        self.assertIn('collections', documents[0])
+        self.assertNotIn('allProducts', documents[0])
+        self.assertIn('fragment title', documents[1])
+        self.assertIn('products: allProducts', documents[2])
+
+    def test_same_response_key_stays_together(self):
+        documents = self.split(
+            '{ me { username } me { email } allProducts { totalCount } }')
+
+        self.assertEqual(len(documents), 2)
+        self.assertIn('email', documents[0])
+
+    def test_nothing_to_split(self):
+        self.assertIsNone(self.split('{ allProducts { totalCount } }'))
+        self.assertIsNone(self.split(
+            'mutation { a: deleteUser(username: "a") { ok } '
+            'b: deleteUser(username: "b") { ok } }'))
+        self.assertIsNone(self.split(
+            '{ ...root } fragment root on Query { me { username } }'))
+
+    def test_operation_name_selects_operation(self):
+        query = 'query a { me { username } } query b { x: me { id } y: me { id } }'
+
+        self.assertIsNone(self.split(query, 'a'))
+        self.assertEqual(len(self.split(query, 'b')), 2)
+
+
+class ConnectionReuseTest(TransactionTestCase):
+    """Test the database connections of the pool threads."""
+
+    def count_closes(self, jobs):
+        pool = ThreadPoolExecutor(max_workers=1)
+        try:
+            with mock.patch.object(type(connections['default']), 'close',
+                                   autospec=True) as close:
+                for _ in range(jobs):
+                    map_in_pool(pool, lambda _: Product.objects.count(), [None])
+            return close.call_count
+        finally:
+            pool.submit(connections.close_all).result()
+            pool.shutdown()
+
+    def test_jobs_reuse_connection(self):
+        self.assertEqual(self.count_closes(3), 0)
+
+    @override_settings(GRAPHQL_ASYNC={'CONN_MAX_AGE': 0})
+    def test_expired_connection_is_closed(self):
+        self.assertGreater(self.count_closes(3), 0)
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncGraphQLViewTest(TransactionTestCase):
+    """Test the ASGI GraphQL view."""
+
+    def setUp(self) -> None:
+        caches['graphql'].clear()
+        self.product = create_product()
+
+    async def query(self, query):
+        response = await self.async_client.post(
+            '/graphql', {'query': query}, content_type='application/json')
+        return response, json.loads(response.content)
+
+    async def test_root_fields_run_on_field_pool(self):
+        with mock.patch.object(parallel, 'execute',
+                               wraps=parallel.execute) as execute:
+            response, content = await self.query(ROOT_FIELDS_QUERY)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('errors', content)
+        self.assertEqual(execute.call_count, 3)
+        data = content['data']
+        self.assertEqual(list(data), ['collections', 'allProducts', 'products'])
+        self.assertEqual(data['allProducts']['edges'][0]['node']['title'],
+                         self.product.title)
+        self.assertEqual(data['products']['totalCount'], 1)
+
+    async def test_root_field_errors_keep_other_fields(self):
+        response, content = await self.query(
+            '{ me { username } allProducts { totalCount } }')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(content['errors'][0]['path'], ['me'])
+        self.assertIsNone(content['data']['me'])
+        self.assertEqual(content['data']['allProducts']['totalCount'], 1)
+
+    async def test_single_root_field(self):
+        response, content = await self.query('{ allProducts { totalCount } }')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(content['data']['allProducts']['totalCount'], 1)
+
+    async def test_invalid_query(self):
+        response, content = await self.query('{ missing }')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('errors', content)
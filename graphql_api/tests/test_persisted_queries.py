@@ -0,0 +1,90 @@
+import json
+import os
+import tempfile
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from graphql_api.persisted_queries import load_allowlist, query_hash
+from graphql_api.utils import create_product
+
+PRODUCT_TITLES_QUERY = '{ allProducts { edges { node { title } } } }'
+
+
+def persisted(query):
+    return {'persistedQuery': {'version': 1, 'sha256Hash': query_hash(query)}}
+
+
+class PersistedQueriesTest(TestCase):
+    """Test automatic persisted queries on the GraphQL endpoint."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        caches['graphql'].clear()
+        caches['persisted_queries'].clear()
+        load_allowlist.cache_clear()
+        self.product = create_product()
+
+    def post(self, body):
+        resp = self.client.post(
+            '/graphql', json.dumps(body), content_type='application/json')
+        return resp, json.loads(resp.content)
+
+    def error_code(self, content):
+        return content['errors'][0]['extensions']['code']
+
+    def test_unknown_hash_asks_for_registration(self):
+        resp, content = self.post({'extensions': persisted(PRODUCT_TITLES_QUERY)})
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(content['errors'][0]['message'], 'PersistedQueryNotFound')
+        self.assertEqual(self.error_code(content), 'PERSISTED_QUERY_NOT_FOUND')
+
+    def test_registered_hash_runs_query(self):
+        extensions = persisted(PRODUCT_TITLES_QUERY)
+        self.post({'query': PRODUCT_TITLES_QUERY, 'extensions': extensions})
+
+        resp, content = self.post({'extensions': extensions})
+
+        self.assertEqual(resp.status_code, 200)
+        edges = content['data']['allProducts']['edges']
+        self.assertEqual(edges[0]['node']['title'], self.product.title)
+
+    def test_hash_mismatch_is_rejected(self):
+        extensions = persisted('{ allCollections { edges { cursor } } }')
+        resp, content = self.post(
+            {'query': PRODUCT_TITLES_QUERY, 'extensions': extensions})
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(self.error_code(content), 'PERSISTED_QUERY_HASH_MISMATCH')
+
+    def test_get_request_with_hash(self):
+        extensions = json.dumps(persisted(PRODUCT_TITLES_QUERY))
+        self.post({'query': PRODUCT_TITLES_QUERY,
+                   'extensions': persisted(PRODUCT_TITLES_QUERY)})
+
+        resp = self.client.get(
+            '/graphql', {'extensions': extensions},
+            HTTP_ACCEPT='application/json')
+        content = json.loads(resp.content)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn('allProducts', content['data'])
+
+    def test_allowlist_only_mode(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as manifest:
+            json.dump({query_hash(PRODUCT_TITLES_QUERY): PRODUCT_TITLES_QUERY},
+                      manifest)
+        self.addCleanup(os.remove, manifest.name)
+        other_query = '{ allCollections { edges { cursor } } }'
+
+        with override_settings(GRAPHQL_PERSISTED_QUERIES={
+                'CACHE': 'persisted_queries',
+                'ALLOWLIST': manifest.name,
+                'ALLOWLIST_ONLY': True}):
+            _, allowed = self.post({'extensions': persisted(PRODUCT_TITLES_QUERY)})
+            _, by_hash = self.post({'query': other_query,
+                                    'extensions': persisted(other_query)})
+            _, by_text = self.post({'query': other_query})
+
+        self.assertIn('allProducts', allowed['data'])
+        self.assertEqual(self.error_code(by_hash), 'PERSISTED_QUERY_NOT_ALLOWED')
+        self.assertEqual(self.error_code(by_text), 'PERSISTED_QUERY_NOT_ALLOWED')
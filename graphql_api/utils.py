@@ -1,6 +1,6 @@
 from decimal import Decimal
 from django.contrib.auth import get_user_model
-from store.models import Collection, Product, Promotion
+from store.models import Cart, CartItem, Collection, Product, Promotion
 
 
 def create_user(username='test_user', password='test_user1234', is_staff=True):
@@ -43,3 +43,14 @@ def create_promotion(description='Noruz', discount=20):
     return Promotion.objects.create(
         description=description, discount=discount
     )
+
+
+def create_cart(*items):
+    """Create a cart holding `(product, quantity)` items."""
+    cart = Cart.objects.create()
+    CartItem.objects.bulk_create(
+        CartItem(cart=cart, product=product, quantity=quantity)
+        for product, quantity in items
+    )
+
+    return cart
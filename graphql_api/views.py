@@ -0,0 +1,377 @@
+import copy
+import json
+from django.conf import settings
+from django.http import HttpResponseBadRequest
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.debug import DjangoDebugMiddleware
+from graphene_django.utils.utils import set_rollback
+from graphene_django.views import GraphQLView, HttpError
+from graphql.error import GraphQLError
+from graphql.execution import ExecutionResult
+from graphql.language import ast
+from graphql_jwt.settings import jwt_settings
+from . import cache, encoding
+from .backend import CachedDocumentBackend
+from .batch import check_batch, get_setting as get_batch_setting
+from .cost import check_query_cost, get_setting as get_cost_setting
+from .debug import DEBUG_HEADER, get_user, has_debug_header, selects_debug
+from .parallel import (
+    execute_root_fields, get_operation, get_pool, in_request_pool,
+    map_in_pool, split_root_fields)
+from .persisted_queries import PersistedQueryError, resolve_query
+
+document_backend = CachedDocumentBackend(
+    max_size=getattr(settings, 'GRAPHQL_DOCUMENT_CACHE_SIZE', 500))
+
+
+def root_field_names(document_ast, operation_name=None):
+    """The root fields an operation selects, None if fragments hide them."""
+    operation = get_operation(document_ast, operation_name)
+    if operation is None:
+        return None
+    selections = operation.selection_set.selections
+    if not all(isinstance(selection, ast.Field) for selection in selections):
+        return None
+    return {selection.name.value for selection in selections}
+
+
+class StorefrontGraphQLView(GraphQLView):
+    """GraphQL endpoint of the storefront.
+
+    Supports automatic persisted queries and batches of operations sent
+    as a JSON array, reuses parsed and validated documents across
+    requests, rejects operations over the cost or depth budget and serves
+    responses to anonymous queries, and to queries of a user selecting only
+    `user_cached_fields`, from the response cache until one of the rows
+    they were built from changes. Cached responses carry an ETag
+    and a `Cache-Control` max-age, and conditional GETs of unchanged ones
+    are answered with 304 Not Modified. Results are encoded and compressed
+    as set up in `GRAPHQL_ENCODING`. Resolvers are only instrumented by
+    `DjangoDebugMiddleware` for debug requests.
+    """
+    # Root fields whose responses are cached per user when authenticated.
+    user_cached_fields = frozenset({'cart'})
+
+    def get_backend(self, request):
+        return document_backend
+
+    def dispatch(self, request, *args, **kwargs):
+        request.cache_entry = None
+        request.cache_private = False
+        response = super().dispatch(request, *args, **kwargs)
+        # Responses are cached for anonymous users or per user.
+        patch_vary_headers(response, ('Authorization', 'Cookie'))
+        entry = request.cache_entry
+        if entry is not None:
+            response['ETag'] = entry['etag']
+            visibility = 'private' if request.cache_private else 'public'
+            patch_cache_control(response, max_age=entry['max_age'],
+                                **{visibility: True})
+        return encoding.compress_response(request, response)
+
+    def json_encode(self, request, d, pretty=False):
+        pretty = bool(self.pretty or pretty or request.GET.get('pretty'))
+        return encoding.get_encoder()(d, pretty)
+
+    def parse_body(self, request):
+        """Parse a JSON array of operations as a batch, see `get_response`."""
+        if self.get_content_type(request) != 'application/json':
+            return super().parse_body(request)
+        try:
+            data = json.loads(request.body.decode('utf-8'))
+        except (UnicodeDecodeError, TypeError, ValueError):
+            raise HttpError(
+                HttpResponseBadRequest('POST body sent invalid JSON.'))
+        if isinstance(data, list):
+            check_batch(data)
+        elif not isinstance(data, dict):
+            raise HttpError(HttpResponseBadRequest(
+                'The received data is not a valid JSON query.'))
+        return data
+
+    def get_response(self, request, data, show_graphiql=False):
+        if isinstance(data, list):
+            return self.get_batch_response(request, data)
+        try:
+            data = self.resolve_persisted_query(request, data)
+        except PersistedQueryError as error:
+            result = self.json_encode(request, {'errors': [error.as_dict()]})
+            return result, error.status
+
+        cache_key = None
+        if not show_graphiql:
+            cache_key = self.get_cache_key(request, data)
+
+        if cache_key is not None:
+            entry = cache.get_response(cache_key)
+            if entry is not None:
+                return self.cached_response(request, entry)
+            request.cache_tags = set()
+
+        result, status_code = self.execute_response(request, data, show_graphiql)
+
+        tags = getattr(request, 'cache_tags', None)
+        request.cache_tags = None
+        if cache_key is not None and tags and status_code == 200:
+            entry = cache.set_response(cache_key, result, tags)
+            if entry is not None:
+                # An expired entry rendered again keeps its ETag.
+                return self.cached_response(request, entry)
+
+        return result, status_code
+
+    def cached_response(self, request, entry):
+        """Respond with a cache entry, or 304 if the client has it already."""
+        request.cache_entry = entry
+        # If-None-Match compares weakly, compressed responses have weak ETags.
+        etags = {
+            etag[2:] if etag.startswith('W/') else etag
+            for etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        }
+        if request.method in ('GET', 'HEAD') and (
+                entry['etag'] in etags or '*' in etags):
+            return '', 304
+        return entry['body'], 200
+
+    def get_batch_response(self, request, batch):
+        """Execute the operations of a batch, responding with an array.
+
+        Entries share the request, so a token is authenticated once and
+        data loaders are reused until a mutation runs. The status is the
+        highest status of the entries.
+        """
+        if not request.user.is_authenticated \
+                and 'HTTP_AUTHORIZATION' in request.META:
+            request.user = get_user(request) or request.user
+
+        operations = [self.get_operation_type(request, entry)
+                      for entry in batch]
+        if get_batch_setting('PARALLEL') and set(operations) == {'query'}:
+            def respond(entry):
+                entry_request = copy.copy(request)
+                entry_request.__dict__.pop('loaders', None)
+                return self.get_batch_entry_response(entry_request, entry)
+
+            pool = get_pool('BATCH_WORKERS', get_batch_setting('WORKERS'))
+            responses = map_in_pool(pool, respond, batch)
+        else:
+            responses = []
+            for entry, operation in zip(batch, operations):
+                responses.append(self.get_batch_entry_response(request, entry))
+                if operation != 'query':
+                    # Loaded rows may be stale once a mutation ran.
+                    request.__dict__.pop('loaders', None)
+
+        # Validators of single responses do not apply to the batch.
+        request.cache_entry = None
+        result = '[{}]'.format(','.join(result for result, _ in responses))
+        return result, max(status for _, status in responses)
+
+    def get_batch_entry_response(self, request, entry):
+        try:
+            return self.get_response(request, entry)
+        except HttpError as error:
+            response = error.response
+            return self.json_encode(
+                request, {'errors': [self.format_error(error)]}
+            ), response.status_code
+
+    def get_operation_type(self, request, data):
+        """The type of the operation of `data`, None if it has none."""
+        try:
+            query, _, operation_name, _ = \
+                self.get_graphql_params(request, data)
+        except HttpError:
+            return None
+        document = self.get_document(request, query)
+        if document is None or document.errors:
+            return None
+        return document.get_operation_type(operation_name)
+
+    def execute_response(self, request, data, show_graphiql=False):
+        """Execute a request like `GraphQLView.get_response`.
+
+        The extensions of the execution result, such as the query cost, are
+        included in the response.
+        """
+        query, variables, operation_name, id = \
+            self.get_graphql_params(request, data)
+        execution_result = self.execute_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql)
+
+        if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+            set_rollback()
+
+        if not execution_result:
+            return None, 200
+
+        status_code = 200
+        response = {}
+        if execution_result.errors:
+            set_rollback()
+            response['errors'] = [
+                self.format_error(e) for e in execution_result.errors
+            ]
+        if execution_result.invalid:
+            status_code = 400
+        else:
+            response['data'] = execution_result.data
+        if execution_result.extensions:
+            response['extensions'] = execution_result.extensions
+
+        if self.batch:
+            response['id'] = id
+            response['status'] = status_code
+
+        result = self.json_encode(request, response, pretty=show_graphiql)
+        return result, status_code
+
+    def execute_graphql_request(self, request, data, query, variables,
+                                operation_name, show_graphiql=False):
+        query_cost = None
+        request.graphql_debug = False
+        document = self.get_document(request, query)
+        # Invalid documents are rejected by the execution below, before
+        # they could be measured.
+        if document is not None and not document.errors:
+            try:
+                query_cost = check_query_cost(
+                    self.schema, document.document_ast, variables,
+                    operation_name)
+            except GraphQLError as error:
+                request.cache_tags = None
+                return ExecutionResult(errors=[error], invalid=True)
+            request.graphql_debug = has_debug_header(request) or \
+                selects_debug(document.document_ast, operation_name)
+
+        result = self.execute_operation(
+            request, data, query, variables, operation_name, show_graphiql)
+        if result is None or result.errors:
+            request.cache_tags = None
+        if result is not None and query_cost is not None:
+            result.extensions['cost'] = {
+                'cost': query_cost.cost,
+                'maxCost': get_cost_setting('MAX_COST'),
+                'depth': query_cost.depth,
+                'maxDepth': get_cost_setting('MAX_DEPTH'),
+            }
+        return result
+
+    def execute_operation(self, request, data, query, variables,
+                          operation_name, show_graphiql=False):
+        """Execute the operation once its cost has been checked."""
+        return super().execute_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql)
+
+    def get_document(self, request, query):
+        """Return the cached document of `query`, None if unparsable.
+
+        Parse errors are reported by `execute_graphql_request` itself.
+        """
+        if not query:
+            return None
+        try:
+            return self.get_backend(request).document_from_string(
+                self.schema, query)
+        except Exception:
+            return None
+
+    def get_middleware(self, request):
+        middleware = super().get_middleware(request)
+        if getattr(request, 'graphql_debug', False):
+            return [DjangoDebugMiddleware(), *middleware]
+        return middleware
+
+    def resolve_persisted_query(self, request, data):
+        """Return `data` with the query text of a persisted query filled in."""
+        extensions = request.GET.get('extensions') or data.get('extensions')
+        if isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                raise HttpError(
+                    HttpResponseBadRequest('Extensions are invalid JSON.'))
+
+        query = request.GET.get('query') or data.get('query')
+        resolved = resolve_query(query, extensions)
+        if resolved == query:
+            return data
+
+        data = dict(data.items())
+        data['query'] = resolved
+        return data
+
+    def get_cache_key(self, request, data):
+        """Return the response cache key of a request, None if uncacheable.
+
+        Anonymous query operations are cached for every anonymous user.
+        Those of an authenticated user are only cached, in a scope of their
+        own, when they select nothing but `user_cached_fields`. The key is
+        built from the normalized document so formatting differences share
+        entries.
+        """
+        if request.GET.get('pretty') or DEBUG_HEADER in request.META:
+            return None
+
+        user = None
+        if request.user.is_authenticated \
+                or 'HTTP_AUTHORIZATION' in request.META \
+                or jwt_settings.JWT_COOKIE_NAME in request.COOKIES:
+            user = get_user(request)
+            if user is None:
+                return None
+
+        query, variables, operation_name, _ = \
+            self.get_graphql_params(request, data)
+        if not query:
+            return None
+        document = self.get_document(request, query)
+        if document is None \
+                or document.get_operation_type(operation_name) != 'query' \
+                or selects_debug(document.document_ast, operation_name):
+            return None
+
+        scope = 'anonymous'
+        if user is not None:
+            fields = root_field_names(document.document_ast, operation_name)
+            if not fields or not fields <= self.user_cached_fields:
+                return None
+            scope = f'user:{user.pk}'
+            request.cache_private = True
+
+        return cache.make_key(
+            document.normalized_string, variables, operation_name, scope)
+
+
+class AsyncStorefrontGraphQLView(StorefrontGraphQLView):
+    """`StorefrontGraphQLView` for ASGI servers.
+
+    Requests run on the bounded request pool instead of the single thread
+    Django gives synchronous views under ASGI, and the root fields of query
+    operations are executed concurrently, see `graphql_api.parallel`.
+    """
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        return await in_request_pool(super().dispatch)(request, *args, **kwargs)
+
+    def execute_operation(self, request, data, query, variables,
+                          operation_name, show_graphiql=False):
+        document = self.get_document(request, query)
+        documents = None
+        if document is not None and not document.errors \
+                and not request.graphql_debug:
+            documents = split_root_fields(document.document_ast, operation_name)
+        if not documents:
+            return super().execute_operation(
+                request, data, query, variables, operation_name, show_graphiql)
+
+        return execute_root_fields(
+            self.schema, documents, request,
+            root_value=self.get_root_value(request),
+            variable_values=variables,
+            operation_name=operation_name,
+            middleware=self.get_middleware(request),
+        )
@@ -1,9 +1,9 @@
 from django.contrib import admin, messages
-from django.db.models.aggregates import Count
 from django.db.models.query import QuerySet
 from django.utils.html import format_html, urlencode
 from django.urls import reverse
 from . import models
+from .services import bulk_update_products
 
 admin.site.register(models.Review)
 admin.site.register(models.Cart)
@@ -31,7 +31,7 @@ class ProductAdmin(admin.ModelAdmin):
         'slug': ['title']
     }
     actions = ['clear_inventory']
-    list_display = ['title', 'unit_price',
+    list_display = ['title', 'unit_price', 'effective_price', 'review_count',
                     'inventory_status', 'collection_title']
     list_editable = ['unit_price']
     list_filter = ['collection', 'last_update', InventoryFilter]
@@ -50,7 +50,7 @@ class ProductAdmin(admin.ModelAdmin):
 
     @admin.action(description='Clear inventory')
     def clear_inventory(self, request, queryset):
-        updated_count = queryset.update(inventory=0)
+        updated_count = bulk_update_products(queryset, inventory=0)
         self.message_user(
             request,
             f'{updated_count} products were successfully updated.',
@@ -61,11 +61,11 @@ class ProductAdmin(admin.ModelAdmin):
 @admin.register(models.Collection)
 class CollectionAdmin(admin.ModelAdmin):
     autocomplete_fields = ['featured_product']
-    list_display = ['title', 'products_count']
+    list_display = ['title', 'products']
     search_fields = ['title']
 
-    @admin.display(ordering='products_count')
-    def products_count(self, collection):
+    @admin.display(ordering='products_count', description='products count')
+    def products(self, collection):
         url = (
             reverse('admin:store_product_changelist')
             + '?'
@@ -74,11 +74,6 @@ class CollectionAdmin(admin.ModelAdmin):
             }))
         return format_html('<a href="{}">{} Products</a>', url, collection.products_count)
 
-    def get_queryset(self, request):
-        return super().get_queryset(request).annotate(
-            products_count=Count('products')
-        )
-
 
 class OrderItemInline(admin.TabularInline):
     autocomplete_fields = ['product']
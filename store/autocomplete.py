@@ -0,0 +1,205 @@
+"""Memory-resident prefix index over product and collection titles.
+
+Titles are split into normalized tokens kept in a sorted list; a prefix
+is looked up with `bisect` and each token maps to a compact array of the
+ids whose title contains it. The normalized titles are kept sorted too, so
+the titles starting with the typed text, which rank first, are found
+without scanning the other matches. The index is built once per process and then
+kept current by the signals of the store app, so it only sees the writes
+made by its own process until it is rebuilt.
+"""
+import re
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+from collections import namedtuple
+from django.db import DatabaseError
+from .models import Collection, Product
+
+KINDS = ('product', 'collection')
+MODELS = {'product': Product, 'collection': Collection}
+BUILD_CHUNK_SIZE = 5000
+
+Suggestion = namedtuple('Suggestion', ['kind', 'id', 'title'])
+
+
+def normalize(text):
+    """Casefold `text` and strip its accents."""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(
+        char for char in decomposed if not unicodedata.combining(char)
+    ).casefold()
+
+
+def tokenize(text):
+    return re.findall(r'\w+', normalize(text))
+
+
+def encode(kind, pk):
+    """Pack a kind and primary key into one integer of a postings array."""
+    return pk << 1 | KINDS.index(kind)
+
+
+def decode(key):
+    return KINDS[key & 1], key >> 1
+
+
+class PrefixIndex:
+    """Sorted tokens of titles mapped to the ids holding them."""
+
+    def __init__(self):
+        self.tokens = []
+        self.postings = {}
+        self.titles = {}
+        # `(normalized title, key)` pairs.
+        self.sorted_titles = []
+        self.built = False
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.titles)
+
+    def build(self):
+        """(Re)load every product and collection title."""
+        self.load(
+            (kind, pk, title)
+            for kind, model in MODELS.items()
+            for pk, title in model.objects.order_by()
+            .values_list('pk', 'title').iterator(chunk_size=BUILD_CHUNK_SIZE)
+        )
+
+    def load(self, rows):
+        """Replace the index with `(kind, pk, title)` rows."""
+        postings, titles = {}, {}
+        for kind, pk, title in rows:
+            key = encode(kind, pk)
+            titles[key] = title
+            for token in set(tokenize(title)):
+                postings.setdefault(token, array('q')).append(key)
+        sorted_titles = sorted(
+            (normalize(title), key) for key, title in titles.items())
+        with self.lock:
+            self.tokens = sorted(postings)
+            self.postings = postings
+            self.titles = titles
+            self.sorted_titles = sorted_titles
+            self.built = True
+
+    def ensure_built(self):
+        if not self.built:
+            with self.lock:
+                if not self.built:
+                    self.build()
+
+    def refresh(self, kind, pks):
+        """Reload the titles of `pks`, dropping the deleted objects."""
+        titles = dict(MODELS[kind].objects.filter(pk__in=pks)
+                      .values_list('pk', 'title'))
+        with self.lock:
+            for pk in pks:
+                if pk in titles:
+                    self.add(kind, pk, titles[pk])
+                else:
+                    self.remove(kind, pk)
+
+    def add(self, kind, pk, title):
+        """Index the title of an object, replacing its previous one."""
+        with self.lock:
+            self.remove(kind, pk)
+            key = encode(kind, pk)
+            self.titles[key] = title
+            insort(self.sorted_titles, (normalize(title), key))
+            for token in set(tokenize(title)):
+                keys = self.postings.get(token)
+                if keys is None:
+                    keys = self.postings[token] = array('q')
+                    insort(self.tokens, token)
+                keys.append(key)
+
+    def remove(self, kind, pk):
+        with self.lock:
+            key = encode(kind, pk)
+            title = self.titles.pop(key, None)
+            if title is None:
+                return
+            entry = (normalize(title), key)
+            del self.sorted_titles[bisect_left(self.sorted_titles, entry)]
+            for token in set(tokenize(title)):
+                keys = self.postings[token]
+                keys.remove(key)
+                if not keys:
+                    del self.postings[token]
+                    del self.tokens[bisect_left(self.tokens, token)]
+
+    def iter_matches(self, prefix):
+        """Yield the keys of the tokens starting with `prefix`.
+
+        Tokens sort before their extensions, whole-word matches come first.
+        """
+        index = bisect_left(self.tokens, prefix)
+        while index < len(self.tokens) \
+                and self.tokens[index].startswith(prefix):
+            yield from self.postings[self.tokens[index]]
+            index += 1
+
+    def iter_leading(self, typed):
+        """Yield the keys of the titles starting with `typed`."""
+        index = bisect_left(self.sorted_titles, (typed,))
+        while index < len(self.sorted_titles) \
+                and self.sorted_titles[index][0].startswith(typed):
+            yield self.sorted_titles[index][1]
+            index += 1
+
+    def search(self, prefix, limit=10, kinds=KINDS):
+        """Return up to `limit` `Suggestion`s matching `prefix`.
+
+        Every word of `prefix` must start a token of the title. Titles
+        starting with the typed text come first, then the other matches,
+        each group alphabetically.
+        """
+        words = tokenize(prefix)
+        if not words or limit <= 0:
+            return []
+        typed = normalize(prefix).strip()
+        # Other candidates come from the most specific word, the others
+        # are checked against the tokens of the candidate's title.
+        words.sort(key=len, reverse=True)
+        kind_bits = {KINDS.index(kind) for kind in kinds}
+        found, seen = [], set()
+        with self.lock:
+            for keys in (self.iter_leading(typed),
+                         self.iter_matches(words[0])):
+                for key in keys:
+                    if len(found) == limit:
+                        break
+                    if key in seen or key & 1 not in kind_bits:
+                        continue
+                    seen.add(key)
+                    title = self.titles[key]
+                    tokens = tokenize(title)
+                    if all(any(token.startswith(word) for token in tokens)
+                           for word in words):
+                        found.append(Suggestion(*decode(key), title))
+        found.sort(key=lambda suggestion: (
+            not normalize(suggestion.title).startswith(typed),
+            suggestion.title))
+        return found
+
+index = PrefixIndex()
+
+
+def autocomplete(prefix, limit=10, kinds=KINDS):
+    index.ensure_built()
+    return index.search(prefix, limit, kinds)
+
+
+def warm():
+    """Build the index at worker startup.
+
+    If the database is not ready yet it is built on first use instead.
+    """
+    try:
+        index.ensure_built()
+    except DatabaseError:
+        pass
@@ -0,0 +1,78 @@
+"""`Collection.products_count`, maintained with relative updates.
+
+Counts are changed with `F()` expressions in the transaction of the
+product write, so concurrent writes never overwrite each other's counts.
+They never go below 0, a drifted count is left for reconciliation.
+`reconcile_products_counts` recomputes them from the products.
+"""
+from django.db.models import (Case, Count, F, IntegerField, OuterRef,
+                              Subquery, Value, When)
+from django.db.models.functions import Coalesce, Greatest
+from .models import Collection, Product
+from . import signals
+
+
+def add_floored(field, delta):
+    """`field + delta`, floored at 0.
+
+    The floor applies before the addition: MySQL rejects an UNSIGNED
+    column going negative even within the expression.
+    """
+    if delta >= 0:
+        return F(field) + Value(delta)
+    return Greatest(F(field), Value(-delta),
+                    output_field=IntegerField()) + Value(delta)
+
+
+def adjust_products_counts(deltas):
+    """Add `{collection_id: delta}` to the counts with one UPDATE."""
+    deltas = {pk: delta for pk, delta in deltas.items()
+              if pk is not None and delta}
+    if not deltas:
+        return
+    Collection.objects.filter(pk__in=deltas).update(
+        products_count=Case(
+            *[When(pk=pk, then=add_floored('products_count', delta))
+              for pk, delta in deltas.items()],
+            default=F('products_count'), output_field=IntegerField()))
+    signals.bulk_changed.send(sender=Collection, pks=list(deltas))
+
+
+def remember_collection(product):
+    """Read the stored collection of a product not loaded with it."""
+    if product.pk is not None \
+            and not hasattr(product, '_loaded_collection_id'):
+        product._loaded_collection_id = Product.objects \
+            .filter(pk=product.pk) \
+            .values_list('collection_id', flat=True).first()
+
+
+def product_saved(product, created):
+    previous = getattr(product, '_loaded_collection_id', None)
+    if created:
+        adjust_products_counts({product.collection_id: 1})
+    elif previous != product.collection_id:
+        adjust_products_counts({previous: -1, product.collection_id: 1})
+    product._loaded_collection_id = product.collection_id
+
+
+def product_deleted(product):
+    adjust_products_counts({product.collection_id: -1})
+
+
+def reconcile_products_counts(queryset):
+    """Recompute the counts of the collections of `queryset`."""
+    pks = list(queryset.order_by().values_list('pk', flat=True))
+    if not pks:
+        return 0
+    counts = Product.objects \
+        .filter(collection_id=OuterRef('pk')) \
+        .order_by() \
+        .values('collection_id') \
+        .annotate(count=Count('pk')) \
+        .values('count')
+    updated = Collection.objects.filter(pk__in=pks).update(
+        products_count=Coalesce(
+            Subquery(counts, output_field=IntegerField()), Value(0)))
+    signals.bulk_changed.send(sender=Collection, pks=pks)
+    return updated
@@ -0,0 +1,55 @@
+import random
+import tracemalloc
+from itertools import cycle, islice
+from time import perf_counter
+from django.core.management.base import BaseCommand, CommandError
+from store.autocomplete import PrefixIndex
+from store.models import Product
+
+
+class Command(BaseCommand):
+    help = ('Measure the memory and lookup latency of the autocomplete index '
+            'over the product titles, repeated up to --titles entries.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1_000_000)
+        parser.add_argument('--lookups', type=int, default=10_000)
+        parser.add_argument('--limit', type=int, default=10)
+
+    def handle(self, *args, **options):
+        titles = list(Product.objects.values_list('title', flat=True)
+                      .distinct()[:10_000])
+        if not titles:
+            raise CommandError('No products, load seed.sql first.')
+        count = options['titles']
+
+        index = PrefixIndex()
+        tracemalloc.start()
+        start = perf_counter()
+        # Every entry gets its own copy of the title, as distinct rows do.
+        index.load(
+            ('product', pk, title.encode().decode())
+            for pk, title in enumerate(islice(cycle(titles), count), 1))
+        elapsed = perf_counter() - start
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.stdout.write(
+            f'{count} titles, {len(index.tokens)} tokens: built in '
+            f'{elapsed:.1f} s, {memory / 2 ** 20:.1f} MiB '
+            f'({memory / count:.0f} bytes/title, '
+            f'{memory / count * 1_000_000 / 2 ** 20:.0f} MiB per 1M titles)')
+
+        random.seed(0)
+        prefixes = [
+            token[:random.randint(1, min(len(token), 5))]
+            for token in random.choices(index.tokens, k=options['lookups'])
+        ]
+        timings = []
+        for prefix in prefixes:
+            start = perf_counter()
+            index.search(prefix, options['limit'])
+            timings.append(perf_counter() - start)
+        timings.sort()
+        for label, quantile in (('p50', 0.5), ('p99', 0.99), ('max', 1)):
+            value = timings[min(int(len(timings) * quantile), len(timings) - 1)]
+            self.stdout.write(f'{label} {value * 1e6:8.1f} µs')
@@ -0,0 +1,84 @@
+import threading
+from decimal import Decimal
+from time import perf_counter
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+from customer.models import Customer
+from store.models import Cart, CartItem, Collection, Product
+from store.services import OutOfStock, checkout
+
+
+class Command(BaseCommand):
+    help = ('Stress checkouts of one product from concurrent threads, '
+            'checking that inventory is never oversold.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--checkouts', type=int, default=50,
+                            help='Checkouts attempted per thread.')
+        parser.add_argument('--inventory', type=int, default=200)
+        parser.add_argument('--quantity', type=int, default=1)
+
+    def handle(self, *args, **options):
+        product, customer = self.setup(options['inventory'])
+        carts = [
+            [self.create_cart(product, options['quantity'])
+             for _ in range(options['checkouts'])]
+            for _ in range(options['threads'])
+        ]
+        sold, rejected, errors = [], [], []
+
+        def buy(cart_ids):
+            try:
+                for cart_id in cart_ids:
+                    try:
+                        checkout(cart_id, customer)
+                        sold.append(cart_id)
+                    except OutOfStock:
+                        rejected.append(cart_id)
+                    except DatabaseError as error:
+                        errors.append(error)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=buy, args=(cart_ids,))
+                   for cart_ids in carts]
+        start = perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = perf_counter() - start
+
+        product.refresh_from_db()
+        attempts = options['threads'] * options['checkouts']
+        self.stdout.write(
+            f'{attempts} checkouts in {elapsed:.2f} s '
+            f'({attempts / elapsed:.0f}/s): {len(sold)} sold, '
+            f'{len(rejected)} out of stock, {len(errors)} database errors, '
+            f'{product.inventory} left')
+        if errors:
+            self.stdout.write(f'first database error: {errors[0]}')
+
+        expected = options['inventory'] - len(sold) * options['quantity']
+        if product.inventory < 0 or product.inventory != expected:
+            raise CommandError('Inventory was oversold.')
+        Cart.objects.filter(items__product=product).delete()
+
+    def setup(self, inventory):
+        collection, _ = Collection.objects.get_or_create(title='Benchmark')
+        product, _ = Product.objects.update_or_create(
+            slug='checkout-benchmark',
+            defaults={'title': 'Checkout benchmark', 'inventory': inventory,
+                      'unit_price': Decimal('10.00'), 'collection': collection})
+        user, _ = get_user_model().objects.get_or_create(
+            username='checkout-benchmark',
+            defaults={'email': 'checkout-benchmark@example.com'})
+        customer, _ = Customer.objects.get_or_create(user=user)
+        return product, customer
+
+    def create_cart(self, product, quantity):
+        cart = Cart.objects.create()
+        CartItem.objects.create(cart=cart, product=product, quantity=quantity)
+        return cart.pk
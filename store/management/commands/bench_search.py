@@ -0,0 +1,76 @@
+from time import perf_counter
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from store.models import Product
+from store.search import search_products, search_terms
+
+TERMS = ['bread', 'chicken wine', 'pasta sauce', 'lorem', 'zzzz']
+
+
+class Command(BaseCommand):
+    help = ('Compare full-text product search against icontains lookups. '
+            'Load seed.sql first, the products are scaled up by --scale.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=1000,
+                            help='Multiply the current products up to this '
+                                 'factor of the seed data.')
+        parser.add_argument('--seed-size', type=int, default=1000,
+                            help='Products of the seed data.')
+        parser.add_argument('--first', type=int, default=20,
+                            help='Products per page.')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('terms', nargs='*', default=TERMS)
+
+    def handle(self, *args, **options):
+        if not Product.objects.exists():
+            raise CommandError('No products, load seed.sql first.')
+        self.scale(options['seed_size'] * options['scale'])
+        self.stdout.write(f'{Product.objects.count()} products')
+
+        first, repeat = options['first'], options['repeat']
+        for query in options['terms']:
+            terms = search_terms(query)
+            contains = Q()
+            for term in terms:
+                contains |= Q(title__icontains=term) \
+                    | Q(description__icontains=term)
+            # icontains cannot rank, its first page stops at the first
+            # `first` matches while counting them scans every row.
+            cases = (
+                ('fulltext page', lambda: len(search_products(query)[:first])),
+                ('icontains page', lambda: len(
+                    Product.objects.filter(contains).order_by('pk')[:first])),
+                ('fulltext count', lambda: search_products(query).count()),
+                ('icontains count',
+                 lambda: Product.objects.filter(contains).count()),
+            )
+            for label, run in cases:
+                start = perf_counter()
+                for _ in range(repeat):
+                    rows = run()
+                elapsed = (perf_counter() - start) / repeat
+                self.stdout.write(
+                    f'{query!r:<16} {label:<16} {elapsed * 1000:9.2f} ms '
+                    f'{rows:7} rows')
+
+    def scale(self, target):
+        """Copy the products with INSERT ... SELECT until `target` rows."""
+        columns = ', '.join(
+            connection.ops.quote_name(field.column)
+            for field in Product._meta.concrete_fields
+            if not field.primary_key)
+        table = connection.ops.quote_name(Product._meta.db_table)
+        count = Product.objects.count()
+        while count < target:
+            batch = min(count, target - count)
+            start = perf_counter()
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO {table} ({columns}) '
+                    f'SELECT {columns} FROM {table} ORDER BY id LIMIT %s',
+                    [batch])
+            count += batch
+            self.stdout.write(
+                f'  copied {batch} products in {perf_counter() - start:.1f} s')
@@ -0,0 +1,70 @@
+import csv
+import json
+import sys
+from pathlib import Path
+from time import perf_counter
+from django.core.management.base import BaseCommand, CommandError
+from store.services import BULK_CHUNK_SIZE, bulk_create_products, chunked
+
+
+def read_csv(lines):
+    """Read rows with a header; `promotions` ids are separated by `;`."""
+    for row in csv.DictReader(lines):
+        promotions = row.pop('promotions', None) or ''
+        row = {key: value for key, value in row.items() if value != ''}
+        row['promotions'] = [id for id in promotions.split(';') if id.strip()]
+        yield row
+
+
+def read_ndjson(lines):
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as error:
+            raise CommandError(f'Line {number} is not valid JSON: {error}')
+
+
+READERS = {'csv': read_csv, 'ndjson': read_ndjson}
+
+
+class Command(BaseCommand):
+    help = 'Import products from a CSV or NDJSON file with batched inserts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import, "-" for stdin.')
+        parser.add_argument('--format', choices=READERS,
+                            help='Defaults to the extension of the file.')
+        parser.add_argument('--batch-size', type=int, default=10000,
+                            help='Rows validated and committed together.')
+        parser.add_argument('--chunk-size', type=int, default=BULK_CHUNK_SIZE,
+                            help='Rows per INSERT statement.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or Path(path).suffix.lstrip('.').lower()
+        if file_format not in READERS:
+            raise CommandError('Pass --format, the file extension is unknown.')
+
+        stream = sys.stdin if path == '-' else open(path, newline='')
+        created = failed = 0
+        start = perf_counter()
+        with stream:
+            rows = READERS[file_format](stream)
+            for batch_number, batch in enumerate(
+                    chunked(rows, options['batch_size'])):
+                offset = batch_number * options['batch_size']
+                result = bulk_create_products(
+                    batch, chunk_size=options['chunk_size'])
+                created += len(result.created)
+                failed += len({error.row for error in result.errors})
+                for error in result.errors:
+                    self.stderr.write(
+                        f'row {offset + error.row + 1}: '
+                        f'{error.field}: {error.message}')
+
+        elapsed = perf_counter() - start
+        self.stdout.write(
+            f'Created {created} products, skipped {failed} invalid rows '
+            f'in {elapsed:.2f} s.')
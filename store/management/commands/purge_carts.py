@@ -0,0 +1,60 @@
+import re
+from datetime import timedelta
+from time import perf_counter
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from store.services import (BULK_CHUNK_SIZE, purge_expired_carts,
+                            purge_orphaned_cart_items)
+
+UNITS = {'d': 'days', 'h': 'hours', 'm': 'minutes'}
+
+
+def parse_age(value):
+    """Parse an age such as `30d`, `12h` or `90m`, plain numbers are days."""
+    match = re.fullmatch(r'(\d+)([dhm]?)', value.strip())
+    if not match:
+        raise CommandError(f'Invalid age "{value}", use e.g. 30d, 12h or 90m.')
+    amount, unit = match.groups()
+    return timedelta(**{UNITS[unit or 'd']: int(amount)})
+
+
+class Command(BaseCommand):
+    help = 'Delete expired carts and orphaned cart items in small chunks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=parse_age, required=True,
+                            help='Age of the carts to delete, e.g. 30d.')
+        parser.add_argument('--chunk-size', type=int, default=BULK_CHUNK_SIZE)
+        parser.add_argument('--pause', type=float, default=0,
+                            help='Seconds to sleep between chunks, lets '
+                                 'replicas catch up.')
+        parser.add_argument('--orphans', action='store_true',
+                            help='Also delete items whose cart is gone.')
+
+    def handle(self, *args, **options):
+        created_before = timezone.now() - options['older_than']
+        verbose = options['verbosity'] > 1
+
+        def report(chunk):
+            if verbose:
+                self.stdout.write(
+                    f'  deleted {chunk.carts} carts, {chunk.items} items')
+
+        start = perf_counter()
+        result = purge_expired_carts(
+            created_before, chunk_size=options['chunk_size'],
+            pause=options['pause'], on_chunk=report)
+        elapsed = perf_counter() - start
+        self.stdout.write(
+            f'Deleted {result.carts} carts and {result.items} items created '
+            f'before {created_before:%Y-%m-%d %H:%M} in {elapsed:.2f} s '
+            f'({result.carts / elapsed if elapsed else 0:.0f} carts/s).')
+
+        if options['orphans']:
+            start = perf_counter()
+            items = purge_orphaned_cart_items(
+                chunk_size=options['chunk_size'], pause=options['pause'],
+                on_chunk=report)
+            elapsed = perf_counter() - start
+            self.stdout.write(
+                f'Deleted {items} orphaned items in {elapsed:.2f} s.')
@@ -0,0 +1,30 @@
+from time import perf_counter
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+from store.models import Product
+from store.reviews import rebuild_review_stats
+from store.services import BULK_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = ('Recompute the review count and last review date of all products '
+            'with one UPDATE per primary key range.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=BULK_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        bounds = Product.objects.aggregate(low=Min('pk'), high=Max('pk'))
+        if bounds['low'] is None:
+            self.stdout.write('No products.')
+            return
+
+        total, start = 0, perf_counter()
+        chunk_size = options['chunk_size']
+        for low in range(bounds['low'], bounds['high'] + 1, chunk_size):
+            total += rebuild_review_stats(Product.objects.filter(
+                pk__gte=low, pk__lt=low + chunk_size))
+        elapsed = perf_counter() - start
+        self.stdout.write(
+            f'Rebuilt the review statistics of {total} products '
+            f'in {elapsed:.2f} s.')
@@ -0,0 +1,24 @@
+from time import perf_counter
+from django.core.management.base import BaseCommand
+from store.models import Product
+from store.pricing import RECOMPUTE_CHUNK_SIZE, recompute_effective_prices
+
+
+class Command(BaseCommand):
+    help = ('Recompute the effective prices of all products with one UPDATE '
+            'per chunk of primary keys.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int,
+                            default=RECOMPUTE_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        start = perf_counter()
+        total = recompute_effective_prices(
+            Product.objects.all(), chunk_size=options['chunk_size'])
+        if not total:
+            self.stdout.write('No products.')
+            return
+        elapsed = perf_counter() - start
+        self.stdout.write(
+            f'Recomputed {total} effective prices in {elapsed:.2f} s.')
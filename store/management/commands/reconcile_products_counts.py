@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F
+from store.counters import reconcile_products_counts
+from store.models import Collection
+
+
+class Command(BaseCommand):
+    help = ('Recompute Collection.products_count from the products and '
+            'report the collections that had drifted.')
+
+    def handle(self, *args, **options):
+        drifted = Collection.objects \
+            .annotate(actual=Count('products')) \
+            .exclude(products_count=F('actual')) \
+            .values_list('pk', 'title', 'products_count', 'actual')
+        for pk, title, stored, actual in drifted:
+            self.stdout.write(f'  {title} ({pk}): {stored} -> {actual}')
+
+        updated = reconcile_products_counts(Collection.objects.all())
+        self.stdout.write(f'Reconciled {updated} collections.')
@@ -0,0 +1,49 @@
+# Generated by Django 4.1 on 2026-10-18 12:36
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import DecimalField, F, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce, Greatest, Least, Round
+
+
+def backfill_effective_price(apps, schema_editor):
+    # A frozen copy of store.pricing.effective_price_expression.
+    Product = apps.get_model('store', 'Product')
+    discount_field = DecimalField(max_digits=5, decimal_places=2)
+    discounts = Product.promotions.through.objects \
+        .filter(product_id=OuterRef('pk')) \
+        .values('product_id') \
+        .annotate(best=Max('promotion__discount')) \
+        .values('best')
+    discount = Greatest(
+        Least(Coalesce(Cast(Subquery(discounts), discount_field),
+                       Value(Decimal(0)), output_field=discount_field),
+              Value(Decimal(100))),
+        Value(Decimal(0)), output_field=discount_field)
+    Product.objects.update(effective_price=Round(
+        F('unit_price') * (Value(Decimal(100)) - discount) / Value(Decimal(100)),
+        2, output_field=DecimalField(max_digits=6, decimal_places=2)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0004_cart_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='effective_price',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=6),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['effective_price'], name='product_effective_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['collection', 'effective_price'], name='product_collection_eff_idx'),
+        ),
+        migrations.RunPython(backfill_effective_price, migrations.RunPython.noop),
+    ]
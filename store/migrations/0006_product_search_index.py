@@ -0,0 +1,62 @@
+from django.db import migrations
+
+# The index as of this migration, independent of later changes to
+# store.search.
+MYSQL_INSTALL = [
+    'CREATE FULLTEXT INDEX product_search_idx '
+    'ON store_product (title, description)',
+]
+MYSQL_UNINSTALL = [
+    'DROP INDEX product_search_idx ON store_product',
+]
+SQLITE_INSTALL = [
+    '''CREATE VIRTUAL TABLE IF NOT EXISTS store_product_fts USING fts5(
+        title, description, content='store_product', content_rowid='id')''',
+    '''CREATE TRIGGER IF NOT EXISTS store_product_fts_insert
+        AFTER INSERT ON store_product BEGIN
+        INSERT INTO store_product_fts (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+        END''',
+    '''CREATE TRIGGER IF NOT EXISTS store_product_fts_delete
+        AFTER DELETE ON store_product BEGIN
+        INSERT INTO store_product_fts (store_product_fts, rowid, title,
+                                       description)
+        VALUES ('delete', old.id, old.title, old.description);
+        END''',
+    '''CREATE TRIGGER IF NOT EXISTS store_product_fts_update
+        AFTER UPDATE OF title, description ON store_product BEGIN
+        INSERT INTO store_product_fts (store_product_fts, rowid, title,
+                                       description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO store_product_fts (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+        END''',
+    "INSERT INTO store_product_fts (store_product_fts) VALUES ('rebuild')",
+]
+SQLITE_UNINSTALL = [
+    'DROP TRIGGER IF EXISTS store_product_fts_insert',
+    'DROP TRIGGER IF EXISTS store_product_fts_delete',
+    'DROP TRIGGER IF EXISTS store_product_fts_update',
+    'DROP TABLE IF EXISTS store_product_fts',
+]
+
+
+def run(statements):
+    def apply(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, ()):
+            schema_editor.execute(statement)
+    return apply
+
+
+class Migration(migrations.Migration):
+    """FULLTEXT index on MySQL, FTS5 table and triggers on SQLite."""
+
+    dependencies = [
+        ('store', '0005_effective_price'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({'mysql': MYSQL_INSTALL, 'sqlite': SQLITE_INSTALL}),
+            run({'mysql': MYSQL_UNINSTALL, 'sqlite': SQLITE_UNINSTALL})),
+    ]
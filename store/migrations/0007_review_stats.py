@@ -0,0 +1,48 @@
+# Generated by Django 4.1 on 2026-10-18 12:45
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_review_stats(apps, schema_editor):
+    # A frozen copy of store.reviews.rebuild_review_stats.
+    Product = apps.get_model('store', 'Product')
+    Review = apps.get_model('store', 'Review')
+
+    def review_stat(aggregate, **output):
+        return Subquery(
+            Review.objects.filter(product_id=OuterRef('pk')).order_by()
+            .values('product_id').annotate(value=aggregate).values('value'),
+            **output)
+
+    Product.objects.update(
+        review_count=Coalesce(
+            review_stat(Count('pk'), output_field=IntegerField()), Value(0)),
+        last_review_date=review_stat(Max('date')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0006_product_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='last_review_date',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['review_count'], name='product_review_count_idx'),
+        ),
+        migrations.RunPython(backfill_review_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.1 on 2026-10-18 12:46
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_products_count(apps, schema_editor):
+    # A frozen copy of store.counters.reconcile_products_counts.
+    Collection = apps.get_model('store', 'Collection')
+    Product = apps.get_model('store', 'Product')
+    counts = Product.objects.filter(collection_id=OuterRef('pk')).order_by() \
+        .values('collection_id').annotate(count=Count('pk')).values('count')
+    Collection.objects.update(products_count=Coalesce(
+        Subquery(counts, output_field=IntegerField()), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0007_review_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='collection',
+            name='products_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_products_count, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,5 @@
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, router, transaction
 from uuid import uuid4
 from customer.models import Customer
 
@@ -8,17 +8,27 @@ class Promotion(models.Model):
     description = models.CharField(max_length=255)
     discount = models.FloatField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['discount'], name='promotion_discount_idx'),
+        ]
+
 
 class Collection(models.Model):
     title = models.CharField(max_length=255)
     featured_product = models.ForeignKey(
         'Product', on_delete=models.SET_NULL, null=True, related_name='+', blank=True)
+    # Number of `products`, see store.counters.
+    products_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self) -> str:
         return self.title
 
     class Meta:
         ordering = ['title']
+        indexes = [
+            models.Index(fields=['title'], name='collection_title_idx'),
+        ]
 
 
 class Product(models.Model):
@@ -30,6 +40,12 @@ class Product(models.Model):
         decimal_places=2,
         validators=[MinValueValidator(1)])
     inventory = models.IntegerField(validators=[MinValueValidator(0)])
+    # `unit_price` with the best promotion applied, see store.pricing.
+    effective_price = models.DecimalField(
+        max_digits=6, decimal_places=2, default=0, editable=False)
+    # Statistics of `reviews`, see store.reviews.
+    review_count = models.PositiveIntegerField(default=0, editable=False)
+    last_review_date = models.DateField(null=True, blank=True, editable=False)
     last_update = models.DateTimeField(auto_now=True)
     collection = models.ForeignKey(
         Collection, on_delete=models.PROTECT, related_name='products')
@@ -38,8 +54,51 @@ class Product(models.Model):
     def __str__(self) -> str:
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The collection a product is loaded with, to move it between the
+        # counts of collections when it changes.
+        if 'collection_id' in instance.__dict__:
+            instance._loaded_collection_id = instance.collection_id
+        return instance
+
+    def save(self, *args, **kwargs):
+        # store.pricing imports the models.
+        from .pricing import product_effective_price
+
+        # Collection counts are updated by a `post_save` receiver, within
+        # the transaction of the write.
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self)
+        update_fields = kwargs.get('update_fields')
+        with transaction.atomic(using=using):
+            if update_fields is None or 'unit_price' in update_fields:
+                self.effective_price = product_effective_price(self)
+                if update_fields is not None:
+                    kwargs['update_fields'] = {
+                        *update_fields, 'effective_price'}
+            super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['title']
+        indexes = [
+            models.Index(fields=['title'], name='product_title_idx'),
+            models.Index(fields=['unit_price'], name='product_unit_price_idx'),
+            models.Index(fields=['last_update'], name='product_last_update_idx'),
+            models.Index(fields=['collection', 'unit_price'],
+                         name='product_collection_price_idx'),
+            models.Index(fields=['collection', 'title'],
+                         name='product_collection_title_idx'),
+            models.Index(fields=['collection', 'last_update'],
+                         name='product_collection_update_idx'),
+            models.Index(fields=['effective_price'],
+                         name='product_effective_price_idx'),
+            models.Index(fields=['collection', 'effective_price'],
+                         name='product_collection_eff_idx'),
+            models.Index(fields=['review_count'],
+                         name='product_review_count_idx'),
+        ]
 
 
 class Review(models.Model):
@@ -49,6 +108,20 @@ class Review(models.Model):
     description = models.TextField()
     date = models.DateField(auto_now_add=True)
 
+    def save(self, *args, **kwargs):
+        # The statistics of the product are updated by a `post_save`
+        # receiver, within the transaction of the insert.
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['product', 'date'],
+                         name='review_product_date_idx'),
+        ]
+
 
 class Order(models.Model):
     PAYMENT_STATUS_PENDING = 'P'
@@ -91,6 +164,12 @@ class Cart(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid4)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'],
+                         name='cart_created_at_idx'),
+        ]
+
 
 class CartItem(models.Model):
 
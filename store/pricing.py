@@ -0,0 +1,103 @@
+"""Effective prices: `unit_price` with the best promotion applied.
+
+`Product.effective_price` is denormalized so that it can be filtered,
+ordered and indexed. It is recomputed in SQL for sets of products, with
+DECIMAL arithmetic on the database, and with `Decimal` in Python for a
+single product being saved.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+from django.db.models import DecimalField, F, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce, Greatest, Least, Round
+from .models import Product
+from . import signals
+
+CENT = Decimal('0.01')
+
+RECOMPUTE_CHUNK_SIZE = 1000
+
+DISCOUNT_FIELD = DecimalField(max_digits=5, decimal_places=2)
+PRICE_FIELD = DecimalField(max_digits=6, decimal_places=2)
+
+
+def best_discount():
+    """Subquery of the highest promotion discount of the outer product.
+
+    The cast rounds the discount to cents on MySQL, the explicit rounding
+    does on SQLite, which casts to NUMERIC without a scale.
+    """
+    through = Product.promotions.through
+    discounts = through.objects \
+        .filter(product_id=OuterRef('pk')) \
+        .values('product_id') \
+        .annotate(best=Max('promotion__discount')) \
+        .values('best')
+    return Coalesce(
+        Round(Cast(Subquery(discounts), DISCOUNT_FIELD), 2,
+              output_field=DISCOUNT_FIELD),
+        Value(Decimal(0)), output_field=DISCOUNT_FIELD)
+
+
+def effective_price_expression(unit_price=None):
+    """`unit_price * (100 - discount) / 100`, with the discount in 0..100.
+
+    `unit_price` defaults to the current column; an expression of the new
+    price lets one UPDATE change both columns.
+    """
+    if unit_price is None:
+        unit_price = F('unit_price')
+    discount = Greatest(
+        Least(best_discount(), Value(Decimal(100))), Value(Decimal(0)),
+        output_field=DISCOUNT_FIELD)
+    return Round(
+        unit_price * (Value(Decimal(100)) - discount) / Value(Decimal(100)),
+        2, output_field=PRICE_FIELD)
+
+
+def apply_discount(unit_price, discount):
+    """Python counterpart of `effective_price_expression` for one row.
+
+    The discount is rounded to cents first, like its cast to DECIMAL(5,2).
+    """
+    discount = Decimal(str(discount or 0)).quantize(
+        CENT, rounding=ROUND_HALF_UP)
+    discount = min(max(discount, Decimal(0)), Decimal(100))
+    price = Decimal(unit_price) * (100 - discount) / 100
+    return price.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def product_effective_price(product):
+    """Effective price of a product about to be saved."""
+    discount = None
+    if product.pk is not None:
+        discount = Product.promotions.through.objects \
+            .filter(product_id=product.pk) \
+            .aggregate(best=Max('promotion__discount'))['best']
+    return apply_discount(product.unit_price, discount)
+
+
+def update_effective_prices(pks):
+    """Recompute the effective prices of the products `pks` in one UPDATE.
+
+    Callers send `bulk_changed` themselves.
+    """
+    return Product.objects.filter(pk__in=pks).update(
+        effective_price=effective_price_expression())
+
+
+def recompute_effective_prices(queryset, chunk_size=RECOMPUTE_CHUNK_SIZE):
+    """Recompute the effective prices of `queryset`.
+
+    The products are updated `chunk_size` at a time, in primary key order,
+    so only one chunk of primary keys is held at once. Returns the number
+    of products.
+    """
+    queryset = queryset.order_by('pk').values_list('pk', flat=True)
+    updated, last = 0, None
+    while True:
+        chunk = queryset if last is None else queryset.filter(pk__gt=last)
+        pks = list(chunk[:chunk_size])
+        if not pks:
+            return updated
+        updated += update_effective_prices(pks)
+        signals.bulk_changed.send(sender=Product, pks=pks)
+        last = pks[-1]
@@ -0,0 +1,61 @@
+"""Review statistics denormalized on `Product`.
+
+`review_count` and `last_review_date` are changed with one UPDATE per
+inserted or deleted review, in the transaction of that write, so product
+listings can show and order by them without aggregating reviews.
+"""
+from django.db.models import Count, F, IntegerField, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from .models import Product, Review
+from . import signals
+
+
+def review_stat(aggregate, **output):
+    """Subquery aggregating the reviews of the outer product."""
+    return Subquery(
+        Review.objects
+        .filter(product_id=OuterRef('pk'))
+        .order_by()
+        .values('product_id')
+        .annotate(value=aggregate)
+        .values('value'),
+        **output)
+
+
+def latest_review_date():
+    return review_stat(Max('date'))
+
+
+def review_added(review):
+    Product.objects.filter(pk=review.product_id).update(
+        review_count=F('review_count') + 1,
+        last_review_date=Greatest(
+            Coalesce(F('last_review_date'), Value(review.date)),
+            Value(review.date)),
+    )
+    signals.bulk_changed.send(sender=Product, pks=[review.product_id])
+
+
+def review_deleted(review):
+    # The latest remaining date is read from the (product, date) index.
+    Product.objects.filter(pk=review.product_id).update(
+        # Floored before subtracting, MySQL rejects an UNSIGNED column
+        # going negative even within the expression.
+        review_count=Greatest(F('review_count'), Value(1)) - Value(1),
+        last_review_date=latest_review_date(),
+    )
+    signals.bulk_changed.send(sender=Product, pks=[review.product_id])
+
+
+def rebuild_review_stats(queryset):
+    """Recompute the statistics of `queryset` with one UPDATE."""
+    pks = list(queryset.order_by().values_list('pk', flat=True))
+    if not pks:
+        return 0
+    updated = Product.objects.filter(pk__in=pks).update(
+        review_count=Coalesce(
+            review_stat(Count('pk'), output_field=IntegerField()), Value(0)),
+        last_review_date=latest_review_date(),
+    )
+    signals.bulk_changed.send(sender=Product, pks=pks)
+    return updated
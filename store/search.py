@@ -0,0 +1,151 @@
+"""Full-text search of products on their title and description.
+
+MySQL matches against the FULLTEXT index `product_search_idx`, SQLite
+against the `store_product_fts` FTS5 table kept in sync by triggers. Both
+are created by migration 0006. Other backends fall back to `icontains`
+lookups without ranking.
+"""
+import re
+from django.db import connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from .models import Product
+
+SEARCH_INDEX = 'product_search_idx'
+FTS_TABLE = 'store_product_fts'
+MAX_TERMS = 10
+SNIPPET_WORDS = 16
+
+# SQLite rebuilds a table to alter it, which drops its triggers;
+# `restore_search_triggers` recreates them after every migration.
+SQLITE_SEARCH_SQL = [
+    f'''CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, content='store_product', content_rowid='id')''',
+    f'''CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+        AFTER INSERT ON store_product BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+        END''',
+    f'''CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+        AFTER DELETE ON store_product BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        END''',
+    f'''CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+        AFTER UPDATE OF title, description ON store_product BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE} (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+        END''',
+]
+SQLITE_TRIGGERS = [f'{FTS_TABLE}_insert', f'{FTS_TABLE}_delete',
+                   f'{FTS_TABLE}_update']
+
+
+def install_search_index(connection):
+    """Create the full-text index of products, if the backend has one."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(
+                f'CREATE FULLTEXT INDEX {SEARCH_INDEX} '
+                f'ON store_product (title, description)')
+        elif connection.vendor == 'sqlite':
+            for statement in SQLITE_SEARCH_SQL:
+                cursor.execute(statement)
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def restore_search_triggers(connection):
+    """Recreate the SQLite triggers dropped by a rebuild of the table."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name IN (%s, %s, %s, %s)",
+            [FTS_TABLE, *SQLITE_TRIGGERS])
+        existing = {name for name, in cursor.fetchall()}
+    if FTS_TABLE in existing and len(existing) <= len(SQLITE_TRIGGERS):
+        install_search_index(connection)
+
+
+def search_terms(query):
+    """The words of a search query, free of any full-text operators."""
+    return re.findall(r'\w+', query or '')[:MAX_TERMS]
+
+
+def search_products(query, queryset=None):
+    """Return the products of `queryset` matching `query`, best first.
+
+    Products are annotated with their `relevance`, higher is better.
+    """
+    if queryset is None:
+        queryset = Product.objects.all()
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+
+    vendor = connections[queryset.db].vendor
+    if vendor == 'mysql':
+        relevance = RawSQL(
+            'MATCH (store_product.title, store_product.description) '
+            'AGAINST (%s IN NATURAL LANGUAGE MODE)',
+            (' '.join(terms),), output_field=FloatField())
+        return queryset.annotate(relevance=relevance) \
+            .filter(relevance__gt=0).order_by('-relevance', 'pk')
+
+    if vendor == 'sqlite':
+        # Any of the terms, as quoted FTS5 strings. bm25() is lower for
+        # better matches.
+        match = ' OR '.join(f'"{term}"' for term in terms)
+        return queryset.extra(
+            select={'relevance': f'-bm25({FTS_TABLE})'},
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = store_product.id',
+                   f'{FTS_TABLE} MATCH %s'],
+            params=[match],
+        ).order_by('-relevance', 'pk')
+
+    condition = Q()
+    for term in terms:
+        condition |= Q(title__icontains=term) | Q(description__icontains=term)
+    return queryset.filter(condition) \
+        .annotate(relevance=Value(0.0, output_field=FloatField())) \
+        .order_by('pk')
+
+
+def snippet(text, terms, words=SNIPPET_WORDS):
+    """Return up to `words` words of `text` around the first matching term.
+
+    The text is HTML escaped and the matching words wrapped in `<mark>`.
+    Returns None when no term occurs in `text`.
+    """
+    if not text or not terms:
+        return None
+    pattern = re.compile(
+        r'\b(%s)\b' % '|'.join(map(re.escape, terms)), re.IGNORECASE)
+    tokens = text.split()
+    hit = next(
+        (index for index, token in enumerate(tokens) if pattern.search(token)),
+        None)
+    if hit is None:
+        return None
+
+    start = max(0, min(hit - words // 2, len(tokens) - words))
+    window = ' '.join(tokens[start:start + words])
+    # `split` keeps the matches at odd indexes.
+    parts = pattern.split(window)
+    marked = ''.join(
+        f'<mark>{escape(part)}</mark>' if index % 2 else escape(part)
+        for index, part in enumerate(parts))
+    prefix = '… ' if start > 0 else ''
+    suffix = ' …' if start + words < len(tokens) else ''
+    return f'{prefix}{marked}{suffix}'
+
+
+def product_snippet(product, terms):
+    """Snippet of the description of `product`, or of its title."""
+    return snippet(product.description, terms) \
+        or snippet(product.title, terms) or escape(product.title)
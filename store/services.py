@@ -0,0 +1,581 @@
+"""Set-based write operations on the store.
+
+These bypass `Model.save()` and the model signals, and send
+`store.signals.bulk_changed` once they are done instead.
+"""
+from collections import Counter, namedtuple
+from decimal import Decimal
+from itertools import chain, islice
+from time import sleep
+from django.core.exceptions import ValidationError
+from django.db import (DatabaseError, IntegrityError, connections, router,
+                       transaction)
+from django.db.backends.base.operations import BaseDatabaseOperations
+from django.db.models import (DecimalField, Exists, F, IntegerField, Max,
+                              Min, OuterRef, Sum, Value)
+from django.db.models.functions import Greatest, Least, Round
+from django.utils import timezone
+from .models import (Cart, CartItem, Collection, Order, OrderItem, Product,
+                     Promotion)
+from .counters import adjust_products_counts
+from .pricing import effective_price_expression, update_effective_prices
+from .signals import bulk_changed
+
+BULK_CHUNK_SIZE = 1000
+
+PRODUCT_FIELDS = ('title', 'slug', 'description', 'unit_price', 'inventory')
+
+RowError = namedtuple('RowError', ['row', 'field', 'message'])
+BulkCreateResult = namedtuple('BulkCreateResult', ['created', 'errors'])
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def existing_ids(model, ids):
+    """Return the subset of `ids` that are primary keys of `model` rows.
+
+    One query is run, whatever the number of ids.
+    """
+    pk = model._meta.pk
+    valid = set()
+    for value in ids:
+        try:
+            valid.add(pk.to_python(value))
+        except ValidationError:
+            pass
+    valid.discard(None)
+    if not valid:
+        return set()
+    return set(model.objects.filter(pk__in=valid).values_list('pk', flat=True))
+
+
+def build_product(index, row, collection_ids, promotion_ids):
+    """Return `(product, promotion_ids, errors)` for one input row."""
+    errors = []
+    product = Product(**{
+        field: row.get(field) for field in PRODUCT_FIELDS if field in row
+    })
+    try:
+        # The collection is checked against `collection_ids` instead of
+        # with one query per row.
+        product.clean_fields(exclude=['collection', 'promotions'])
+    except ValidationError as error:
+        errors += [
+            RowError(index, field, message)
+            for field, messages in error.message_dict.items()
+            for message in messages
+        ]
+
+    try:
+        product.collection_id = Product._meta.get_field(
+            'collection').target_field.to_python(row.get('collection_id'))
+    except ValidationError:
+        product.collection_id = None
+    if product.collection_id not in collection_ids:
+        errors.append(RowError(index, 'collection_id',
+                               'Collection does not exist.'))
+    # Promotions are applied by `insert_products` once the rows exist.
+    product.effective_price = product.unit_price
+
+    promotions = []
+    for promotion_id in row.get('promotions') or ():
+        try:
+            promotion_id = Promotion._meta.pk.to_python(promotion_id)
+        except ValidationError:
+            promotion_id = None
+        if promotion_id not in promotion_ids:
+            errors.append(RowError(index, 'promotions',
+                                   f'Promotion {promotion_id} does not exist.'))
+        elif promotion_id not in promotions:
+            promotions.append(promotion_id)
+
+    return product, promotions, errors
+
+
+def bulk_create_products(rows, chunk_size=BULK_CHUNK_SIZE):
+    """Validate and insert product rows in chunks.
+
+    `rows` are mappings of `PRODUCT_FIELDS`, `collection_id` and a list of
+    `promotions` ids. Invalid rows are skipped and reported as `RowError`s
+    keyed by their index, the valid ones are inserted in one transaction.
+    """
+    rows = list(rows)
+    collection_ids = existing_ids(
+        Collection, (row.get('collection_id') for row in rows))
+    promotion_ids = existing_ids(
+        Promotion, chain.from_iterable(row.get('promotions') or () for row in rows))
+
+    valid, errors = [], []
+    for index, row in enumerate(rows):
+        product, promotions, row_errors = build_product(
+            index, row, collection_ids, promotion_ids)
+        if row_errors:
+            errors += row_errors
+        else:
+            valid.append((product, promotions))
+
+    with transaction.atomic():
+        for chunk in chunked(valid, chunk_size):
+            insert_products(chunk)
+
+    created = [product for product, _ in valid]
+    if created:
+        bulk_changed.send(
+            sender=Product,
+            pks=[product.pk for product in created if product.pk is not None])
+        used_promotions = set(chain.from_iterable(
+            promotions for _, promotions in valid))
+        if used_promotions:
+            bulk_changed.send(sender=Promotion, pks=used_promotions)
+    return BulkCreateResult(created, errors)
+
+
+def insert_products(chunk):
+    """Insert `(product, promotion_ids)` pairs and their through rows."""
+    connection = connections[router.db_for_write(Product)]
+    bulk = [product for product, _ in chunk]
+    if connection.features.can_return_rows_from_bulk_insert:
+        Product.objects.bulk_create(bulk)
+    else:
+        # One INSERT, so that its ids can be told from the first one.
+        Product.objects.bulk_create(bulk, batch_size=len(bulk))
+        assign_inserted_ids(connection, bulk)
+    adjust_products_counts(Counter(product.collection_id for product in bulk))
+
+    through = Product.promotions.through
+    through.objects.bulk_create([
+        through(product_id=product.pk, promotion_id=promotion_id)
+        for product, promotions in chunk
+        for promotion_id in promotions
+    ])
+    promoted = [product.pk for product, promotions in chunk if promotions]
+    if promoted:
+        update_effective_prices(promoted)
+
+
+def assign_inserted_ids(connection, products):
+    """Set the pks of `products`, just inserted by one multi-row INSERT.
+
+    MySQL only reports the first id of the statement. InnoDB gives the
+    rows of an INSERT of a known number of rows consecutive ids,
+    `auto_increment_increment` apart, in every `innodb_autoinc_lock_mode`.
+    The ids are checked against the titles read back in one query.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT LAST_INSERT_ID(), @@auto_increment_increment')
+        first, step = cursor.fetchone()
+    ids = [first + index * step for index in range(len(products))]
+    titles = dict(Product.objects.filter(pk__in=ids).values_list('pk', 'title'))
+    if any(titles.get(pk) != product.title
+           for pk, product in zip(ids, products)):
+        raise DatabaseError('The ids of the inserted products are not '
+                            'consecutive.')
+    for pk, product in zip(ids, products):
+        product.pk = pk
+
+
+def max_product_value(name):
+    """The largest value the column of the product field `name` holds.
+
+    None when the database does not bound it, like SQLite for integers.
+    Prices never go below 1 and inventories below 0 either.
+    """
+    field = Product._meta.get_field(name)
+    if field.get_internal_type() == 'DecimalField':
+        return Decimal(10) ** (field.max_digits - field.decimal_places) \
+            - Decimal(10) ** -field.decimal_places
+    connection = connections[router.db_for_write(Product)]
+    return connection.ops.integer_field_range(field.get_internal_type())[1]
+
+
+def price_adjustment(percent):
+    """Expression changing `unit_price` by `percent`, within the column."""
+    factor = 1 + Decimal(str(percent)) / 100
+    output_field = DecimalField(max_digits=6, decimal_places=2)
+    return Least(
+        Greatest(Round(F('unit_price') * Value(factor), 2),
+                 Value(Decimal('1.00')), output_field=output_field),
+        Value(max_product_value('unit_price')),
+        output_field=output_field)
+
+
+def inventory_adjustment(delta):
+    """Expression changing `inventory` by `delta`, within the column."""
+    adjusted = Greatest(F('inventory') + Value(delta), Value(0),
+                        output_field=IntegerField())
+    max_value = max_product_value('inventory')
+    if max_value is None:
+        return adjusted
+    return Least(adjusted, Value(max_value), output_field=IntegerField())
+
+
+def lock_products(queryset):
+    """Lock the rows of `queryset`, returning their pks and collections."""
+    rows = list(queryset.select_for_update().order_by().values_list(
+        'pk', 'collection_id'))
+    return [pk for pk, _ in rows], {collection_id for _, collection_id in rows}
+
+
+def clean_product_value(name, value):
+    """Validate `value` for the product field `name`, None passes."""
+    if value is None:
+        return None
+    try:
+        return Product._meta.get_field(name).clean(value, None)
+    except ValidationError as error:
+        raise ValidationError({name: error.messages})
+
+
+def bulk_update_products(queryset, unit_price=None, unit_price_percent=None,
+                         inventory=None, inventory_delta=None):
+    """Update the products of `queryset` with a single UPDATE statement.
+
+    Prices are either set or changed by a percentage, inventories are
+    either set or changed by a delta. Set values are validated like the
+    model fields and raise `ValidationError`, changes are kept in range by
+    their expressions. Returns the number of updated rows.
+    """
+    unit_price = clean_product_value('unit_price', unit_price)
+    inventory = clean_product_value('inventory', inventory)
+
+    changes = {}
+    price = None
+    if unit_price is not None:
+        changes['unit_price'] = unit_price
+        price = Value(unit_price)
+    elif unit_price_percent is not None:
+        changes['unit_price'] = price = price_adjustment(unit_price_percent)
+    if price is not None:
+        # Computed from the new price within the same UPDATE.
+        changes['effective_price'] = effective_price_expression(price)
+    if inventory is not None:
+        changes['inventory'] = inventory
+    elif inventory_delta is not None:
+        changes['inventory'] = inventory_adjustment(inventory_delta)
+    if not changes:
+        return 0
+    # `update()` does not run the `auto_now` of `last_update`.
+    changes['last_update'] = timezone.now()
+
+    with transaction.atomic():
+        pks, collection_ids = lock_products(queryset)
+        updated = queryset.update(**changes)
+
+    if updated:
+        bulk_changed.send(sender=Product, pks=pks)
+        bulk_changed.send(sender=Collection, pks=collection_ids)
+    return updated
+
+
+def bulk_assign_promotions(queryset, promotion_ids, chunk_size=BULK_CHUNK_SIZE):
+    """Add promotions to the products of `queryset`.
+
+    Through rows are inserted in chunks, pairs that already exist are
+    skipped by the database. Returns the number of products.
+    """
+    promotion_ids = existing_ids(Promotion, promotion_ids)
+    through = Product.promotions.through
+    with transaction.atomic():
+        pks, _ = lock_products(queryset)
+        pairs = (
+            through(product_id=pk, promotion_id=promotion_id)
+            for pk in pks for promotion_id in promotion_ids
+        )
+        for chunk in chunked(pairs, chunk_size):
+            through.objects.bulk_create(chunk, ignore_conflicts=True)
+        if pks and promotion_ids:
+            update_effective_prices(pks)
+
+    if pks and promotion_ids:
+        bulk_changed.send(sender=Product, pks=pks)
+        bulk_changed.send(sender=Promotion, pks=promotion_ids)
+    return len(pks)
+
+
+class CheckoutError(Exception):
+    pass
+
+
+class EmptyCart(CheckoutError):
+    pass
+
+
+class OutOfStock(CheckoutError):
+    def __init__(self, product_id):
+        super().__init__(f'Product {product_id} is out of stock.')
+        self.product_id = product_id
+
+
+def checkout(cart_id, customer):
+    """Turn a cart into an order of `customer` and delete the cart.
+
+    Inventory is reserved with one conditional UPDATE per product, in
+    product id order so concurrent checkouts lock rows in the same order
+    and cannot deadlock. A product without enough inventory rolls the
+    whole checkout back with `OutOfStock`.
+    """
+    with transaction.atomic():
+        try:
+            cart = Cart.objects.select_for_update().get(pk=cart_id)
+        except (Cart.DoesNotExist, ValidationError):
+            raise CheckoutError('Cart does not exist.')
+
+        items = list(CartItem.objects.filter(cart=cart)
+                     .order_by('product_id')
+                     .values_list('product_id', 'quantity'))
+        if not items:
+            raise EmptyCart('Cart is empty.')
+
+        for product_id, quantity in items:
+            reserved = Product.objects \
+                .filter(pk=product_id, inventory__gte=quantity) \
+                .update(inventory=F('inventory') - quantity)
+            if not reserved:
+                raise OutOfStock(product_id)
+
+        # The rows are locked by the updates, the prices cannot change.
+        # Orders are charged the promoted price.
+        prices = dict(Product.objects
+                      .filter(pk__in=[product_id for product_id, _ in items])
+                      .values_list('pk', 'effective_price'))
+        order = Order.objects.create(customer=customer)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product_id=product_id, quantity=quantity,
+                      unit_price=prices[product_id])
+            for product_id, quantity in items
+        ])
+        cart.delete()
+
+    bulk_changed.send(
+        sender=Product, pks=[product_id for product_id, _ in items])
+    return order
+
+
+# The range of `CartItem.quantity`, which the upserts stay within.
+MAX_CART_QUANTITY = BaseDatabaseOperations.integer_field_ranges[
+    'PositiveSmallIntegerField'][1]
+
+UPSERT_CLAUSES = {
+    'mysql': 'ON DUPLICATE KEY UPDATE '
+             '{quantity} = LEAST({quantity} + %s, %s)',
+    'postgresql': 'ON CONFLICT ({cart}, {product}) DO UPDATE '
+                  'SET {quantity} = LEAST({table}.{quantity} + %s, %s)',
+    'sqlite': 'ON CONFLICT ({cart}, {product}) '
+              'DO UPDATE SET {quantity} = MIN({table}.{quantity} + %s, %s)',
+}
+
+
+def cart_pk(cart_id):
+    """Return `cart_id` as a cart primary key, None if it cannot be one."""
+    try:
+        return Cart._meta.pk.to_python(cart_id)
+    except ValidationError:
+        return None
+
+
+def product_pk(product_id):
+    """Return `product_id` as a product primary key, None if it cannot be."""
+    try:
+        return Product._meta.pk.to_python(product_id)
+    except ValidationError:
+        return None
+
+
+def add_to_cart(cart_id, product_id, quantity):
+    """Add `quantity` of a product to a cart with a single upsert.
+
+    The item is inserted, or its quantity incremented when the cart
+    already holds the product, by one INSERT ... SELECT that only matches
+    an existing cart and product. Quantities stop at `MAX_CART_QUANTITY`.
+    Returns False if the cart or the product does not exist.
+    """
+    cart_id = cart_pk(cart_id)
+    product_id = product_pk(product_id)
+    if cart_id is None or product_id is None:
+        return False
+
+    connection = connections[router.db_for_write(CartItem)]
+    upsert = UPSERT_CLAUSES.get(connection.vendor)
+    if upsert is None:
+        added = add_to_cart_fallback(cart_id, product_id, quantity)
+    else:
+        added = add_to_cart_upsert(connection, upsert, cart_id, product_id,
+                                   quantity)
+    if added:
+        bulk_changed.send(sender=Cart, pks=[cart_id])
+    return added
+
+
+def add_to_cart_upsert(connection, upsert, cart_id, product_id, quantity):
+    qn = connection.ops.quote_name
+    names = {
+        'table': qn(CartItem._meta.db_table),
+        'cart': qn(CartItem._meta.get_field('cart').column),
+        'product': qn(CartItem._meta.get_field('product').column),
+        'quantity': qn(CartItem._meta.get_field('quantity').column),
+        'cart_table': qn(Cart._meta.db_table),
+        'cart_pk': qn(Cart._meta.pk.column),
+        'product_table': qn(Product._meta.db_table),
+        'product_pk': qn(Product._meta.pk.column),
+    }
+    sql = (
+        'INSERT INTO {table} ({cart}, {product}, {quantity}) '
+        'SELECT {cart_table}.{cart_pk}, {product_table}.{product_pk}, %s '
+        'FROM {cart_table}, {product_table} '
+        'WHERE {cart_table}.{cart_pk} = %s '
+        'AND {product_table}.{product_pk} = %s '
+    ) + upsert
+    params = [
+        quantity,
+        Cart._meta.pk.get_db_prep_value(cart_id, connection),
+        product_id,
+        quantity,
+        MAX_CART_QUANTITY,
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql.format(**names), params)
+        return cursor.rowcount > 0
+
+
+def add_to_cart_fallback(cart_id, product_id, quantity):
+    """Increment-else-insert for backends without an upsert clause."""
+    items = CartItem.objects.filter(cart_id=cart_id, product_id=product_id)
+    incremented = Least(F('quantity') + quantity, Value(MAX_CART_QUANTITY))
+    if items.update(quantity=incremented):
+        return True
+    if not (Cart.objects.filter(pk=cart_id).exists()
+            and Product.objects.filter(pk=product_id).exists()):
+        return False
+    try:
+        with transaction.atomic():
+            CartItem.objects.create(
+                cart_id=cart_id, product_id=product_id, quantity=quantity)
+    except IntegrityError:
+        # Inserted concurrently.
+        items.update(quantity=incremented)
+    return True
+
+
+def update_cart_item(cart_id, product_id, quantity):
+    """Set the quantity of a cart item, removing it at 0.
+
+    Returns False if the cart does not hold the product.
+    """
+    if not quantity:
+        return remove_cart_item(cart_id, product_id)
+    cart_id, product_id = cart_pk(cart_id), product_pk(product_id)
+    updated = None not in (cart_id, product_id) and CartItem.objects \
+        .filter(cart_id=cart_id, product_id=product_id) \
+        .update(quantity=quantity)
+    if updated:
+        bulk_changed.send(sender=Cart, pks=[cart_id])
+    return bool(updated)
+
+
+def remove_cart_item(cart_id, product_id):
+    """Remove a product from a cart, False if the cart does not hold it."""
+    cart_id, product_id = cart_pk(cart_id), product_pk(product_id)
+    deleted = None not in (cart_id, product_id) and CartItem.objects \
+        .filter(cart_id=cart_id, product_id=product_id).delete()[0]
+    if deleted:
+        bulk_changed.send(sender=Cart, pks=[cart_id])
+    return bool(deleted)
+
+
+def clear_cart(cart_id):
+    """Remove every item of a cart and return how many there were."""
+    cart_id = cart_pk(cart_id)
+    deleted = cart_id is not None and CartItem.objects \
+        .filter(cart_id=cart_id).delete()[0]
+    if deleted:
+        bulk_changed.send(sender=Cart, pks=[cart_id])
+    return deleted or 0
+
+
+def cart_total(cart_id):
+    """Return the total price of a cart with one aggregate query."""
+    total = CartItem.objects.filter(cart_id=cart_id).aggregate(
+        total=Sum(F('quantity') * F('product__effective_price'),
+                  output_field=DecimalField(max_digits=12, decimal_places=2))
+    )['total']
+    return (total or Decimal(0)).quantize(Decimal('0.01'))
+
+
+PurgeResult = namedtuple('PurgeResult', ['carts', 'items'])
+
+
+def delete_rows(model, pks):
+    """DELETE rows by primary key without collecting them first.
+
+    `QuerySet.delete()` loads every cart to send its signals, the callers
+    send `bulk_changed` once per chunk instead.
+    """
+    connection = connections[router.db_for_write(model)]
+    qn = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(pks))
+    sql = (f'DELETE FROM {qn(model._meta.db_table)} '
+           f'WHERE {qn(model._meta.pk.column)} IN ({placeholders})')
+    params = [model._meta.pk.get_db_prep_value(pk, connection) for pk in pks]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def purge_expired_carts(created_before, chunk_size=BULK_CHUNK_SIZE,
+                        pause=0, on_chunk=None):
+    """Delete the carts created before `created_before` and their items.
+
+    Carts are deleted oldest first, `chunk_size` at a time in short
+    transactions that only lock their own rows, using the
+    `(created_at, id)` index. Concurrent `add_to_cart` calls on a cart
+    being deleted wait for the chunk and then find no cart. `on_chunk` is
+    called with the `PurgeResult` of every chunk.
+    """
+    carts = items = 0
+    expired = Cart.objects.filter(created_at__lt=created_before) \
+        .order_by('created_at', 'id')
+    while True:
+        with transaction.atomic():
+            pks = list(expired.select_for_update()
+                       .values_list('pk', flat=True)[:chunk_size])
+            if not pks:
+                break
+            deleted_items = CartItem.objects.filter(cart_id__in=pks).delete()[0]
+            deleted_carts = delete_rows(Cart, pks)
+
+        bulk_changed.send(sender=Cart, pks=pks)
+        carts += deleted_carts
+        items += deleted_items
+        if on_chunk is not None:
+            on_chunk(PurgeResult(deleted_carts, deleted_items))
+        if pause:
+            sleep(pause)
+    return PurgeResult(carts, items)
+
+
+def purge_orphaned_cart_items(chunk_size=BULK_CHUNK_SIZE, pause=0,
+                              on_chunk=None):
+    """Delete cart items whose cart is gone, in primary key ranges.
+
+    Returns the number of deleted items.
+    """
+    bounds = CartItem.objects.aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        return 0
+
+    deleted = 0
+    orphaned = CartItem.objects.filter(
+        ~Exists(Cart.objects.filter(pk=OuterRef('cart_id'))))
+    for start in range(bounds['low'], bounds['high'] + 1, chunk_size):
+        count = orphaned.filter(
+            pk__gte=start, pk__lt=start + chunk_size).delete()[0]
+        deleted += count
+        if on_chunk is not None:
+            on_chunk(PurgeResult(0, count))
+        if pause:
+            sleep(pause)
+    return deleted
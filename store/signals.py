@@ -0,0 +1,114 @@
+from django.db import connections, transaction
+from django.db.models import QuerySet
+from django.db.models.signals import (m2m_changed, post_delete, post_migrate,
+                                      post_save, pre_delete, pre_save)
+from django.dispatch import Signal, receiver
+from . import autocomplete, counters, pricing, reviews, search
+from .models import Collection, Product, Promotion, Review
+
+# Sent with `sender=<model>` after set-based writes (bulk_create, update)
+# that bypass the per-instance model signals. `pks` holds the primary keys
+# of the changed rows, or None when they are not known.
+bulk_changed = Signal()
+
+
+@receiver(pre_save, sender=Product)
+def remember_collection(sender, instance, raw=False, **kwargs):
+    if not raw:
+        counters.remember_collection(instance)
+
+
+@receiver(post_save, sender=Product)
+def count_product(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        counters.product_saved(instance, created)
+
+
+@receiver(post_delete, sender=Product)
+def uncount_product(sender, instance, **kwargs):
+    counters.product_deleted(instance)
+
+
+@receiver(m2m_changed, sender=Product.promotions.through)
+def promotions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # The products of a cleared promotion are unknown afterwards.
+        instance._cleared_product_ids = list(
+            instance.product_set.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        pricing.recompute_effective_prices(Product.objects.filter(pk=instance.pk))
+    elif action == 'post_clear':
+        pricing.recompute_effective_prices(Product.objects.filter(
+            pk__in=instance.__dict__.pop('_cleared_product_ids', [])))
+    elif pk_set:
+        pricing.recompute_effective_prices(Product.objects.filter(pk__in=pk_set))
+
+
+@receiver(post_save, sender=Promotion)
+def promotion_saved(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        pricing.recompute_effective_prices(instance.product_set.all())
+
+
+@receiver(pre_delete, sender=Promotion)
+def promotion_deleting(sender, instance, **kwargs):
+    # The through rows are gone once `post_delete` is sent.
+    instance._product_ids = list(instance.product_set.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Promotion)
+def promotion_deleted(sender, instance, **kwargs):
+    pricing.recompute_effective_prices(Product.objects.filter(
+        pk__in=instance.__dict__.pop('_product_ids', [])))
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using, **kwargs):
+    if sender.name == 'store':
+        search.restore_search_triggers(connections[using])
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Collection)
+def index_title(sender, instance, raw=False, **kwargs):
+    if autocomplete.index.built and not raw:
+        kind, pk, title = sender._meta.model_name, instance.pk, instance.title
+        transaction.on_commit(lambda: autocomplete.index.add(kind, pk, title))
+
+
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Collection)
+def unindex_title(sender, instance, **kwargs):
+    if autocomplete.index.built:
+        kind, pk = sender._meta.model_name, instance.pk
+        transaction.on_commit(lambda: autocomplete.index.remove(kind, pk))
+
+
+@receiver(bulk_changed, sender=Product)
+@receiver(bulk_changed, sender=Collection)
+def reindex_titles(sender, pks, **kwargs):
+    if not autocomplete.index.built:
+        return
+    if pks is None:
+        transaction.on_commit(autocomplete.index.build)
+    else:
+        kind, pks = sender._meta.model_name, list(pks)
+        transaction.on_commit(lambda: autocomplete.index.refresh(kind, pks))
+
+
+@receiver(post_save, sender=Review)
+def count_review(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        reviews.review_added(instance)
+
+
+@receiver(post_delete, sender=Review)
+def uncount_review(sender, instance, origin=None, **kwargs):
+    # Nothing to update when the reviews go with their product.
+    if isinstance(origin, Product) or (
+            isinstance(origin, QuerySet) and origin.model is Product):
+        return
+    reviews.review_deleted(instance)
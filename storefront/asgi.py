@@ -12,5 +12,11 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'storefront.settings')
+# Serve /graphql with the async view, see GRAPHQL_ASYNC in the settings.
+os.environ.setdefault('STOREFRONT_ASGI', '1')
 
 application = get_asgi_application()
+
+# Build the autocomplete index before the first request rather than on it.
+from store.autocomplete import warm  # noqa: E402
+warm()
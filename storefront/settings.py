@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 import django
 from django.utils.encoding import force_str
@@ -46,6 +47,7 @@ INSTALLED_APPS = [
     'debug_toolbar',
     'graphiql_debug_toolbar',
     'core',
+    'graphql_api',
     'customer',
     'likes',
     'playground',
@@ -53,12 +55,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
-    'graphiql_debug_toolbar.middleware.DebugToolbarMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # After authentication, the toolbar is only shown to staff members.
+    'graphiql_debug_toolbar.middleware.DebugToolbarMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -98,6 +101,90 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# The graphql cache holds full responses of anonymous queries. Local memory
+# is private to each worker process, so deployments with several workers
+# need a shared backend for invalidations to reach every worker.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'graphql': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'graphql',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+    'persisted_queries': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'persisted_queries',
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    },
+}
+
+GRAPHQL_RESPONSE_CACHE = {
+    'CACHE': 'graphql',
+    'TIMEOUT': 300,
+}
+
+# Parsed and validated query documents kept per worker process.
+GRAPHQL_DOCUMENT_CACHE_SIZE = 500
+
+# Budget of a single operation, see graphql_api.cost. The cost counts the
+# objects an operation can load, connections without `first` or `last`
+# count as RELAY_CONNECTION_MAX_LIMIT rows and other lists as LIST_SIZE.
+GRAPHQL_QUERY_COST = {
+    'MAX_COST': 50000,
+    'MAX_DEPTH': 10,
+    'LIST_SIZE': 10,
+}
+
+# storefront/asgi.py serves /graphql with AsyncStorefrontGraphQLView, which
+# runs requests and the root fields of queries on these thread pools.
+GRAPHQL_ASYNC = {
+    'ENABLED': os.environ.get('STOREFRONT_ASGI') == '1',
+    'REQUEST_WORKERS': 16,
+    'FIELD_WORKERS': 16,
+    # Seconds pool threads keep their database connections.
+    'CONN_MAX_AGE': 60,
+}
+
+# Operations sent as a JSON array to /graphql, see graphql_api.batch. With
+# PARALLEL, batches of queries run their entries on WORKERS threads.
+GRAPHQL_BATCH = {
+    'MAX_SIZE': 10,
+    'PARALLEL': False,
+    'WORKERS': 8,
+}
+
+# Encoding of GraphQL responses, see graphql_api.encoding. The default
+# ENCODER uses orjson when installed; responses of COMPRESS_MIN_LENGTH bytes
+# or more are sent compressed with brotli or gzip.
+GRAPHQL_ENCODING = {
+    'ENCODER': 'graphql_api.encoding.encode',
+    'COMPRESS_MIN_LENGTH': 1024,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,
+}
+
+# Automatic persisted queries. With ALLOWLIST_ONLY only the queries of the
+# ALLOWLIST manifest, a JSON object mapping sha256 hashes to query texts,
+# can be executed.
+GRAPHQL_PERSISTED_QUERIES = {
+    'CACHE': 'persisted_queries',
+    'TIMEOUT': None,
+    'ALLOWLIST': None,
+    'ALLOWLIST_ONLY': False,
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
@@ -145,17 +232,29 @@ INTERNAL_IPS = [
     # ...
 ]
 
+# Send the X-GraphQL-Debug header as a staff member to record a request.
+DEBUG_TOOLBAR_CONFIG = {
+    'SHOW_TOOLBAR_CALLBACK': 'graphql_api.debug.show_toolbar',
+}
+
 AUTH_USER_MODEL = 'core.User'
 
 AUTHENTICATION_BACKENDS = [
-    "graphql_jwt.backends.JSONWebTokenBackend",
+    "graphql_api.auth.CachedJSONWebTokenBackend",
     "django.contrib.auth.backends.ModelBackend",
 ]
 
+# Users of verified JWTs are cached per process for TIMEOUT seconds,
+# see graphql_api.auth.
+GRAPHQL_JWT_CACHE = {
+    'TIMEOUT': 60,
+    'MAX_ENTRIES': 10000,
+}
+
 GRAPHENE = {
     "SCHEMA": "graphql_api.schema.schema",
+    # DjangoDebugMiddleware is added per request by StorefrontGraphQLView.
     'MIDDLEWARE': [
-        'graphene_django.debug.DjangoDebugMiddleware',
         'graphql_jwt.middleware.JSONWebTokenMiddleware',
 
     ]
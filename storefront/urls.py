@@ -15,10 +15,13 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from graphene_django.views import GraphQLView
 from django.views.decorators.csrf import csrf_exempt
 import debug_toolbar
+from graphql_api.parallel import get_setting as get_async_setting
+from graphql_api.views import AsyncStorefrontGraphQLView, StorefrontGraphQLView
 
+GraphQLView = AsyncStorefrontGraphQLView \
+    if get_async_setting('ENABLED') else StorefrontGraphQLView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'storefront.settings')
 
 application = get_wsgi_application()
+
+# Build the autocomplete index before the first request rather than on it.
+from store.autocomplete import warm  # noqa: E402
+warm()